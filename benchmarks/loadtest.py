@@ -0,0 +1,104 @@
+"""
+Load test a running wordsearch.server.
+
+Opens --connections concurrent connections, each sending --requests requests for
+seeded random boards back to back, and reports throughput and latency percentiles as
+JSON.
+
+Usage examples:
+  $ python -m wordsearch.server --socket /tmp/ws.sock &
+  $ python -m benchmarks.loadtest --socket /tmp/ws.sock --connections 16 --size 15
+"""
+from wordsearch.main import random_board
+from argparse import ArgumentParser, ArgumentDefaultsHelpFormatter
+import asyncio, json, random, sys, time
+
+
+def percentile(values, fraction):
+  """Returns the "fraction" percentile of the sorted list "values" (nearest rank)"""
+  if not values:
+    return None
+  return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def run_connection(args, boards, latencies, errors):
+  """Send this connection's share of requests, recording each one's latency"""
+  if args.port is not None:
+    reader, writer = await asyncio.open_connection('127.0.0.1', args.port)
+  else:
+    reader, writer = await asyncio.open_unix_connection(args.socket)
+
+  try:
+    for i in range(args.requests):
+      board = boards[i % len(boards)]
+      request = {'id': i, 'board': board, 'min_word_length': args.min_word_length}
+      start = time.perf_counter()
+      writer.write(json.dumps(request).encode() + b'\n')
+      await writer.drain()
+      response = json.loads(await reader.readline())
+      latencies.append(time.perf_counter() - start)
+      if 'error' in response:
+        errors.append(response['error'])
+  finally:
+    writer.close()
+
+
+async def run(args):
+  rng = random.Random(args.seed)
+  boards = []
+  for _ in range(args.boards):
+    board = random_board(args.size, args.size, rng)
+    boards.append([''.join(board[x, y] for x in range(board.width)) for y in range(board.height)])
+
+  latencies = []
+  errors = []
+  start = time.perf_counter()
+  await asyncio.gather(*(
+    run_connection(args, boards, latencies, errors) for _ in range(args.connections)
+  ))
+  elapsed = time.perf_counter() - start
+
+  latencies.sort()
+  return {
+    'requests': len(latencies),
+    'errors': len(errors),
+    'seconds': elapsed,
+    'requests_per_second': len(latencies) / elapsed,
+    'p50_ms': percentile(latencies, 0.50) * 1000,
+    'p99_ms': percentile(latencies, 0.99) * 1000,
+    'max_ms': latencies[-1] * 1000,
+  }
+
+
+def parse_args():
+  parser = ArgumentParser(description="Load test a wordsearch server",
+                          formatter_class=ArgumentDefaultsHelpFormatter)
+
+  group = parser.add_mutually_exclusive_group()
+  group.add_argument('--socket', dest='socket', default='wordsearch.sock',
+    help="Path of the server's Unix socket")
+  group.add_argument('--port', dest='port', type=int, default=None,
+    help="Connect to this TCP port on localhost instead of a Unix socket")
+  parser.add_argument('-c', '--connections', dest='connections', type=int, default=8,
+    help="Number of concurrent connections")
+  parser.add_argument('-n', '--requests', dest='requests', type=int, default=100,
+    help="Number of requests per connection")
+  parser.add_argument('--size', dest='size', type=int, default=15,
+    help="Side length of the square random boards")
+  parser.add_argument('--boards', dest='boards', type=int, default=50,
+    help="Number of distinct random boards to cycle through")
+  parser.add_argument('-m', '--min-length', dest='min_word_length', type=int, default=0,
+    help="min_word_length to send with each request")
+  parser.add_argument('--seed', dest='seed', type=int, default=0,
+    help="Seed for the random boards")
+
+  return parser.parse_args()
+
+
+def main():
+  json.dump(asyncio.run(run(parse_args())), sys.stdout, indent=2)
+  print()
+
+
+if __name__ == '__main__':
+  main()
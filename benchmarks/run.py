@@ -0,0 +1,231 @@
+"""
+Benchmarks for dictionary construction, dictionary loading and board search.
+
+Every case is timed (best of --repeat runs) and, unless --no-memory is given, run once
+more under tracemalloc to record its peak memory. Search cases run every engine against
+every trie backend on the same seeded random boards.
+
+Usage examples:
+  $ # Run everything and save the results
+  $ python -m benchmarks.run --output baseline.json
+  $ # Compare a quicker run against them
+  $ python -m benchmarks.run --sizes 10 100 --compare baseline.json
+"""
+from wordsearch.compact import CompactTrie
+from wordsearch.dictionary import DictionaryCache
+from wordsearch.main import engines, random_board, select_engine
+from wordsearch.trie import TrieNode
+from argparse import ArgumentParser, ArgumentDefaultsHelpFormatter
+import json, os, platform, random, shutil, sys, tempfile, time, tracemalloc
+
+
+def read_words(dictionary):
+  """Returns the words in the dictionary file at "dictionary" (list)"""
+  with open(dictionary) as f:
+    return [word.strip() for word in f]
+
+
+# Trie backends, keyed by name. Each builds a trie from a dictionary path.
+backends = {
+  'node': lambda dictionary: TrieNode(words=read_words(dictionary)),
+  'dawg': lambda dictionary: TrieNode.from_sorted(sorted(read_words(dictionary)), minimize=True),
+  'compact': lambda dictionary: CompactTrie(words=read_words(dictionary)),
+  'mapped': lambda dictionary: DictionaryCache([dictionary]).load(),
+}
+
+
+def count_nodes(trie):
+  """Returns the number of distinct nodes in "trie", counting shared nodes once (int)"""
+  if isinstance(trie, CompactTrie):
+    return trie.node_count
+  seen = {id(trie)}
+  stack = [trie]
+  while stack:
+    for child in stack.pop().children.values():
+      if id(child) not in seen:
+        seen.add(id(child))
+        stack.append(child)
+  return len(seen)
+
+
+def measure(func, repeat, memory=True):
+  """
+  Time "func" and optionally record its peak memory.
+
+  Args:
+    func: a callable taking no arguments
+    repeat: how many times to time it; the fastest run is reported
+    memory: whether to do one extra run under tracemalloc
+
+  Returns: a dict with "seconds" and "peak_bytes" (None if memory is False)
+  """
+  times = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    func()
+    times.append(time.perf_counter() - start)
+
+  peak = None
+  if memory:
+    tracemalloc.start()
+    try:
+      func()
+      peak = tracemalloc.get_traced_memory()[1]
+    finally:
+      tracemalloc.stop()
+
+  return {'seconds': min(times), 'peak_bytes': peak}
+
+
+def bench_build(dictionary, names, repeat, memory):
+  """
+  Yields results for building each trie backend in "names" from "dictionary". TrieNode
+  builds also record the trie's node count.
+  """
+  if 'node' in names or 'dawg' in names:
+    words = read_words(dictionary)
+    sorted_words = sorted(set(words))
+    cases = [
+      ('build/node', lambda: TrieNode(words=words)),
+      ('build/node-sorted', lambda: TrieNode.from_sorted(sorted_words)),
+      ('build/dawg', lambda: TrieNode.from_sorted(sorted_words, minimize=True)),
+    ]
+    for name, build in cases:
+      yield dict(name=name, nodes=count_nodes(build()), **measure(build, repeat, memory))
+  if 'compact' in names or 'mapped' in names:
+    yield dict(name='build/compact', **measure(lambda: backends['compact'](dictionary), repeat, memory))
+  if 'mapped' in names:
+    yield dict(name='build/index', **measure(lambda: DictionaryCache([dictionary]).compact(), repeat, memory))
+
+
+def bench_startup(dictionary, repeat, memory):
+  """
+  Yields results for loading "dictionary" through a DictionaryCache, as ./main.py does,
+  with no cache (cold) and with an up to date one (warm).
+  """
+  cache = DictionaryCache([dictionary])
+
+  def cold():
+    shutil.rmtree(cache.path, ignore_errors=True)
+    cache.load()
+
+  yield dict(name='startup/cold', **measure(cold, repeat, memory))
+  yield dict(name='startup/warm', **measure(cache.load, repeat, memory))
+
+
+def bench_search(dictionary, engine_names, backend_names, sizes, seed, repeat, memory):
+  """
+  Yields results for searching seeded random boards of each size in "sizes" with each
+  engine and trie backend. Each engine's first search with a trie builds what it keeps
+  per trie (a TransitionTable, an Automaton, ...), so it is done once untimed.
+  """
+  tries = {name: backends[name](dictionary) for name in backend_names}
+  warmed = set()
+  for size in sizes:
+    board = random_board(size, size, random.Random(seed))
+    for engine_name in engine_names:
+      try:
+        engine = select_engine(engine_name)
+      except ImportError as e:
+        print('Skipping engine {}: {}'.format(engine_name, e), file=sys.stderr)
+        continue
+      for backend_name, trie in tries.items():
+        name = 'search/{}/{}/{}x{}'.format(engine_name, backend_name, size, size)
+        print(name, file=sys.stderr)
+        if (engine_name, backend_name) not in warmed:
+          sum(1 for _ in engine(random_board(4, 4, random.Random(seed)), trie))
+          warmed.add((engine_name, backend_name))
+        result = measure(lambda: sum(1 for _ in engine(board, trie)), repeat, memory)
+        yield dict(name=name, **result)
+
+
+def compare(results, baseline, threshold):
+  """
+  Print a comparison of "results" against "baseline" and return whether any case got
+  slower by more than "threshold" (a fraction, e.g. 0.1 for 10%).
+  """
+  previous = {result['name']: result for result in baseline['results']}
+  regressed = False
+  print('{:<45} {:>10} {:>10} {:>8}'.format('case', 'baseline', 'current', 'ratio'))
+  for result in results:
+    if result['name'] not in previous:
+      continue
+    before = previous[result['name']]['seconds']
+    ratio = result['seconds'] / before if before else float('inf')
+    flag = ''
+    if ratio > 1 + threshold:
+      flag = '  REGRESSION'
+      regressed = True
+    print('{:<45} {:>9.4f}s {:>9.4f}s {:>7.2f}x{}'.format(
+      result['name'], before, result['seconds'], ratio, flag))
+  return regressed
+
+
+def parse_args():
+  parser = ArgumentParser(description="Benchmark wordsearch", formatter_class=ArgumentDefaultsHelpFormatter)
+
+  parser.add_argument('-d', '--dictionary', dest='dictionary', default='words.txt',
+    help="File with a list of words to index")
+  parser.add_argument('--sizes', dest='sizes', type=int, nargs='+', default=[10, 100, 500, 1000, 2000],
+    help="Side lengths of the square random boards to search")
+  parser.add_argument('--engines', dest='engines', nargs='+', choices=engines, default=engines,
+    help="Search engines to benchmark")
+  parser.add_argument('--backends', dest='backends', nargs='+', choices=sorted(backends), default=sorted(backends),
+    help="Trie backends to benchmark")
+  parser.add_argument('--seed', dest='seed', type=int, default=0,
+    help="Seed for the random boards")
+  parser.add_argument('--repeat', dest='repeat', type=int, default=3,
+    help="Number of timed runs per case; the fastest is reported")
+  parser.add_argument('--no-memory', dest='memory', action='store_false',
+    help="Skip the extra tracemalloc run that measures peak memory")
+  parser.add_argument('-o', '--output', dest='output', default=None,
+    help="Write the results as JSON to this file instead of stdout")
+  parser.add_argument('--compare', dest='compare', default=None,
+    help="JSON results of a previous run to compare against")
+  parser.add_argument('--threshold', dest='threshold', type=float, default=0.1,
+    help="Fraction by which a case may slow down before --compare reports a regression")
+
+  return parser.parse_args()
+
+
+def main():
+  args = parse_args()
+
+  # Work on a copy of the dictionary so that index files don't touch the original
+  with tempfile.TemporaryDirectory() as tmpdir:
+    dictionary = os.path.join(tmpdir, os.path.basename(args.dictionary))
+    shutil.copyfile(args.dictionary, dictionary)
+
+    results = []
+    results.extend(bench_build(dictionary, args.backends, args.repeat, args.memory))
+    results.extend(bench_startup(dictionary, args.repeat, args.memory))
+    results.extend(bench_search(
+      dictionary, args.engines, args.backends, args.sizes, args.seed, args.repeat, args.memory,
+    ))
+
+  report = {
+    'meta': {
+      'python': platform.python_version(),
+      'platform': platform.platform(),
+      'seed': args.seed,
+      'repeat': args.repeat,
+    },
+    'results': results,
+  }
+
+  if args.output:
+    with open(args.output, 'w') as f:
+      json.dump(report, f, indent=2)
+  elif not args.compare:
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+  if args.compare:
+    with open(args.compare) as f:
+      baseline = json.load(f)
+    if compare(results, baseline, args.threshold):
+      sys.exit(1)
+
+
+if __name__ == '__main__':
+  main()
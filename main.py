@@ -1,68 +1,319 @@
 #!/usr/bin/env python3
+import sys
 
-from wordsearch.main import random_board, search_board
-from wordsearch.trie import TrieNode
-from wordsearch.board import Board
+if '--startup-profile' in sys.argv:
+  # Installed before anything else is imported, so that every import below is timed
+  from wordsearch.startup import StartupProfile
+  profile = StartupProfile()
+  profile.install()
+else:
+  profile = None
+
+# Only what every run needs is imported here. Modules used by a single mode are imported
+# where that mode starts, to keep short runs from paying for them.
+from wordsearch.main import engines, random_board, select_engine
+from wordsearch.board import CompactBoard
+from wordsearch.trie import fold
+from wordsearch.dictionary import DictionaryCache
+from wordsearch.output import write_words
 from argparse import ArgumentParser, FileType, ArgumentDefaultsHelpFormatter
-import os.path, pickle
+import os
 
 description = """
 Wordsearches are tedious. It's more fun to teach computers do them!
 Either search a random board or specify a file with a grid of letters to search.
+"%(prog)s serve" runs the search server instead; see "%(prog)s serve --help".
 """
 
+class HelpFormatter(ArgumentDefaultsHelpFormatter):
+  """
+  ArgumentDefaultsHelpFormatter, finding the terminal width the way shutil does but
+  without importing it, as argparse creates a formatter for every argument added.
+  """
+  def __init__(self, prog, indent_increment=2, max_help_position=24, width=None):
+    if width is None:
+      try:
+        width = int(os.environ['COLUMNS'])
+      except (KeyError, ValueError):
+        try:
+          width = os.get_terminal_size(sys.__stdout__.fileno()).columns
+        except (AttributeError, ValueError, OSError):
+          width = 80
+      width -= 2
+    super().__init__(prog, indent_increment, max_help_position, width)
+
+
+class _NoPhase:
+  """Stands in for SearchStats.phase() when there are no stats to record"""
+  def __enter__(self):
+    pass
+
+  def __exit__(self, *exc_info):
+    pass
+
+
 def parse_args():
-  parser = ArgumentParser(description=description, formatter_class=ArgumentDefaultsHelpFormatter)
+  parser = ArgumentParser(description=description, formatter_class=HelpFormatter)
 
   parser.add_argument('-i', '--height', dest='height', type=int, default=100,
     help="Length of the random board")
   parser.add_argument('-w', '--width', dest='width', type=int, default=100,
     help="Width of the random board")
-  parser.add_argument('-d', '--dictionary', dest='dictionary', type=FileType('r'), default='words.txt',
-    help="File with a list of words to search for")
+  parser.add_argument('-d', '--dictionary', dest='dictionaries', action='append', default=None,
+    help="File with a list of words to search for; may be repeated to merge several, "
+         "or to search each separately with --tag-dictionaries (default: words.txt)")
+  parser.add_argument('-t', '--tag-dictionaries', dest='tag_dictionaries', action='store_true',
+    help="Search every --dictionary in the same pass, but separately: print the longest word "
+         "of each dictionary per run, followed by a tab and the dictionaries it is the longest "
+         "word of ('dictionaries' in --format jsonl). The merged trie is cached on disk and rebuilt "
+         "when a dictionary changes")
   parser.add_argument('-s', '--wordsearch', dest='wordsearch', type=FileType('r'), default=None,
     help=("Search for words in a file rather than a random board."
-          "The file should be a grid of lowerclase letters with no spaces or commas.")
+          "The file should be a grid of letters with no spaces or commas; case is ignored.")
   )
   parser.add_argument('-m' '--min-length', dest='min_word_length', type=int, default=0,
     help="Skip printing words shorter than MIN_WORD_LENGTH")
+  parser.add_argument('--max-length', dest='max_word_length', type=int, default=None,
+    help="Print the longest word of at most MAX_WORD_LENGTH letters per run "
+         "(generator and inline engines only)")
+  parser.add_argument('--fuzzy', dest='fuzzy', type=int, default=None, metavar='K',
+    help="Read the board as possibly misread: let '?' cells stand for any letter and up to K "
+         "other letters per word be substituted. Substitutions are printed after a tab as "
+         "OFFSET:BOARD>WORD ('substitutions' in --format jsonl)")
+  parser.add_argument('--build-index', dest='build_index', action='store_true',
+    help="(Re)build the on-disk index for the dictionaries, folding in any logged edits, and exit")
+  parser.add_argument('-e', '--engine', dest='engine', choices=engines, default='generator',
+    help="Search engine to use. 'numpy' walks all runs in lock step and requires NumPy, "
+         "'aho' scans each line once with an Aho-Corasick automaton, 'coded' walks an "
+         "integer-coded copy of the trie over an integer-coded board, 'inline' walks runs "
+         "without generators")
+  parser.add_argument('-j', '--jobs', dest='workers', type=int, default=1,
+    help="Number of processes to search with (generator engine only)")
+  parser.add_argument('-b', '--batch', dest='batch', default=None,
+    help="Search many boards with one loaded dictionary and print JSON lines of results. "
+         "BATCH is a directory with a board per file, a file of boards separated by blank "
+         "lines, or '-' for such a stream on stdin. With --jobs, boards are searched concurrently")
+  parser.add_argument('-f', '--format', dest='format', choices=['text', 'jsonl'], default='text',
+    help="'text' prints the longest word per run. 'jsonl' prints every word along every run "
+         "as a JSON object with its start position, direction and length (generator engine only)")
+  parser.add_argument('--stream', dest='stream', action='store_true',
+    help="Read the --wordsearch file a few rows at a time instead of loading it whole, "
+         "for boards too large to fit in memory (generator engine only)")
+  parser.add_argument('--seed', dest='seed', type=int, default=None,
+    help="Seed for the random board, to make it reproducible")
+  parser.add_argument('--letter-dist', dest='letter_dist', choices=['uniform', 'dictionary'], default='uniform',
+    help="Draw the random board's letters equally often, or as often as they occur in the dictionary")
+  parser.add_argument('--plant', dest='plant', nargs='+', default=None, metavar='WORD',
+    help="Write these words into the random board at random positions, which are printed "
+         "to stderr as JSON lines")
+  parser.add_argument('-u', '--unique', dest='unique', action='store_true',
+    help="Print each word only once, however many times it's found. At most MAX_UNIQUE "
+         "words are remembered, so past that a word may be printed again")
+  parser.add_argument('--max-unique', dest='max_unique', type=int, default=1 << 20,
+    help="Number of words --unique remembers")
+  parser.add_argument('--threaded-output', dest='threaded_output', action='store_true',
+    help="Write results from a separate thread, so that a slow reader of the output "
+         "doesn't hold up the search")
+  parser.add_argument('--cache-results', dest='cache_results', action='store_true',
+    help="Keep search results on disk next to the dictionary cache, and reuse them when the "
+         "same board is searched again with the same dictionaries and options")
+  parser.add_argument('--stats', dest='stats', action='store_true',
+    help="Print the time spent in each phase to stderr, plus counts of runs and trie steps "
+         "(generator engine without --jobs)")
+  parser.add_argument('--startup-profile', dest='startup_profile', action='store_true',
+    help="Print the time spent importing each module to stderr, like 'python -X importtime', "
+         "followed by the time spent in each phase")
 
-  return parser.parse_args()
+  args = parser.parse_args()
+  args.dictionaries = args.dictionaries or ['words.txt']
+  if args.workers > 1 and args.engine != 'generator' and args.batch is None:
+    parser.error("--jobs is only supported by the generator engine")
+  if args.max_word_length is not None and (args.engine not in ('generator', 'inline') or args.stream or args.batch):
+    parser.error("--max-length is only supported by the generator and inline engines, without --stream or --batch")
+  if args.stream and (args.wordsearch is None or args.engine != 'generator' or args.workers > 1):
+    parser.error("--stream requires --wordsearch and the generator engine without --jobs")
+  if args.format == 'jsonl' and (args.engine != 'generator' or args.stream or args.batch or args.workers > 1):
+    parser.error("--format jsonl is only supported by the generator engine, without --stream, --batch or --jobs")
+  if (args.seed is not None or args.letter_dist != 'uniform' or args.plant) and (args.wordsearch or args.batch):
+    parser.error("--seed, --letter-dist and --plant only apply to random boards")
+  for word in args.plant or ():
+    if len(word) > max(args.width, args.height):
+      parser.error('--plant word "{}" is longer than the {}x{} board'.format(word, args.width, args.height))
+  if args.cache_results and (args.format != 'text' or args.stream or args.batch):
+    parser.error("--cache-results is only supported with --format text, without --stream or --batch")
+  if args.unique and (args.format != 'text' or args.batch):
+    parser.error("--unique is only supported with --format text, without --batch")
+  if args.fuzzy is not None and (args.engine != 'generator' or args.workers > 1 or args.stream
+                                 or args.batch or args.cache_results or args.tag_dictionaries):
+    parser.error("--fuzzy can't be combined with --engine, --jobs, --stream, --batch, "
+                 "--cache-results or --tag-dictionaries")
+  if args.tag_dictionaries and (args.engine != 'generator' or args.workers > 1 or args.build_index
+                                or args.stream or args.batch or args.cache_results or args.unique
+                                or args.max_word_length is not None):
+    parser.error("--tag-dictionaries can't be combined with --engine, --jobs, --build-index, "
+                 "--stream, --batch, --cache-results, --unique or --max-length")
+  return args
 
 
-def main():
-  args = parse_args()
+def search(args, stats=None):
+  """
+  Run the search described by the parsed command line "args", printing the results.
+
+  Args:
+    args: the namespace returned by parse_args()
+    stats: a SearchStats to record phase timings in, or None. With "args.stats", serial
+           searches with the generator engine also record search counters in it.
+  """
+  def phase(name):
+    return stats.phase(name) if stats is not None else _NoPhase()
 
-  if args.wordsearch:
-    # Parse the specified wordsearch file
-    board = Board([list(line.strip()) for line in args.wordsearch])
+  if args.tag_dictionaries:
+    # The dictionaries are merged into one trie that remembers which words came from where,
+    # cached next to the first one and rebuilt when any of them changes
+    from wordsearch.tagged import TaggedCache
+    with phase('dictionary load'):
+      rootnode = TaggedCache(args.dictionaries).load()
   else:
-    # Use a random board
-    board = random_board(args.width, args.height)
-
-  # Pickle trie for performance
-  # The cache tracks the last modified time of the dictionary.
-  # If there exists a pickle cache for the dictionary's name and the file has not been
-  # changed since the last cache was made, load from the pickle cache instead.
-  cache_name = args.dictionary.name + '.pickle'
-  cache_valid = False              #In case the cache file doesn't exist
-  if os.path.exists(cache_name):
-    lastmtime, rootnode = pickle.load(open(cache_name, 'rb'))
-    cache_valid = lastmtime >= os.path.getmtime(args.dictionary.name)
-
-  if not cache_valid:
-    rootnode = TrieNode()
-    for word in args.dictionary:
-      rootnode.index(word.strip())
-
-    pickle.dump(
-      (os.path.getmtime(args.dictionary.name), rootnode),
-      open(cache_name, 'wb')
+    # The dictionaries are merged into a memory-mapped index in a cache directory next to
+    # the first one. Edits to them are logged as deltas and only compacted now and then.
+    cache = DictionaryCache(args.dictionaries)
+    if args.build_index:
+      with phase('dictionary build'):
+        cache.compact()
+      return
+    with phase('dictionary load'):
+      rootnode = cache.load()
+
+  if args.batch is not None:
+    from wordsearch.batch import read_boards, search_boards, write_results
+    source = sys.stdin if args.batch == '-' else args.batch
+    results = search_boards(
+      read_boards(source), rootnode, engine=args.engine,
+      min_word_length=args.min_word_length, workers=args.workers,
     )
+    with phase('search and output'):
+      write_results(results, sys.stdout)
+    return
+
+  if args.stream:
+    # Search the wordsearch file as it's read, a few rows at a time
+    from wordsearch.stream import stream_search
+    words = stream_search((fold(line.strip()) for line in args.wordsearch), rootnode)
+  else:
+    with phase('board parse'):
+      if args.wordsearch:
+        # Parse the specified wordsearch file
+        board = CompactBoard(fold(line.strip()) for line in args.wordsearch)
+      else:
+        # Use a random board
+        import random
+        rng = random.Random(args.seed)
+        weights = None
+        if args.letter_dist == 'dictionary':
+          from wordsearch.generate import letter_weights
+          weights = letter_weights(rootnode.words())
+        board = random_board(args.width, args.height, rng, weights)
+        if args.plant:
+          from wordsearch.generate import plant_words
+          import json
+          try:
+            board, planted = plant_words(board, [fold(word) for word in args.plant], rng)
+          except (ValueError, UnicodeError) as e:
+            # Reported the way argparse reports bad arguments
+            sys.exit('{}: error: --plant: {}'.format(os.path.basename(sys.argv[0]), e))
+          for hit in planted:
+            print(json.dumps(hit._asdict()), file=sys.stderr)
+
+    if args.tag_dictionaries:
+      from wordsearch.tagged import search_board_tagged
+      hits = search_board_tagged(board, rootnode, args.min_word_length)
+      if args.format == 'jsonl':
+        import json
+        lines = (json.dumps(hit._asdict()) for hit in hits)
+      else:
+        lines = ('{}\t{}'.format(hit.word, ','.join(hit.dictionaries)) for hit in hits)
+      with phase('search and output'):
+        write_words(lines, sys.stdout, threaded=args.threaded_output)
+      return
+
+    if args.fuzzy is not None:
+      from wordsearch.fuzzy import search_board_fuzzy
+      hits = search_board_fuzzy(
+        board, rootnode, args.fuzzy, min_length=args.min_word_length, max_length=args.max_word_length,
+      )
+      if args.format == 'jsonl':
+        import json
+        lines = (json.dumps(hit._asdict()) for hit in hits)
+      else:
+        lines = (
+          '\t'.join([hit.word] + ['{}:{}>{}'.format(*substitution) for substitution in hit.substitutions])
+          for hit in hits
+        )
+      if args.unique:
+        from wordsearch.output import unique
+        lines = unique(lines, args.max_unique)
+      with phase('search and output'):
+        write_words(lines, sys.stdout, threaded=args.threaded_output)
+      return
+
+    if args.format == 'jsonl':
+      from wordsearch.main import search_board_hits
+      import json
+      hits = search_board_hits(board, rootnode, args.min_word_length)
+      with phase('search and output'):
+        write_words((json.dumps(hit._asdict()) for hit in hits), sys.stdout, threaded=args.threaded_output)
+      return
+
+    options = {}
+    if args.engine == 'inline':
+      options = dict(min_length=args.min_word_length or None, max_length=args.max_word_length)
+    elif args.engine == 'generator':
+      # Let the search skip runs that can't produce long enough words
+      options = dict(
+        workers=args.workers, min_length=args.min_word_length or None,
+        max_length=args.max_word_length, stats=stats if args.stats and args.workers <= 1 else None,
+      )
+
+    if args.cache_results:
+      # Reuse the results of earlier searches of the same board, kept with the dictionary
+      from wordsearch.memo import ResultCache
+      results = ResultCache(directory=os.path.join(cache.path, 'results'))
+      with phase('search'):
+        words = results.search(board, rootnode, args.engine, **options)
+      if stats is not None:
+        print(results, file=sys.stderr)
+    else:
+      words = select_engine(args.engine)(board, rootnode, **options)
 
-  for word in search_board(board, rootnode):
-    if len(word) >= args.min_word_length:
-      print(word)
+  if stats is not None:
+    # Finish the search before printing anything, so the two can be timed apart
+    with phase('search'):
+      words = list(words)
+
+  words = (word for word in words if len(word) >= args.min_word_length)
+  if args.unique:
+    from wordsearch.output import unique
+    words = unique(words, args.max_unique)
+  with phase('output'):
+    write_words(words, sys.stdout, threaded=args.threaded_output)
+
+
+def main():
+  if sys.argv[1:2] == ['serve']:
+    from wordsearch.server import main as serve
+    serve(sys.argv[2:], prog='{} serve'.format(os.path.basename(sys.argv[0])))
+    return
+  args = parse_args()
+  stats = None
+  if args.stats or args.startup_profile:
+    from wordsearch.stats import SearchStats
+    stats = SearchStats()
+  search(args, stats)
+  if profile is not None:
+    profile.uninstall()
+    print(profile.report(), file=sys.stderr)
+  if stats is not None:
+    print(stats.report(), file=sys.stderr)
 
 
 if __name__ == '__main__':
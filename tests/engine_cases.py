@@ -0,0 +1,74 @@
+"""
+The cases every search engine shares: each must find exactly what the generator engine
+(wordsearch.main.search_board) finds, in the same order.
+
+A test case for an engine mixes in EngineCases ahead of unittest.TestCase and sets
+"search_board" to the engine's search_board, as a staticmethod.
+"""
+import wordsearch.main as main
+from wordsearch.board import Board, CompactBoard
+from wordsearch.compact import CompactTrie
+from wordsearch.trie import TrieNode
+import random
+
+WORDS = ['amp', 'amps', 'ack', 'bus', 'bar', 'a', 'ma', 'cab', 'backs', 'mapsack']
+
+# Widths and heights of the random boards, including single rows and columns
+SHAPES = [(1, 1), (3, 1), (1, 5), (2, 2), (7, 1), (1, 9), (4, 4), (9, 7), (12, 12), (7, 23)]
+
+
+class EngineCases:
+  search_board = None
+  # The kinds of board the engine accepts
+  board_types = (Board, CompactBoard)
+
+  def setUp(self):
+    random.seed(1234)
+    self.rows = [
+      [[random.choice('abcmpksuz') for _ in range(width)] for _ in range(height)]
+      for width, height in SHAPES
+    ]
+    self.roots = [
+      TrieNode(words=WORDS), CompactTrie(words=WORDS),
+      TrieNode.from_sorted(sorted(WORDS), minimize=True),
+    ]
+
+  def search(self, board_type, rows, root, **kwargs):
+    """Returns the words the engine finds in "rows", as a "board_type" (list)"""
+    return list(self.search_board(board_type(rows), root, **kwargs))
+
+  def prepare(self, root):
+    """
+    Returns the keyword arguments that hand the engine its per-trie preparation of "root",
+    built ahead of time, or None if it has none
+    """
+    return None
+
+  def test_search(self):
+    root = TrieNode(words=['amp', 'ack', 'bus', 'bar'])
+    rows = [
+      ['z', 'a', 'm', 'x'],
+      ['s', 'a', 'u', 'b'],
+      ['u', 'm', 'c', 'a'],
+      ['b', 'p', 'a', 'k'],
+    ]
+    for board_type in self.board_types:
+      self.assertEqual(set(self.search(board_type, rows, root)), {'amp', 'ack', 'bus'})
+
+  def test_matches_generator_engine(self):
+    for root in self.roots:
+      for rows in self.rows:
+        expected = list(main.search_board(Board(rows), root))
+        for board_type in self.board_types:
+          self.assertEqual(self.search(board_type, rows, root), expected)
+
+  def test_reuse_preparation(self):
+    for root in self.roots:
+      prepared = self.prepare(root)
+      if prepared is None:
+        self.skipTest("The engine has no per-trie preparation")
+      for rows in self.rows:
+        self.assertEqual(
+          self.search(self.board_types[0], rows, root, **prepared),
+          list(main.search_board(Board(rows), root)),
+        )
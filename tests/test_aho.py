@@ -0,0 +1,33 @@
+import wordsearch.aho as aho
+import wordsearch.main as main
+from wordsearch.board import Board
+from wordsearch.trie import TrieNode
+from tests.engine_cases import EngineCases
+import unittest
+
+class TestAutomaton(unittest.TestCase):
+  def test_scan_longest_per_start(self):
+    automaton = aho.Automaton(TrieNode(words=['he', 'she', 'hers', 'his', 'e']))
+    self.assertEqual(automaton.scan('ushers'), {1: 3, 2: 4, 3: 1})
+
+  def test_scan_no_match(self):
+    automaton = aho.Automaton(TrieNode(words=['abc']))
+    self.assertEqual(automaton.scan('abxabd'), {})
+
+  def test_scan_overlapping(self):
+    automaton = aho.Automaton(TrieNode(words=['aa', 'aaa']))
+    self.assertEqual(automaton.scan('aaaa'), {0: 3, 1: 3, 2: 2})
+
+
+class TestAhoSearch(EngineCases, unittest.TestCase):
+  search_board = staticmethod(aho.search_board)
+
+  def prepare(self, root):
+    return {'automaton': aho.Automaton(root)}
+
+  def test_failure_links(self):
+    # "sabc" only matches "abc" by following the failure link out of "sab"
+    root = TrieNode(words=['sab', 'abc'])
+    board = Board([list('sabc')])
+    self.assertEqual(list(aho.search_board(board, root)), list(main.search_board(board, root)))
+    self.assertIn('abc', aho.search_board(board, root))
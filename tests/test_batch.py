@@ -0,0 +1,81 @@
+import wordsearch.batch as batch
+import wordsearch.main as main
+from wordsearch.board import CompactBoard
+from wordsearch.trie import TrieNode
+import io, json, os, tempfile
+import unittest
+
+class TestParseBoards(unittest.TestCase):
+  def test_split_on_blank_lines(self):
+    lines = ['abc\n', 'def\n', '\n', '\n', 'xy\n', '  \n', 'z\n']
+    self.assertEqual(list(batch.parse_boards(lines)), [['abc', 'def'], ['xy'], ['z']])
+
+  def test_empty(self):
+    self.assertEqual(list(batch.parse_boards(['\n', '\n'])), [])
+
+
+class TestReadBoards(unittest.TestCase):
+  def setUp(self):
+    self.tmpdir = tempfile.TemporaryDirectory()
+    with open(os.path.join(self.tmpdir.name, 'a.txt'), 'w') as f:
+      f.write('ab\ncd\n')
+    with open(os.path.join(self.tmpdir.name, 'b.txt'), 'w') as f:
+      f.write('ab\n\ncd\n')
+
+  def tearDown(self):
+    self.tmpdir.cleanup()
+
+  def test_directory(self):
+    self.assertEqual(list(batch.read_boards(self.tmpdir.name)), [
+      ('a.txt', ['ab', 'cd']),
+      ('b.txt:0', ['ab']),
+      ('b.txt:1', ['cd']),
+    ])
+
+  def test_file(self):
+    self.assertEqual(list(batch.read_boards(os.path.join(self.tmpdir.name, 'b.txt'))), [
+      ('b.txt:0', ['ab']),
+      ('b.txt:1', ['cd']),
+    ])
+
+  def test_stream(self):
+    self.assertEqual(list(batch.read_boards(io.StringIO('ab\n\ncd\n'))), [
+      ('0', ['ab']),
+      ('1', ['cd']),
+    ])
+
+
+class TestSearchBoards(unittest.TestCase):
+  def setUp(self):
+    self.root = TrieNode(words=['amp', 'amps', 'ack', 'bus', 'bar', 'cat', 'ax'])
+    self.boards = [
+      ('first', ['zamx', 'saub', 'umca', 'bpak']),
+      ('second', ['cat', 'axe']),
+      ('bad', ['abc', 'de']),
+    ]
+
+  def expected(self, board_id, rows, min_word_length=0):
+    words = main.search_board(CompactBoard(rows), self.root)
+    return {'id': board_id, 'words': [w for w in words if len(w) >= min_word_length]}
+
+  def test_search(self):
+    results = list(batch.search_boards(self.boards, self.root))
+    self.assertEqual(results[:2], [self.expected(*board) for board in self.boards[:2]])
+    self.assertEqual(results[2]['id'], 'bad')
+    self.assertIn('error', results[2])
+
+  def test_min_word_length(self):
+    results = list(batch.search_boards(self.boards[:2], self.root, min_word_length=3))
+    self.assertEqual(results, [self.expected(*board, min_word_length=3) for board in self.boards[:2]])
+
+  def test_workers(self):
+    self.assertEqual(
+      list(batch.search_boards(self.boards, self.root, workers=2)),
+      list(batch.search_boards(self.boards, self.root)),
+    )
+
+  def test_write_results(self):
+    out = io.StringIO()
+    batch.write_results(batch.search_boards(self.boards, self.root), out)
+    lines = out.getvalue().splitlines()
+    self.assertEqual([json.loads(line)['id'] for line in lines], ['first', 'second', 'bad'])
@@ -1,4 +1,4 @@
-from wordsearch.board import Board
+from wordsearch.board import Board, CompactBoard, _room, flat_letters, run_word
 import unittest
 
 class TestBoard(unittest.TestCase):
@@ -114,3 +114,113 @@ class TestBoard(unittest.TestCase):
   def test_width_height(self):
     self.assertEqual(self.reference_board.width, 4)
     self.assertEqual(self.reference_board.height, 3)
+
+
+class TestCompactBoard(unittest.TestCase):
+  def setUp(self):
+    self.rows = [
+      'abcd',
+      'efgh',
+      'ijkl',
+    ]
+    self.reference_board = CompactBoard(self.rows)
+
+  def test_equals(self):
+    self.assertEqual(self.reference_board, CompactBoard(self.rows))
+    self.assertEqual(self.reference_board, CompactBoard([list(row) for row in self.rows]))
+    self.assertEqual(self.reference_board, Board([list(row) for row in self.rows]))
+    self.assertEqual(Board([list(row) for row in self.rows]), self.reference_board)
+
+  def test_not_equals(self):
+    self.assertNotEqual(self.reference_board, CompactBoard(['abcd', 'efgh', 'ijkm']))
+    self.assertNotEqual(self.reference_board, CompactBoard(['abcdef', 'ghijkl']))
+
+  def test_construct_uneven_rows(self):
+    self.assertRaises(ValueError, lambda: CompactBoard(['abcd', 'efgh', 'ijklm']))
+
+  def test_construct_zero_width_height(self):
+    self.assertRaises(ValueError, lambda: CompactBoard([[]]))
+    self.assertRaises(ValueError, lambda: CompactBoard([]))
+
+  def test_construct_non_latin1(self):
+    self.assertRaises(ValueError, lambda: CompactBoard(['ab', 'a\u0101']))
+
+  def test_from_bytes(self):
+    self.assertEqual(CompactBoard.from_bytes(b'abcdefghijkl', 4, 3), self.reference_board)
+    self.assertRaises(ValueError, lambda: CompactBoard.from_bytes(b'abc', 4, 3))
+    self.assertRaises(ValueError, lambda: CompactBoard.from_bytes(b'', 0, 0))
+
+  def test_getitem(self):
+    for y, row in enumerate(self.rows):
+      for x, letter in enumerate(row):
+        self.assertEqual(self.reference_board[x, y], letter)
+
+  def test_getitem_wrong_shape(self):
+    self.assertRaises(ValueError, lambda: self.reference_board[1])
+    self.assertRaises(ValueError, lambda: self.reference_board[1, 2, 3])
+
+  def test_getitem_out_of_range(self):
+    self.assertRaises(IndexError, lambda: self.reference_board[-1, 0])
+    self.assertRaises(IndexError, lambda: self.reference_board[0, -1])
+    self.assertRaises(IndexError, lambda: self.reference_board[4, 0])
+    self.assertRaises(IndexError, lambda: self.reference_board[0, 3])
+
+  def test_setitem(self):
+    self.reference_board[1, 2] = 'z'
+    self.assertEqual(self.reference_board[1, 2], 'z')
+
+  def test_setitem_bad_value(self):
+    def assign(value):
+      self.reference_board[0, 0] = value
+    self.assertRaises(ValueError, assign, 'ab')
+    self.assertRaises(ValueError, assign, 3)
+    self.assertRaises(ValueError, assign, '\u0101')
+
+  def test_line(self):
+    self.assertEqual(self.reference_board.line((0, 0), (1, 0)), b'abcd')
+    self.assertEqual(self.reference_board.line((0, 0), (0, 1)), b'aei')
+    self.assertEqual(self.reference_board.line((0, 0), (1, 1)), b'afk')
+    self.assertEqual(self.reference_board.line((3, 2), (-1, -1)), b'lgb')
+    self.assertEqual(self.reference_board.line((3, 2), (-1, 0)), b'lkji')
+    self.assertEqual(self.reference_board.line((3, 0), (-1, 1)), b'dgj')
+    self.assertEqual(self.reference_board.line((0, 2), (1, -1)), b'ifc')
+    self.assertEqual(self.reference_board.line((0, 0), (-1, -1)), b'a')
+    self.assertRaises(ValueError, lambda: self.reference_board.line((0, 0), (0, 0)))
+    self.assertRaises(IndexError, lambda: self.reference_board.line((4, 0), (1, 0)))
+
+  def test_buffer(self):
+    buffer = self.reference_board.buffer
+    self.assertEqual(bytes(buffer), b'abcdefghijkl')
+    self.assertTrue(buffer.readonly)
+
+  def test_line_one_wide(self):
+    # Diagonals of a board one cell wide move 0 places in the buffer per letter
+    column = CompactBoard(['a', 'b', 'c'])
+    self.assertEqual(column.line((0, 1), (-1, 1)), b'b')
+    self.assertEqual(column.line((0, 1), (1, -1)), b'b')
+    self.assertEqual(column.line((0, 1), (0, 1)), b'bc')
+
+  def test_room(self):
+    # On a 4x3 board, from (1, 2)
+    self.assertEqual(_room(1, 2, 1, 0, 4, 3), 3)
+    self.assertEqual(_room(1, 2, -1, 0, 4, 3), 2)
+    self.assertEqual(_room(1, 2, 0, -1, 4, 3), 3)
+    self.assertEqual(_room(1, 2, 0, 1, 4, 3), 1)
+    self.assertEqual(_room(1, 2, 1, -1, 4, 3), 3)
+    self.assertEqual(_room(1, 2, -1, -1, 4, 3), 2)
+
+  def test_run_word(self):
+    for board in (self.reference_board, Board(self.rows)):
+      letters = flat_letters(board)
+      self.assertEqual(run_word(letters, 11, -5, 3), 'lgb')
+      self.assertEqual(run_word(letters, 3, 3, 3), 'dgj')
+      self.assertEqual(run_word(letters, 5, 0, 1), 'f')
+
+  def test_iteration(self):
+    self.assertEqual(list(self.reference_board), [
+      (x, y, letter) for y, row in enumerate(self.rows) for x, letter in enumerate(row)
+    ])
+
+  def test_width_height(self):
+    self.assertEqual(self.reference_board.width, 4)
+    self.assertEqual(self.reference_board.height, 3)
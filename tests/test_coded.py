@@ -0,0 +1,35 @@
+import wordsearch.coded as coded
+from wordsearch.board import Board, CompactBoard
+from wordsearch.trie import TrieNode
+from wordsearch.compact import CompactTrie
+from tests.engine_cases import EngineCases
+import unittest
+
+class TestCodedTrie(unittest.TestCase):
+  def test_alphabet(self):
+    trie = coded.CodedTrie(TrieNode(words=['bus', 'amp']))
+    self.assertEqual(trie.alphabet, 'abmpsu')
+    self.assertEqual(trie.codes['a'], 1)
+    self.assertEqual(trie.stride, 7)
+
+  def test_table(self):
+    trie = coded.CodedTrie(CompactTrie(words=['a', 'ab']))
+    a = trie.table[trie.codes['a']]
+    self.assertEqual(a & 1, 1)
+    self.assertEqual(trie.table[(a >> 1) + trie.codes['a']], -1)
+    b = trie.table[(a >> 1) + trie.codes['b']]
+    self.assertEqual(b & 1, 1)
+    self.assertEqual(trie.table[trie.codes['b']], -1)
+
+  def test_encode(self):
+    trie = coded.CodedTrie(TrieNode(words=['bus', 'amp']))
+    codes = [0, 1, 2, 6]
+    self.assertEqual(list(trie.encode(CompactBoard(['zabu']))), codes)
+    self.assertEqual(list(trie.encode(Board([['z', 'a', 'b', 'u']]))), codes)
+
+
+class TestCodedSearch(EngineCases, unittest.TestCase):
+  search_board = staticmethod(coded.search_board)
+
+  def prepare(self, root):
+    return {'coded': coded.CodedTrie(root)}
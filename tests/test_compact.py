@@ -0,0 +1,107 @@
+from wordsearch.compact import CompactTrie, CompactTrieNode
+from wordsearch.trie import TrieNode
+from wordsearch.board import Board
+import wordsearch.main as main
+import pickle
+import unittest
+
+class TestCompactTrie(unittest.TestCase):
+  def setUp(self):
+    self.words = ['amp', 'amps', 'ack', 'bus', 'a']
+    self.trie = CompactTrie(words=self.words)
+
+  def test_contains(self):
+    for word in self.words:
+      self.assertTrue(word in self.trie)
+    self.assertFalse('am' in self.trie)
+    self.assertFalse('bar' in self.trie)
+    self.assertFalse('ampss' in self.trie)
+    self.assertFalse('' in self.trie)
+
+  def test_contains_prefix(self):
+    self.assertTrue(self.trie.contains('am', prefix=True))
+    self.assertTrue(self.trie.contains('bu', prefix=True))
+    self.assertFalse(self.trie.contains('bx', prefix=True))
+
+  def test_words(self):
+    self.assertEqual(list(self.trie.words()), sorted(self.words))
+
+  def test_empty(self):
+    trie = CompactTrie()
+    self.assertEqual(trie.node_count, 1)
+    self.assertEqual(dict(trie.children), {})
+    self.assertFalse('a' in trie)
+
+  def test_node_count(self):
+    # root, a, m, p, s, c, k, b, u, s
+    self.assertEqual(self.trie.node_count, 10)
+
+  def test_nbytes(self):
+    # min_remaining and max_remaining hold 2 bytes per node each, once they're built
+    without = CompactTrie(words=self.words)
+    without._remaining = None
+    self.assertEqual(self.trie.nbytes, without.nbytes + 2 * 2 * self.trie.node_count)
+
+  def test_children(self):
+    self.assertEqual(set(self.trie.children), {'a', 'b'})
+    a = self.trie.children['a']
+    self.assertIsInstance(a, CompactTrieNode)
+    self.assertTrue(a.word_end)
+    self.assertEqual(set(a.children), {'c', 'm'})
+    self.assertFalse(a.children['m'].word_end)
+    self.assertRaises(KeyError, lambda: a.children['z'])
+    self.assertRaises(KeyError, lambda: a.children[5])
+
+  def test_from_trie(self):
+    trie = CompactTrie.from_trie(TrieNode(words=self.words))
+    self.assertEqual(trie, self.trie)
+    self.assertEqual(trie.node_count, self.trie.node_count)
+
+  def test_to_trie(self):
+    self.assertEqual(self.trie.to_trie(), TrieNode(words=self.words))
+
+  def test_index(self):
+    self.trie.index('bar', 'ba')
+    self.assertTrue('bar' in self.trie)
+    self.assertTrue('ba' in self.trie)
+    self.assertTrue('amps' in self.trie)
+
+  def test_mutually_exclusive_args(self):
+    self.assertRaises(ValueError, lambda: CompactTrie(words=['a'], offsets=[0]))
+    self.assertRaises(ValueError, lambda: CompactTrie(offsets=[0]))
+
+  def test_pickle(self):
+    self.assertEqual(pickle.loads(pickle.dumps(self.trie)), self.trie)
+
+  def test_search_board(self):
+    words = ['amp', 'ack', 'bus', 'bar']
+    board = Board([
+      ['z', 'a', 'm', 'x'],
+      ['s', 'a', 'u', 'b'],
+      ['u', 'm', 'c', 'a'],
+      ['b', 'p', 'a', 'k'],
+    ])
+    self.assertEqual(
+      list(main.search_board(board, CompactTrie(words=words))),
+      list(main.search_board(board, TrieNode(words=words))),
+    )
+
+  def test_max_depth(self):
+    self.assertEqual(CompactTrie().max_depth(), 0)
+    self.assertEqual(self.trie.max_depth(), 4)
+
+  def test_remaining(self):
+    self.assertEqual((self.trie.min_remaining, self.trie.max_remaining), (1, 4))
+    am = self.trie.children['a'].children['m']
+    self.assertEqual((am.min_remaining, am.max_remaining), (1, 2))
+    self.assertEqual(self.trie.remaining(0), (1, 4))
+    self.assertEqual(CompactTrie().remaining(0), (None, None))
+
+  def test_remaining_matches_trie(self):
+    trie = TrieNode(words=self.words)
+    compact = CompactTrie.from_trie(trie)
+    stack = [(trie, compact.root)]
+    while stack:
+      node, view = stack.pop()
+      self.assertEqual((node.min_remaining, node.max_remaining), (view.min_remaining, view.max_remaining))
+      stack.extend((child, view.children[letter]) for letter, child in node.children.items())
@@ -0,0 +1,139 @@
+from wordsearch.board import Board
+from wordsearch.compact import CompactTrie
+from wordsearch.dictionary import DeltaTrie, DictionaryCache
+from wordsearch.index import MappedTrie
+from wordsearch.main import search_board
+from wordsearch.trie import TrieNode
+import os, pickle, tempfile
+import unittest
+
+class TestDeltaTrie(unittest.TestCase):
+  def setUp(self):
+    patch = TrieNode(words=['amped', 'zap'])
+    self.trie = DeltaTrie(CompactTrie(words=['amp', 'amps', 'ack', 'bus']), patch, {'ack'})
+
+  def test_words(self):
+    self.assertEqual(list(self.trie.words()), ['amp', 'amped', 'amps', 'bus', 'zap'])
+
+  def test_contains(self):
+    self.assertTrue('amped' in self.trie)
+    self.assertTrue('amp' in self.trie)
+    self.assertFalse('ack' in self.trie)
+    self.assertTrue(self.trie.contains('ac', prefix=True))
+
+  def test_search(self):
+    board = Board(['ampedx', 'zapbus'])
+    expected = list(search_board(board, CompactTrie(words=self.trie.words())))
+    self.assertEqual(list(search_board(board, self.trie)), expected)
+    self.assertIn('amped', expected)
+
+  def test_compacts(self):
+    self.assertEqual(CompactTrie.from_trie(self.trie), CompactTrie(words=self.trie.words()))
+
+  def test_pickle(self):
+    self.assertEqual(list(pickle.loads(pickle.dumps(self.trie)).words()), list(self.trie.words()))
+
+
+class TestDictionaryCache(unittest.TestCase):
+  def setUp(self):
+    self.tmpdir = tempfile.TemporaryDirectory()
+    self.words = os.path.join(self.tmpdir.name, 'words.txt')
+    self.extra = os.path.join(self.tmpdir.name, 'extra.txt')
+    self.write(self.words, 'amp\namps\nack\nbus\n')
+    self.write(self.extra, 'zap\nbus\n')
+
+  def tearDown(self):
+    self.tmpdir.cleanup()
+
+  def write(self, path, contents):
+    with open(path, 'w') as f:
+      f.write(contents)
+
+  def log(self, cache):
+    with open(os.path.join(cache.path, 'delta.log')) as f:
+      return f.read().split()
+
+  def test_builds(self):
+    cache = DictionaryCache([self.words, self.extra])
+    trie = cache.load()
+    self.assertIsInstance(trie, MappedTrie)
+    self.assertEqual(list(trie.words()), ['ack', 'amp', 'amps', 'bus', 'zap'])
+    self.assertEqual(cache.path, DictionaryCache([self.words, self.extra]).path)
+    self.assertNotEqual(cache.path, DictionaryCache([self.words]).path)
+
+  def test_unchanged(self):
+    cache = DictionaryCache([self.words, self.extra])
+    cache.load()
+    self.assertFalse(cache.update())
+    self.assertEqual(self.log(cache), [])
+
+  def test_skips_unchanged_signature(self):
+    # A file with the same size and an old enough modification time isn't re-read, so an
+    # edit that keeps both goes unnoticed
+    old = os.stat(self.words).st_mtime_ns - 10**10
+    os.utime(self.words, ns=(old, old))
+    cache = DictionaryCache([self.words])
+    cache.load()
+    self.write(self.words, 'amp\namps\nack\nbud\n')
+    os.utime(self.words, ns=(old, old))
+    self.assertFalse(cache.update())
+    self.assertEqual(self.log(cache), [])
+
+    # A recently modified file is always rehashed
+    self.write(self.words, 'amp\namps\nack\nbun\n')
+    self.assertFalse(cache.update())
+    self.assertEqual(self.log(cache), ['+bun', '-bus'])
+
+  def test_logs_edits(self):
+    cache = DictionaryCache([self.words, self.extra])
+    cache.load()
+    self.write(self.words, 'amp\namped\nbus\n')
+    trie = cache.load()
+    self.assertIsInstance(trie, DeltaTrie)
+    self.assertEqual(list(trie.words()), ['amp', 'amped', 'bus', 'zap'])
+    self.assertEqual(self.log(cache), ['+amped', '-ack', '-amps'])
+
+  def test_shared_words_survive(self):
+    # "bus" is still in extra.txt, so removing it from words.txt doesn't remove it
+    cache = DictionaryCache([self.words, self.extra])
+    cache.load()
+    self.write(self.words, 'amp\namps\nack\n')
+    self.assertEqual(cache.load(), CompactTrie(words=['ack', 'amp', 'amps', 'bus', 'zap']))
+    self.assertEqual(self.log(cache), [])
+
+  def test_add_then_remove(self):
+    cache = DictionaryCache([self.words])
+    cache.load()
+    self.write(self.words, 'amp\namps\nack\nbus\nzap\n')
+    cache.load()
+    self.write(self.words, 'amp\namps\nack\nbus\n')
+    trie = cache.load()
+    self.assertEqual(self.log(cache), ['+zap', '-zap'])
+    self.assertIsInstance(trie, MappedTrie)
+    self.assertFalse('zap' in trie)
+
+  def test_removed_source(self):
+    DictionaryCache([self.words, self.extra], path=os.path.join(self.tmpdir.name, 'cache')).load()
+    trie = DictionaryCache([self.words], path=os.path.join(self.tmpdir.name, 'cache')).load()
+    self.assertEqual(list(trie.words()), ['ack', 'amp', 'amps', 'bus'])
+
+  def test_compacts(self):
+    cache = DictionaryCache([self.words], compact_after=2)
+    cache.load()
+    self.write(self.words, 'amp\nbus\n')
+    self.assertFalse(cache.update())
+    self.write(self.words, 'bus\n')
+    self.assertTrue(cache.update())
+    self.assertEqual(self.log(cache), [])
+    snapshots = [name for name in os.listdir(cache.path) if name.startswith('words-')]
+    self.assertEqual(len(snapshots), 1)
+    self.assertEqual(list(cache.load().words()), ['bus'])
+
+  def test_corrupt_manifest(self):
+    cache = DictionaryCache([self.words])
+    cache.load()
+    self.write(os.path.join(cache.path, 'manifest.json'), 'not json')
+    self.assertEqual(list(cache.load().words()), ['ack', 'amp', 'amps', 'bus'])
+
+  def test_requires_sources(self):
+    self.assertRaises(ValueError, lambda: DictionaryCache([]))
@@ -0,0 +1,96 @@
+import wordsearch.main as main
+from wordsearch.board import Board, CompactBoard
+from wordsearch.compact import CompactTrie
+from wordsearch.fuzzy import FuzzyHit, _advance, _state, search_board_fuzzy
+from wordsearch.trie import TrieNode
+import random
+import unittest
+
+class TestFuzzySearch(unittest.TestCase):
+  def setUp(self):
+    self.words = ['amp', 'amps', 'ack', 'bus', 'bar', 'a', 'ma', 'cab', 'backs', 'mapsack']
+    random.seed(1234)
+    self.rows = [
+      [[random.choice('abcmpksu') for _ in range(width)] for _ in range(height)]
+      for width, height in [(1, 1), (3, 1), (1, 5), (9, 7)]
+    ]
+
+  def run_hits(self, board, root, x, y, direction, **options):
+    return [hit for hit in search_board_fuzzy(board, root, **options)
+            if (hit.x, hit.y, hit.direction) == (x, y, direction)]
+
+  def test_exact_matches_search_board(self):
+    for root in (TrieNode(words=self.words), CompactTrie(words=self.words)):
+      for rows in self.rows:
+        hits = list(search_board_fuzzy(Board(rows), root, max_substitutions=0))
+        self.assertEqual([hit.word for hit in hits], list(main.search_board(Board(rows), root)))
+        self.assertTrue(all(hit.substitutions == () for hit in hits))
+
+  def test_substitution(self):
+    root = TrieNode(words=['banker', 'bank'])
+    board = Board([list('bankes')])
+    self.assertEqual(self.run_hits(board, root, 0, 0, (1, 0), max_substitutions=0), [
+      FuzzyHit('bank', 0, 0, (1, 0), 4, ()),
+    ])
+    self.assertEqual(self.run_hits(board, root, 0, 0, (1, 0), max_substitutions=1), [
+      FuzzyHit('banker', 0, 0, (1, 0), 6, ((5, 's', 'r'),)),
+    ])
+
+  def test_budget(self):
+    root = TrieNode(words=['banker'])
+    board = CompactBoard(['bonkes'])
+    self.assertEqual(self.run_hits(board, root, 0, 0, (1, 0), max_substitutions=1), [])
+    hit, = self.run_hits(board, root, 0, 0, (1, 0), max_substitutions=2)
+    self.assertEqual(hit.substitutions, ((1, 'o', 'a'), (5, 's', 'r')))
+
+  def test_wildcard(self):
+    root = TrieNode(words=['banker', 'bunker', 'bank'])
+    board = CompactBoard(['b?nker'])
+    # Wildcards are free, and the first word in alphabetical order wins a tie
+    hit, = self.run_hits(board, root, 0, 0, (1, 0), max_substitutions=0)
+    self.assertEqual(hit, FuzzyHit('banker', 0, 0, (1, 0), 6, ((1, '?', 'a'),)))
+    self.assertEqual(self.run_hits(board, root, 0, 0, (1, 0), max_substitutions=0, wildcard=None), [])
+
+  def test_fewest_substitutions(self):
+    root = TrieNode(words=['cat', 'cot', 'bat'])
+    hit, = self.run_hits(Board([list('cbt')]), root, 0, 0, (1, 0), max_substitutions=2)
+    self.assertEqual((hit.word, hit.substitutions), ('cat', ((1, 'b', 'a'),)))
+
+  def test_length_bounds(self):
+    root = TrieNode(words=['banker', 'bank'])
+    board = Board([list('bankes')])
+    self.assertEqual(self.run_hits(board, root, 0, 0, (1, 0), max_length=5), [
+      FuzzyHit('bank', 0, 0, (1, 0), 4, ()),
+    ])
+    self.assertEqual(self.run_hits(board, root, 0, 0, (1, 0), max_substitutions=0, min_length=5), [])
+    self.assertEqual(list(search_board_fuzzy(board, TrieNode())), [])
+
+  def test_finds_more_with_budget(self):
+    root = TrieNode(words=self.words)
+    board = Board(self.rows[-1])
+    exact = list(search_board_fuzzy(board, root, max_substitutions=0))
+    fuzzy = list(search_board_fuzzy(board, root, max_substitutions=1))
+    self.assertGreater(len(fuzzy), len(exact))
+    for hit in fuzzy:
+      self.assertIn(hit.word, self.words)
+      self.assertLessEqual(len(hit.substitutions), 1)
+      letters = [board[hit.x + hit.direction[0] * i, hit.y + hit.direction[1] * i] for i in range(hit.length)]
+      for offset, board_letter, word_letter in hit.substitutions:
+        self.assertEqual(letters[offset], board_letter)
+        letters[offset] = word_letter
+      self.assertEqual(''.join(letters), hit.word)
+
+  def test_frontier_merges_shared_nodes(self):
+    # In a DAWG every stem shares its "ake" and endings, so wildcards reach far fewer
+    # nodes than paths. Compact views of the same node must merge like the nodes do.
+    words = [stem + ending for stem in ('bake', 'cake', 'fake', 'make', 'rake', 'take')
+             for ending in ('', 's', 'r', 'rs')]
+    dawg = TrieNode.from_sorted(sorted(words), minimize=True)
+    sizes = []
+    for root in (dawg, CompactTrie.from_trie(dawg)):
+      frontier = {_state(root): (root, 0, '', ())}
+      for depth in range(1, 6):
+        frontier = _advance(frontier, '?', depth, 6 - depth, 0, '?', 0)
+        sizes.append(len(frontier))
+    # Six first letters, then one node for every stem, until "r" and "s" part ways
+    self.assertEqual(sizes, [6, 1, 1, 1, 2] * 2)
@@ -0,0 +1,37 @@
+import wordsearch.main as main
+from wordsearch.generate import letter_weights, plant_words
+from wordsearch.trie import TrieNode
+import random
+import unittest
+
+class TestLetterWeights(unittest.TestCase):
+  def test_counts(self):
+    self.assertEqual(letter_weights(['amp', 'bus', 'ab']), {'a': 2, 'm': 1, 'p': 1, 'b': 2, 'u': 1, 's': 1})
+
+
+class TestPlantWords(unittest.TestCase):
+  def setUp(self):
+    self.words = ['banker', 'scientist', 'lawyer', 'amp']
+
+  def test_planted(self):
+    rng = random.Random(3)
+    board, hits = plant_words(main.random_board(12, 12, rng), self.words, rng)
+    self.assertEqual([hit.word for hit in hits], self.words)
+    for hit in hits:
+      dx, dy = hit.direction
+      self.assertEqual(''.join(board[hit.x + i * dx, hit.y + i * dy] for i in range(hit.length)), hit.word)
+
+  def test_found_by_search(self):
+    rng = random.Random(5)
+    board, hits = plant_words(main.random_board(15, 15, rng), self.words, rng)
+    found = set(main.search_board_hits(board, TrieNode(words=self.words)))
+    self.assertTrue(set(hits) <= found)
+
+  def test_reproducible(self):
+    first = plant_words(main.random_board(10, 10, random.Random(1)), self.words, random.Random(2))
+    second = plant_words(main.random_board(10, 10, random.Random(1)), self.words, random.Random(2))
+    self.assertEqual(first, second)
+
+  def test_does_not_fit(self):
+    board = main.random_board(3, 3)
+    self.assertRaises(ValueError, lambda: plant_words(board, ['scientist'], attempts=10))
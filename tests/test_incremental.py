@@ -0,0 +1,54 @@
+from wordsearch.incremental import IncrementalSearch
+from wordsearch.board import Board, CompactBoard
+from wordsearch.trie import TrieNode
+from wordsearch.compact import CompactTrie
+import wordsearch.main as main
+import random
+import unittest
+
+class TestIncrementalSearch(unittest.TestCase):
+  def setUp(self):
+    self.words = ['amp', 'amps', 'ack', 'bus', 'bar', 'a', 'ma', 'cab', 'backs', 'cat', 'car']
+
+  def test_initial(self):
+    root = TrieNode(words=self.words)
+    board = main.random_board(8, 6)
+    search = IncrementalSearch(board, root)
+    self.assertEqual(list(search), list(main.search_board(board, root)))
+    self.assertEqual(len(search), len(list(main.search_board(board, root))))
+
+  def test_update(self):
+    search = IncrementalSearch(Board([['c', 'a', 't']]), TrieNode(words=['cat', 'car']))
+    added, removed = search.update(2, 0, 'r')
+    self.assertEqual(added, [main.Hit('car', 0, 0, (1, 0), 3)])
+    self.assertEqual(removed, [main.Hit('cat', 0, 0, (1, 0), 3)])
+    self.assertEqual(list(search), ['car'])
+
+  def test_update_folds(self):
+    board = CompactBoard(['cat'])
+    search = IncrementalSearch(board, TrieNode(words=['cat', 'car']))
+    added, removed = search.update(2, 0, 'R')
+    self.assertEqual(board[2, 0], 'r')
+    self.assertEqual(added, [main.Hit('car', 0, 0, (1, 0), 3)])
+    self.assertEqual(list(search), list(main.search_board(board, search.rootnode)))
+
+  def test_update_no_change(self):
+    search = IncrementalSearch(Board([['c', 'a', 't']]), TrieNode(words=['cat', 'car']))
+    self.assertEqual(search.update(2, 0, 't'), ([], []))
+
+  def test_random_edits_match_full_search(self):
+    random.seed(99)
+    for root in (TrieNode(words=self.words), CompactTrie(words=self.words)):
+      board = CompactBoard([[random.choice('abcmpkstur') for _ in range(9)] for _ in range(7)])
+      search = IncrementalSearch(board, root)
+      for _ in range(60):
+        x, y = random.randrange(9), random.randrange(7)
+        before = list(search.hits())
+        added, removed = search.update(x, y, random.choice('abcmpkstur'))
+        self.assertEqual(list(search), list(main.search_board(board, root)))
+        after = set(before) - set(removed) | set(added)
+        self.assertEqual(after, set(search.hits()))
+
+  def test_out_of_range(self):
+    search = IncrementalSearch(Board([['c', 'a', 't']]), TrieNode(words=['cat']))
+    self.assertRaises(IndexError, lambda: search.update(-1, 0, 'a'))
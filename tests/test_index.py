@@ -0,0 +1,40 @@
+from wordsearch.compact import CompactTrie
+import wordsearch.index as index
+import os, pickle, tempfile
+import unittest
+
+class TestIndex(unittest.TestCase):
+  def setUp(self):
+    self.tmpdir = tempfile.TemporaryDirectory()
+    self.index = os.path.join(self.tmpdir.name, 'words.idx')
+
+  def tearDown(self):
+    self.tmpdir.cleanup()
+
+  def test_round_trip(self):
+    trie = CompactTrie(words=['amp', 'amps', 'ack', 'bus', 'a'])
+    index.write_index(trie, self.index, 123.5)
+    mtime, loaded = index.load_index(self.index)
+    self.assertEqual(mtime, 123.5)
+    self.assertEqual(loaded, trie)
+    self.assertIsInstance(loaded._offsets, memoryview)
+    self.assertTrue('amps' in loaded)
+    self.assertFalse('am' in loaded)
+
+  def test_bad_magic(self):
+    with open(self.index, 'wb') as f:
+      f.write(b'\0' * 64)
+    self.assertRaises(index.IndexFormatError, lambda: index.load_index(self.index))
+
+  def test_too_short(self):
+    with open(self.index, 'wb') as f:
+      f.write(b'WSIX')
+    self.assertRaises(index.IndexFormatError, lambda: index.load_index(self.index))
+
+  def test_pickle_remaps(self):
+    index.write_index(CompactTrie(words=['amp', 'amps', 'ack', 'bus']), self.index, 0)
+    _, loaded = index.load_index(self.index)
+    unpickled = pickle.loads(pickle.dumps(loaded))
+    self.assertIsInstance(unpickled, index.MappedTrie)
+    self.assertEqual(unpickled.path, self.index)
+    self.assertEqual(unpickled, loaded)
@@ -0,0 +1,40 @@
+import wordsearch.inline as inline
+import wordsearch.main as main
+from wordsearch.board import Board, CompactBoard
+from wordsearch.stats import SearchStats
+from wordsearch.trie import TrieNode
+from tests.engine_cases import WORDS, EngineCases
+import unittest
+
+class TestInlineSearch(EngineCases, unittest.TestCase):
+  search_board = staticmethod(inline.search_board)
+
+  def test_without_prefilter(self):
+    for root in self.roots:
+      for rows in self.rows:
+        self.assertEqual(
+          list(inline.search_board(CompactBoard(rows), root, prefilter=False)),
+          list(main.search_board(Board(rows), root)),
+        )
+
+  def test_length_bounds(self):
+    for root in self.roots:
+      for rows in self.rows:
+        for min_length, max_length in [(1, None), (3, None), (8, None), (None, 1), (None, 3), (2, 4), (4, 2)]:
+          self.assertEqual(
+            list(inline.search_board(CompactBoard(rows), root, min_length=min_length, max_length=max_length)),
+            list(main.search_board(Board(rows), root, min_length=min_length, max_length=max_length)),
+          )
+
+  def test_delegates(self):
+    root = TrieNode(words=WORDS)
+    board = Board(self.rows[-1])
+    expected = list(main.search_board(board, root))
+    self.assertEqual(list(inline.search_board(board, root, workers=2)), expected)
+    stats = SearchStats()
+    self.assertEqual(list(inline.search_board(board, root, stats=stats)), expected)
+    self.assertGreater(stats.runs, 0)
+
+  def test_empty_trie(self):
+    self.assertEqual(list(inline.search_board(Board(self.rows[-1]), TrieNode(), min_length=1)), [])
+    self.assertEqual(list(inline.search_board(Board(self.rows[-1]), TrieNode())), [])
@@ -1,7 +1,8 @@
 import wordsearch.main as main
 from wordsearch.board import Board
 from wordsearch.trie import TrieNode
-import string
+from wordsearch.compact import CompactTrie
+import gc, random, string
 import unittest
 
 class TestBoardRun(unittest.TestCase):
@@ -104,6 +105,107 @@ class TestSearchBoard(unittest.TestCase):
     self.assertEqual(set(main.search_board(board, root)), {'amp', 'ack', 'bus'})
 
 
+class TestParallelSearch(unittest.TestCase):
+  def setUp(self):
+    self.root = TrieNode(words=['amp', 'amps', 'ack', 'bus', 'bar', 'a', 'ma', 'cab', 'backs'])
+
+  def test_matches_serial(self):
+    random.seed(1234)
+    for width, height in [(1, 1), (5, 1), (1, 9), (7, 13)]:
+      board = Board([[random.choice('abcmpksu') for _ in range(width)] for _ in range(height)])
+      self.assertEqual(
+        list(main.search_board(board, self.root, workers=3)),
+        list(main.search_board(board, self.root)),
+      )
+
+  def test_compact_trie(self):
+    board = main.random_board(6, 10)
+    root = CompactTrie(words=['amp', 'amps', 'ack', 'bus', 'bar', 'a', 'ma'])
+    self.assertEqual(
+      list(main.search_board(board, root, workers=2)),
+      list(main.search_board(board, root)),
+    )
+
+
+class TestLengthBoundedSearch(unittest.TestCase):
+  def setUp(self):
+    self.words = ['amp', 'amps', 'ack', 'bus', 'bar', 'a', 'ma', 'cab', 'backs', 'mapsack']
+    random.seed(4321)
+    self.boards = [
+      Board([[random.choice('abcmpksu') for _ in range(width)] for _ in range(height)])
+      for width, height in [(1, 1), (3, 1), (1, 5), (9, 7)]
+    ]
+
+  def test_min_length(self):
+    for root in (TrieNode(words=self.words), CompactTrie(words=self.words)):
+      for board in self.boards:
+        for min_length in (1, 2, 3, 5, 8):
+          self.assertEqual(
+            list(main.search_board(board, root, min_length=min_length)),
+            [w for w in main.search_board(board, root) if len(w) >= min_length],
+          )
+
+  def test_max_length(self):
+    for board in self.boards:
+      for min_length, max_length in [(None, 1), (None, 3), (2, 4), (3, 3), (4, 2)]:
+        # Equivalent to searching with only the short enough words, then filtering
+        short_root = TrieNode(words=[w for w in self.words if len(w) <= max_length])
+        expected = [w for w in main.search_board(board, short_root) if len(w) >= (min_length or 0)]
+        for root in (TrieNode(words=self.words), CompactTrie(words=self.words)):
+          self.assertEqual(
+            list(main.search_board(board, root, min_length=min_length, max_length=max_length)),
+            expected,
+          )
+
+  def test_parallel(self):
+    root = TrieNode(words=self.words)
+    board = self.boards[-1]
+    self.assertEqual(
+      list(main.search_board(board, root, workers=2, min_length=3, max_length=4)),
+      list(main.search_board(board, root, min_length=3, max_length=4)),
+    )
+
+  def test_empty_trie(self):
+    self.assertEqual(list(main.search_board(self.boards[-1], TrieNode(), min_length=1)), [])
+
+
+class TestSearchBoardHits(unittest.TestCase):
+  def setUp(self):
+    self.root = TrieNode(words=['a', 'am', 'amp', 'amps', 'ack', 'bus', 'bar'])
+    self.board = Board([
+      ['z', 'a', 'm', 'x'],
+      ['s', 'a', 'u', 'b'],
+      ['u', 'm', 'c', 'a'],
+      ['b', 'p', 'a', 'k'],
+    ])
+
+  def test_hits(self):
+    hits = list(main.search_board_hits(self.board, self.root))
+    self.assertIn(main.Hit('amp', 1, 1, (0, 1), 3), hits)
+    self.assertIn(main.Hit('am', 1, 1, (0, 1), 2), hits)
+    self.assertIn(main.Hit('bus', 0, 3, (0, -1), 3), hits)
+    self.assertIn(main.Hit('ack', 1, 1, (1, 1), 3), hits)
+    for hit in hits:
+      dx, dy = hit.direction
+      letters = ''.join(self.board[hit.x + i * dx, hit.y + i * dy] for i in range(hit.length))
+      self.assertEqual(letters, hit.word)
+
+  def test_longest_hit_per_run_matches_search_board(self):
+    longest = {}
+    for hit in main.search_board_hits(self.board, self.root):
+      longest[hit.x, hit.y, hit.direction] = hit.word
+    self.assertEqual(list(longest.values()), list(main.search_board(self.board, self.root)))
+
+  def test_min_length(self):
+    hits = list(main.search_board_hits(self.board, self.root, min_length=3))
+    self.assertTrue(hits)
+    self.assertTrue(all(hit.length >= 3 for hit in hits))
+    self.assertEqual(
+      hits,
+      [hit for hit in main.search_board_hits(self.board, self.root) if hit.length >= 3],
+    )
+
+
 class TestRandomBoard(unittest.TestCase):
   def test_dimensions(self):
     def verify_dimensions(width, height):
@@ -120,3 +222,62 @@ class TestRandomBoard(unittest.TestCase):
     board = main.random_board(10, 10)
     for _, _, letter in board:
       self.assertIn(letter, string.ascii_lowercase)
+
+  def test_seeded(self):
+    first = main.random_board(30, 20, random.Random(7))
+    self.assertEqual(main.random_board(30, 20, random.Random(7)), first)
+    self.assertNotEqual(main.random_board(30, 20, random.Random(8)), first)
+
+  def test_weights(self):
+    board = main.random_board(100, 100, random.Random(1), {'a': 3, 'b': 1, 'c': 0})
+    letters = bytes(board.buffer)
+    self.assertEqual(set(letters), set(b'ab'))
+    self.assertAlmostEqual(letters.count(b'a') / len(letters), 0.75, delta=0.02)
+
+  def test_uniform_weights(self):
+    board = main.random_board(50, 50, random.Random(1), {'x': 2, 'y': 2})
+    self.assertEqual(set(bytes(board.buffer)), set(b'xy'))
+
+  def test_bad_weights(self):
+    self.assertRaises(ValueError, lambda: main.random_board(5, 5, weights={'a': 0}))
+    self.assertRaises(ValueError, lambda: main.random_board(5, 5, weights={'ab': 1}))
+
+  def test_random_bytes_without_randbytes(self):
+    class OldRandom:
+      # Only what random.Random has before Python 3.9
+      def __init__(self, seed):
+        self.getrandbits = random.Random(seed).getrandbits
+    self.assertEqual(main._random_bytes(OldRandom(5), 100), main._random_bytes(random.Random(5), 100))
+    self.assertEqual(main._random_bytes(OldRandom(5), 0), b'')
+
+
+class TestPerTrie(unittest.TestCase):
+  def test_built_once(self):
+    cache = {}
+    built = []
+    def build(rootnode):
+      built.append(rootnode)
+      return len(built)
+
+    trie = TrieNode(words=['cat'])
+    self.assertEqual(main._per_trie(cache, trie, build), 1)
+    self.assertEqual(main._per_trie(cache, trie, build), 1)
+    self.assertEqual(built, [trie])
+
+  def test_rebuilt_after_change(self):
+    cache = {}
+    trie = TrieNode(words=['cat'])
+    self.assertEqual(main._per_trie(cache, trie, lambda rootnode: set(rootnode.children)), {'c'})
+    trie.index('dog')
+    self.assertEqual(main._per_trie(cache, trie, lambda rootnode: set(rootnode.children)), {'c', 'd'})
+    trie.remove('cat')
+    self.assertEqual(main._per_trie(cache, trie, lambda rootnode: set(rootnode.children)), {'d'})
+
+  def test_dropped_with_trie(self):
+    cache = {}
+    trie = TrieNode(words=['cat'])
+    main._per_trie(cache, trie, lambda rootnode: 'prepared')
+    self.assertEqual(len(cache), 1)
+    del trie
+    gc.collect()
+    self.assertEqual(cache, {})
@@ -0,0 +1,126 @@
+from wordsearch.board import Board, CompactBoard
+from wordsearch.compact import CompactTrie
+from wordsearch.dictionary import DeltaTrie
+from wordsearch.index import load_index, write_index
+from wordsearch.memo import ResultCache, board_digest, dictionary_digest
+from wordsearch.trie import TrieNode
+import wordsearch.main as main
+import os, random, tempfile
+import unittest
+
+class TestDigests(unittest.TestCase):
+  def test_board_digest(self):
+    self.assertEqual(board_digest(CompactBoard(['ab', 'cd'])), board_digest(CompactBoard(['ab', 'cd'])))
+    self.assertNotEqual(board_digest(CompactBoard(['ab', 'cd'])), board_digest(CompactBoard(['abcd'])))
+    self.assertNotEqual(board_digest(CompactBoard(['ab', 'cd'])), board_digest(CompactBoard(['ab', 'ce'])))
+    self.assertEqual(board_digest(Board(['ab', 'cd'])), board_digest(Board(['ab', 'cd'])))
+
+  def test_dictionary_digest(self):
+    with tempfile.TemporaryDirectory() as tmpdir:
+      path = os.path.join(tmpdir, 'words.idx')
+      write_index(CompactTrie(words=['amp', 'bus']), path, 0)
+      mapped = load_index(path)[1]
+      self.assertIsNotNone(dictionary_digest(mapped))
+      self.assertEqual(dictionary_digest(mapped), dictionary_digest(load_index(path)[1]))
+
+      first = DeltaTrie(mapped, TrieNode(words=['ack']))
+      second = DeltaTrie(mapped, TrieNode(words=['ack']), {'bus'})
+      self.assertTrue(dictionary_digest(first).startswith('delta:'))
+      self.assertNotEqual(dictionary_digest(first), dictionary_digest(second))
+    self.assertIsNone(dictionary_digest(TrieNode(words=['amp'])))
+
+  def test_changed_mapped_trie_has_no_digest(self):
+    with tempfile.TemporaryDirectory() as tmpdir:
+      path = os.path.join(tmpdir, 'words.idx')
+      write_index(CompactTrie(words=['amp', 'bus']), path, 0)
+      mapped = load_index(path)[1]
+      mapped.index('ack')
+      self.assertIsNone(dictionary_digest(mapped))
+
+
+class TestResultCache(unittest.TestCase):
+  def setUp(self):
+    self.root = TrieNode(words=['amp', 'amps', 'ack', 'bus', 'bar', 'a', 'ma'])
+    self.boards = [main.random_board(8, 8) for _ in range(3)]
+
+  def test_search(self):
+    cache = ResultCache()
+    for _ in range(2):
+      for board in self.boards:
+        self.assertEqual(cache.search(board, self.root), list(main.search_board(board, self.root)))
+    self.assertEqual((cache.hits, cache.misses), (3, 3))
+
+  def test_changed_trie(self):
+    cache = ResultCache()
+    board = CompactBoard(['catdog'])
+    root = TrieNode(words=['cat'])
+    self.assertEqual(cache.search(board, root), ['cat'])
+    root.index('dog')
+    self.assertEqual(cache.search(board, root), ['cat', 'dog'])
+    root.remove('cat')
+    self.assertEqual(cache.search(board, root), ['dog'])
+
+  def test_freed_trie(self):
+    # New tries may well reuse the id of a freed one, but mustn't get its results
+    cache = ResultCache()
+    board = CompactBoard(['catdog'])
+    self.assertEqual(cache.search(board, TrieNode(words=['cat'])), ['cat'])
+    for words in (['dog'], ['at'], ['cat', 'dog']):
+      self.assertEqual(cache.search(board, TrieNode(words=words)), words)
+    self.assertEqual(cache.hits, 0)
+
+  def test_options_are_keyed(self):
+    cache = ResultCache()
+    board = self.boards[0]
+    self.assertEqual(cache.search(board, self.root, min_length=3), list(main.search_board(board, self.root, min_length=3)))
+    self.assertEqual(cache.search(board, self.root), list(main.search_board(board, self.root)))
+    self.assertEqual(cache.search(board, self.root, 'aho'), list(main.search_board(board, self.root)))
+    self.assertEqual(cache.misses, 3)
+    # The number of workers doesn't change the results
+    cache.search(board, self.root, workers=1)
+    self.assertEqual(cache.hits, 1)
+
+  def test_evicts(self):
+    cache = ResultCache(max_entries=2)
+    for board in self.boards + self.boards[:1]:
+      cache.search(board, self.root)
+    self.assertEqual((len(cache), cache.evictions, cache.hits, cache.misses), (2, 2, 0, 4))
+
+  def test_disk(self):
+    with tempfile.TemporaryDirectory() as tmpdir:
+      path = os.path.join(tmpdir, 'words.idx')
+      write_index(CompactTrie(words=['amp', 'amps', 'ack', 'bus']), path, 0)
+      trie = load_index(path)[1]
+      directory = os.path.join(tmpdir, 'results')
+
+      expected = [ResultCache(directory=directory).search(board, trie) for board in self.boards]
+      cache = ResultCache(directory=directory)
+      self.assertEqual([cache.search(board, trie) for board in self.boards], expected)
+      self.assertEqual((cache.hits, cache.disk_hits, cache.misses), (3, 3, 0))
+
+      cache = ResultCache(directory=directory, max_disk_entries=1)
+      cache.search(main.random_board(8, 8), trie)
+      self.assertEqual(len(os.listdir(directory)), 1)
+      self.assertEqual(cache.disk_evictions, 3)
+
+  def test_disk_trimmed_in_batches(self):
+    with tempfile.TemporaryDirectory() as tmpdir:
+      path = os.path.join(tmpdir, 'words.idx')
+      write_index(CompactTrie(words=['amp', 'amps', 'ack', 'bus']), path, 0)
+      trie = load_index(path)[1]
+      directory = os.path.join(tmpdir, 'results')
+
+      cache = ResultCache(directory=directory, max_disk_entries=20)
+      for seed in range(41):
+        cache.search(main.random_board(6, 6, random.Random(seed)), trie)
+
+      # Trimmed down to 18 files on the 21st, 24th, ... 39th writes
+      self.assertEqual(len(os.listdir(directory)), 20)
+      self.assertEqual(cache._disk_entries, 20)
+      self.assertEqual(cache.disk_evictions, 7 * 3)
+
+  def test_memory_only_tries(self):
+    with tempfile.TemporaryDirectory() as tmpdir:
+      cache = ResultCache(directory=tmpdir)
+      cache.search(self.boards[0], self.root)
+      self.assertEqual(os.listdir(tmpdir), [])
@@ -0,0 +1,50 @@
+from wordsearch.output import ThreadedWriter, unique, write_words
+import io
+import unittest
+
+class BrokenFile(io.StringIO):
+  def write(self, chunk):
+    raise BrokenPipeError()
+
+
+class TestWriteWords(unittest.TestCase):
+  def setUp(self):
+    self.words = ['amp', 'bus', 'ack'] * 5
+
+  def test_batched(self):
+    for batch_size in (1, 2, 4, 100):
+      out = io.StringIO()
+      self.assertEqual(write_words(self.words, out, batch_size=batch_size), 15)
+      self.assertEqual(out.getvalue(), ''.join(word + '\n' for word in self.words))
+
+  def test_threaded(self):
+    out = io.StringIO()
+    self.assertEqual(write_words(iter(self.words), out, batch_size=2, threaded=True, queue_size=1), 15)
+    self.assertEqual(out.getvalue().split(), self.words)
+
+  def test_empty(self):
+    out = io.StringIO()
+    self.assertEqual(write_words([], out, threaded=True), 0)
+    self.assertEqual(out.getvalue(), '')
+
+  def test_threaded_error(self):
+    self.assertRaises(BrokenPipeError, lambda: write_words(self.words, BrokenFile(), batch_size=1, threaded=True))
+
+
+class TestThreadedWriter(unittest.TestCase):
+  def test_writes_in_order(self):
+    out = io.StringIO()
+    with ThreadedWriter(out, queue_size=2) as writer:
+      for i in range(100):
+        writer.write('{}\n'.format(i))
+    self.assertEqual(out.getvalue().split(), [str(i) for i in range(100)])
+
+
+class TestUnique(unittest.TestCase):
+  def test_unique(self):
+    self.assertEqual(list(unique(['amp', 'bus', 'amp', 'ack', 'bus'])), ['amp', 'bus', 'ack'])
+
+  def test_bounded(self):
+    # Only the 2 most recently seen words are remembered
+    words = ['amp', 'bus', 'amp', 'ack', 'bus', 'ack']
+    self.assertEqual(list(unique(words, max_size=2)), ['amp', 'bus', 'ack', 'bus'])
@@ -0,0 +1,78 @@
+import wordsearch.main as main
+from wordsearch.board import Board, CompactBoard
+from wordsearch.compact import CompactTrie
+from wordsearch.prefilter import Prefilter, prefilter_for
+from wordsearch.trie import TrieNode
+import random
+import unittest
+
+class TestPrefilter(unittest.TestCase):
+  def setUp(self):
+    self.words = ['amp', 'amps', 'ack', 'bus', 'bar', 'a', 'ma', 'cab', 'backs', 'mapsack']
+    random.seed(1357)
+    self.boards = [
+      Board([[random.choice('abcmpksux') for _ in range(width)] for _ in range(height)])
+      for width, height in [(1, 1), (3, 1), (1, 5), (2, 2), (9, 7), (12, 12)]
+    ]
+
+  def yields_word(self, board, root, x, y, direction):
+    """Whether the run from (x, y) in "direction" passes through a word"""
+    node = root
+    for letter in main.start_board_run((x, y), direction, board):
+      node = node.children.get(letter)
+      if node is None:
+        return False
+      if node.word_end:
+        return True
+    return False
+
+  def test_no_live_run_ruled_out(self):
+    root = TrieNode(words=self.words)
+    for board in self.boards:
+      live = Prefilter(root).live_starts(board, main._directions)
+      ruled_out = 0
+      for x, y, _ in board:
+        for direction in main._directions:
+          flag = live[direction][y * board.width + x]
+          if not flag:
+            ruled_out += 1
+            self.assertFalse(self.yields_word(board, root, x, y, direction))
+      if board.width * board.height > 4:
+        self.assertGreater(ruled_out, 0)
+
+  def test_compact_board(self):
+    root = CompactTrie(words=self.words)
+    for board in self.boards:
+      compact = CompactBoard([[board[x, y] for x in range(board.width)] for y in range(board.height)])
+      self.assertEqual(
+        Prefilter(root).live_starts(compact, main._directions),
+        Prefilter(root).live_starts(board, main._directions),
+      )
+
+  def test_same_words(self):
+    for root in (TrieNode(words=self.words), CompactTrie(words=self.words)):
+      for board in self.boards:
+        for min_length in (None, 3):
+          self.assertEqual(
+            list(main.search_board(board, root, min_length=min_length)),
+            list(main.search_board(board, root, min_length=min_length, prefilter=False)),
+          )
+
+  def test_too_many_letters(self):
+    root = TrieNode(words=[chr(0x4e00 + i) for i in range(300)])
+    self.assertRaises(ValueError, lambda: Prefilter(root))
+    self.assertIsNone(prefilter_for(root))
+    board = Board([[chr(0x4e00), chr(0x4e01)]])
+    self.assertEqual(list(main.search_board(board, root)), [chr(0x4e00)] * 8 + [chr(0x4e01)] * 8)
+
+  def test_trie_changed_between_searches(self):
+    board = CompactBoard(['catdog'])
+    for root in (TrieNode(words=['cat']), CompactTrie(words=['cat'])):
+      self.assertEqual(list(main.search_board(board, root)), ['cat'])
+      root.index('dog')
+      self.assertEqual(list(main.search_board(board, root)), ['cat', 'dog'])
+
+    root = TrieNode(words=['cat', 'dog'])
+    self.assertEqual(list(main.search_board(board, root)), ['cat', 'dog'])
+    root.remove('cat')
+    self.assertEqual(list(main.search_board(board, root)), ['dog'])
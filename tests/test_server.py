@@ -0,0 +1,149 @@
+from wordsearch.server import SearchServer, parse_args
+from wordsearch.client import Client, ServerError
+from wordsearch.board import CompactBoard
+from wordsearch.trie import TrieNode
+import wordsearch.main as main
+import asyncio, contextlib, io, json, os, tempfile
+import unittest
+
+class TestSearchServer(unittest.TestCase):
+  def setUp(self):
+    self.tmpdir = tempfile.TemporaryDirectory()
+    self.path = os.path.join(self.tmpdir.name, 'ws.sock')
+    self.dictionaries = {
+      'main': TrieNode(words=['amp', 'amps', 'ack', 'bus', 'bar', 'cat', 'ax']),
+      'other': TrieNode(words=['zam', 'sub']),
+    }
+    self.board = ['zamx', 'saub', 'umca', 'bpak']
+
+  def tearDown(self):
+    self.tmpdir.cleanup()
+
+  def run_with_server(self, scenario, **options):
+    """Run the coroutine function "scenario" while a server listens on self.path"""
+    async def run():
+      server = SearchServer(self.dictionaries, workers=1, **options)
+      self.server = server
+      listener = await server.start_unix(self.path)
+      try:
+        return await scenario()
+      finally:
+        listener.close()
+        await listener.wait_closed()
+        server.close()
+    return asyncio.run(run())
+
+  def test_search(self):
+    async def scenario():
+      reader, writer = await asyncio.open_unix_connection(self.path)
+      requests = [
+        {'id': 1, 'board': self.board},
+        {'id': 2, 'board': self.board, 'min_word_length': 4},
+        {'id': 3, 'board': self.board, 'dictionary': 'other'},
+      ]
+      responses = []
+      for request in requests:
+        writer.write(json.dumps(request).encode() + b'\n')
+        responses.append(json.loads(await reader.readline()))
+      writer.close()
+      return responses
+
+    responses = self.run_with_server(scenario)
+    expected = list(main.search_board(CompactBoard(self.board), self.dictionaries['main']))
+    self.assertEqual(responses[0], {'id': 1, 'words': expected})
+    self.assertEqual(responses[1], {'id': 2, 'words': [w for w in expected if len(w) >= 4]})
+    self.assertEqual(set(responses[2]['words']), {'zam', 'sub'})
+
+  def test_result_cache(self):
+    async def scenario():
+      reader, writer = await asyncio.open_unix_connection(self.path)
+      responses = []
+      for request in [{'id': 1, 'board': self.board}, {'id': 2, 'board': self.board},
+                      {'id': 3, 'board': self.board, 'dictionary': 'other'}, {'id': 4, 'board': ['ab', 'c']}]:
+        writer.write(json.dumps(request).encode() + b'\n')
+        responses.append(json.loads(await reader.readline()))
+      writer.close()
+      return responses
+
+    responses = self.run_with_server(scenario, cache_size=8)
+    self.assertEqual(responses[1], dict(responses[0], id=2))
+    self.assertEqual(set(responses[2]['words']), {'zam', 'sub'})
+    self.assertIn('error', responses[3])
+    cache = self.server.result_cache
+    self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 2, 2))
+
+  def test_errors(self):
+    async def scenario():
+      reader, writer = await asyncio.open_unix_connection(self.path)
+      responses = []
+      for line in [b'not json', b'[1]', b'{"board": 5}', b'{"board": ["ab"], "dictionary": "nope"}',
+                   b'{"board": ["ab", "c"]}']:
+        writer.write(line + b'\n')
+        responses.append(json.loads(await reader.readline()))
+      writer.close()
+      return responses
+
+    for response in self.run_with_server(scenario):
+      self.assertIn('error', response)
+
+  def test_errors_keep_connection(self):
+    async def scenario():
+      reader, writer = await asyncio.open_unix_connection(self.path)
+      responses = []
+      # An unhashable dictionary, a search that fails in the server, then a good request
+      for request in [{'id': 1, 'board': self.board, 'dictionary': ['main']},
+                      {'id': 2, 'board': self.board, 'min_word_length': 1e400},
+                      {'id': 3, 'board': self.board}]:
+        writer.write(json.dumps(request).encode() + b'\n')
+        responses.append(json.loads(await reader.readline()))
+      writer.close()
+      return responses
+
+    responses = self.run_with_server(scenario)
+    self.assertEqual([r['id'] for r in responses], [1, 2, 3])
+    self.assertIn('error', responses[0])
+    self.assertIn('error', responses[1])
+    self.assertIn('words', responses[2])
+
+  def test_worker_killed(self):
+    async def scenario():
+      reader, writer = await asyncio.open_unix_connection(self.path)
+      responses = []
+      for request_id in range(1, 4):
+        if request_id == 2:
+          for process in list(self.server._executor._processes.values()):
+            process.kill()
+            process.join()
+        writer.write(json.dumps({'id': request_id, 'board': self.board}).encode() + b'\n')
+        responses.append(json.loads(await reader.readline()))
+      writer.close()
+      return responses
+
+    # The search on the killed pool fails, and the next one gets a new pool
+    responses = self.run_with_server(scenario)
+    self.assertIn('words', responses[0])
+    self.assertEqual(responses[1]['id'], 2)
+    self.assertIn('error', responses[1])
+    self.assertEqual(responses[2], dict(responses[0], id=3))
+
+  def test_client(self):
+    async def scenario():
+      def use_client():
+        with Client(path=self.path) as client:
+          words = client.search(self.board, min_word_length=3)
+          with self.assertRaises(ServerError):
+            client.search(self.board, dictionary='nope')
+          return words
+      return await asyncio.get_running_loop().run_in_executor(None, use_client)
+
+    expected = list(main.search_board(CompactBoard(self.board), self.dictionaries['main']))
+    self.assertEqual(self.run_with_server(scenario), [w for w in expected if len(w) >= 3])
+
+  def test_no_dictionaries(self):
+    self.assertRaises(ValueError, lambda: SearchServer({}))
+
+  def test_duplicate_dictionary_names(self):
+    self.assertEqual(parse_args(['-d', 'a/words.txt', '-d', 'b/extra.txt']).dictionaries,
+                     ['a/words.txt', 'b/extra.txt'])
+    with contextlib.redirect_stderr(io.StringIO()):
+      self.assertRaises(SystemExit, lambda: parse_args(['-d', 'a/words.txt', '-d', 'b/words.txt']))
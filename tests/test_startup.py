@@ -0,0 +1,31 @@
+from wordsearch.startup import StartupProfile
+import builtins, sys
+import unittest
+
+class TestStartupProfile(unittest.TestCase):
+  def setUp(self):
+    # Import a module that nothing else in the tests uses, fresh each time
+    sys.modules.pop('wave', None)
+
+  def test_times_new_imports(self):
+    with StartupProfile() as profile:
+      import wave
+      import os
+    names = [name for name, _, _, _ in profile.imports]
+    self.assertIn('wave', names)
+    self.assertNotIn('os', names)
+    self.assertEqual(names[-1], 'wave')
+
+    name, own, cumulative, depth = profile.imports[-1]
+    self.assertEqual(depth, 0)
+    self.assertTrue(0 <= own <= cumulative)
+    self.assertAlmostEqual(profile.total, cumulative)
+    self.assertIn('| wave', profile.report())
+
+  def test_uninstall(self):
+    original = builtins.__import__
+    profile = StartupProfile()
+    profile.install()
+    self.assertIsNot(builtins.__import__, original)
+    profile.uninstall()
+    self.assertIs(builtins.__import__, original)
@@ -0,0 +1,96 @@
+import wordsearch.main as main
+from wordsearch.board import Board
+from wordsearch.compact import CompactTrie
+from wordsearch.stats import SearchStats
+from wordsearch.trie import TrieNode
+import random
+import unittest
+
+class TestInstrumentedSearch(unittest.TestCase):
+  def setUp(self):
+    self.words = ['amp', 'amps', 'ack', 'bus', 'bar', 'a', 'ma', 'cab', 'backs', 'mapsack']
+    random.seed(2468)
+    self.boards = [
+      Board([[random.choice('abcmpksu') for _ in range(width)] for _ in range(height)])
+      for width, height in [(1, 1), (3, 1), (1, 5), (9, 7)]
+    ]
+
+  def test_same_words(self):
+    for root in (TrieNode(words=self.words), CompactTrie(words=self.words)):
+      for board in self.boards:
+        for min_length, max_length in [(None, None), (3, None), (None, 3), (2, 4)]:
+          stats = SearchStats()
+          self.assertEqual(
+            list(main.search_board(board, root, min_length=min_length, max_length=max_length, stats=stats)),
+            list(main.search_board(board, root, min_length=min_length, max_length=max_length)),
+          )
+          self.assertEqual(stats.runs, stats.edge_ends + stats.miss_ends + stats.bound_ends)
+
+  def test_counts(self):
+    root = TrieNode(words=['ab', 'abc'])
+    board = Board([['a', 'b']])
+    stats = SearchStats()
+    self.assertEqual(list(main.search_board(board, root, stats=stats, prefilter=False)), ['ab'])
+    self.assertEqual(stats.runs, 16)
+    self.assertEqual(stats.skipped, 0)
+    # Runs from "a" match it (or "ab") and reach the edge, runs from "b" miss at once
+    self.assertEqual(stats.steps, 9)
+    self.assertEqual(stats.edge_ends, 8)
+    self.assertEqual(stats.miss_ends, 8)
+    self.assertEqual(stats.average_depth, 9 / 16)
+
+  def test_bounds(self):
+    root = TrieNode(words=['ab', 'abc'])
+    board = Board([['a', 'b', 'c']])
+    stats = SearchStats()
+    self.assertEqual(list(main.search_board(board, root, min_length=3, stats=stats, prefilter=False)), ['abc'])
+    # Only the runs along the row from either end have room for three letters
+    self.assertEqual(stats.runs, 2)
+    self.assertEqual(stats.skipped, 22)
+    self.assertEqual((stats.edge_ends, stats.miss_ends, stats.bound_ends), (1, 1, 0))
+
+  def test_prefiltered(self):
+    root = TrieNode(words=['ab', 'abc'])
+    board = Board([['a', 'b', 'c']])
+    stats = SearchStats()
+    self.assertEqual(list(main.search_board(board, root, stats=stats)), ['abc'])
+    # Only the run from "a" to the right starts with a prefix of a word
+    self.assertEqual((stats.runs, stats.filtered), (1, 23))
+    self.assertEqual(stats.edge_ends, 1)
+
+    stats = SearchStats()
+    list(main.search_board(board, root, min_length=3, stats=stats))
+    self.assertEqual((stats.runs, stats.skipped, stats.filtered), (1, 22, 1))
+
+  def test_bound_ends(self):
+    root = TrieNode(words=['ab', 'abcd'])
+    board = Board([['a', 'b', 'c', 'x']])
+    stats = SearchStats()
+    self.assertEqual(list(main.search_board(board, root, max_length=2, stats=stats)), ['ab'])
+    self.assertEqual(stats.bound_ends, 1)
+
+  def test_rejects_workers(self):
+    board = self.boards[-1]
+    root = TrieNode(words=self.words)
+    self.assertRaises(ValueError, lambda: list(main.search_board(board, root, workers=2, stats=SearchStats())))
+
+
+class TestSearchStats(unittest.TestCase):
+  def test_phases(self):
+    stats = SearchStats()
+    with stats.phase('load'):
+      pass
+    with stats.phase('search'):
+      pass
+    with stats.phase('load'):
+      pass
+    self.assertEqual(list(stats.phases), ['load', 'search'])
+    self.assertTrue(all(seconds >= 0 for seconds in stats.phases.values()))
+
+  def test_report(self):
+    stats = SearchStats()
+    with stats.phase('search'):
+      pass
+    self.assertEqual(len(stats.report().splitlines()), 1)
+    stats.runs, stats.steps = 4, 6
+    self.assertIn('1.50', stats.report())
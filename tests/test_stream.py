@@ -0,0 +1,40 @@
+from wordsearch.stream import stream_search
+from wordsearch.board import Board
+from wordsearch.trie import TrieNode
+import wordsearch.main as main
+from tests.engine_cases import WORDS, EngineCases
+import unittest
+
+class TestStreamSearch(EngineCases, unittest.TestCase):
+  board_types = (list,)
+
+  def search(self, board_type, rows, root, **kwargs):
+    return list(stream_search(iter(rows), root, **kwargs))
+
+  def test_single_letter_words(self):
+    # max_depth == 1 means runs never leave their row
+    rows = ['ab', 'ba', 'ab']
+    root = TrieNode(words=['a'])
+    self.assertEqual(list(stream_search(rows, root)), list(main.search_board(Board(rows), root)))
+
+  def test_bounded_window(self):
+    root = TrieNode(words=WORDS)
+    read = []
+    def rows():
+      for y in range(100):
+        read.append(y)
+        yield 'abcmp'
+
+    # Searching the first rows shouldn't need the whole board to have been read
+    search = stream_search(rows(), root)
+    next(search)
+    self.assertLess(len(read), 20)
+
+  def test_uneven_rows(self):
+    root = TrieNode(words=WORDS)
+    self.assertRaises(ValueError, lambda: list(stream_search(['ab', 'abc'], root)))
+
+  def test_empty(self):
+    root = TrieNode(words=WORDS)
+    self.assertRaises(ValueError, lambda: list(stream_search([], root)))
+    self.assertRaises(ValueError, lambda: list(stream_search([''], root)))
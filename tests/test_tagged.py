@@ -0,0 +1,152 @@
+import wordsearch.main as main
+from wordsearch.board import Board, CompactBoard
+from wordsearch.tagged import MappedTaggedTrie, TaggedCache, TaggedHit, TaggedTrie, search_board_tagged
+from wordsearch.trie import TrieNode
+import os, random, tempfile
+import unittest
+
+class TestTaggedTrie(unittest.TestCase):
+  def setUp(self):
+    self.trie = TaggedTrie([['amp', 'amps', 'bus'], ['AMP', 'ack'], ['bus']], ['general', 'glossary', 'blocked'])
+
+  def test_dictionaries(self):
+    self.assertEqual(self.trie.dictionaries('amp'), ('general', 'glossary'))
+    self.assertEqual(self.trie.dictionaries('bus'), ('general', 'blocked'))
+    self.assertEqual(self.trie.dictionaries('ac'), ())
+    self.assertEqual(self.trie.dictionaries('zap'), ())
+    self.assertTrue('ack' in self.trie)
+    self.assertFalse('am' in self.trie)
+
+  def test_words(self):
+    self.assertEqual(list(self.trie.words()), ['ack', 'amp', 'amps', 'bus'])
+
+  def test_names(self):
+    self.assertEqual(TaggedTrie([['amp'], ['bus']]).names, ('0', '1'))
+    self.assertRaises(ValueError, lambda: TaggedTrie([['amp'], ['bus']], ['general']))
+
+  def test_from_files(self):
+    with tempfile.TemporaryDirectory() as tmpdir:
+      paths = [os.path.join(tmpdir, name) for name in ('words.txt', 'extra.txt')]
+      for path, contents in zip(paths, ['amp\nbus\n', 'Bus\nzap\n']):
+        with open(path, 'w') as f:
+          f.write(contents)
+      trie = TaggedTrie.from_files(paths)
+    self.assertEqual(trie.dictionaries('bus'), tuple(paths))
+    self.assertEqual(trie.dictionaries('zap'), (paths[1],))
+
+
+class TestTaggedCache(unittest.TestCase):
+  def setUp(self):
+    self.tmpdir = tempfile.TemporaryDirectory()
+    self.paths = [os.path.join(self.tmpdir.name, name) for name in ('words.txt', 'extra.txt')]
+    self.write(self.paths[0], 'amp\namps\nack\nbus\n')
+    self.write(self.paths[1], 'Bus\nzap\nam\n')
+
+  def tearDown(self):
+    self.tmpdir.cleanup()
+
+  def write(self, path, contents):
+    with open(path, 'w') as f:
+      f.write(contents)
+
+  def cache(self):
+    # A TaggedCache that counts its rebuilds
+    cache = TaggedCache(self.paths)
+    cache.builds = 0
+    build = cache.build
+    def counted():
+      cache.builds += 1
+      return build()
+    cache.build = counted
+    return cache
+
+  def test_matches_tagged_trie(self):
+    trie = self.cache().load()
+    self.assertIsInstance(trie, MappedTaggedTrie)
+    expected = TaggedTrie.from_files(self.paths)
+    self.assertEqual(trie.names, expected.names)
+    self.assertEqual(list(trie.words()), list(expected.words()))
+    for word in ('amp', 'amps', 'am', 'bus', 'zap', 'a', 'ba', 'zebra'):
+      self.assertEqual(trie.dictionaries(word), expected.dictionaries(word))
+    random.seed(97531)
+    rows = [[random.choice('abmpsuz') for _ in range(9)] for _ in range(7)]
+    for board in (Board(rows), CompactBoard(rows)):
+      self.assertEqual(list(search_board_tagged(board, trie)), list(search_board_tagged(board, expected)))
+
+  def test_reuses_cache(self):
+    self.cache().load()
+    cache = self.cache()
+    self.assertEqual(list(cache.load().words()), ['ack', 'am', 'amp', 'amps', 'bus', 'zap'])
+    self.assertEqual(cache.builds, 0)
+
+  def test_rebuilds_after_edit(self):
+    self.cache().load()
+    self.write(self.paths[1], 'zap\nampsack\n')
+    cache = self.cache()
+    trie = cache.load()
+    self.assertEqual(cache.builds, 1)
+    self.assertEqual(trie.dictionaries('bus'), (self.paths[0],))
+    self.assertEqual(trie.dictionaries('ampsack'), (self.paths[1],))
+
+  def test_rebuilds_missing_masks(self):
+    cache = self.cache()
+    cache.load()
+    os.remove(os.path.join(cache.path, 'tagged.masks'))
+    cache = self.cache()
+    self.assertEqual(cache.load().dictionaries('bus'), tuple(self.paths))
+    self.assertEqual(cache.builds, 1)
+
+  def test_names_change(self):
+    self.cache().load()
+    cache = TaggedCache(self.paths[:1], TaggedCache(self.paths).path)
+    self.assertEqual(cache.load().dictionaries('bus'), (self.paths[0],))
+
+
+class TestTaggedSearch(unittest.TestCase):
+  def setUp(self):
+    self.lists = [['amp', 'amps', 'ack', 'bus', 'bar', 'a'], ['ma', 'cab', 'backs', 'amps'], ['bus', 'mapsack']]
+    self.trie = TaggedTrie(self.lists, ['general', 'glossary', 'blocked'])
+    random.seed(8642)
+    self.rows = [
+      [[random.choice('abcmpksu') for _ in range(width)] for _ in range(height)]
+      for width, height in [(1, 1), (3, 1), (1, 5), (9, 7)]
+    ]
+
+  def test_longest_per_dictionary(self):
+    board = Board([list('xmapsack')])
+    hits = [hit for hit in search_board_tagged(board, self.trie) if (hit.x, hit.direction) == (1, (1, 0))]
+    self.assertEqual(hits, [
+      TaggedHit('ma', 1, 0, (1, 0), 2, ('glossary',)),
+      TaggedHit('mapsack', 1, 0, (1, 0), 7, ('blocked',)),
+    ])
+
+  def test_shared_longest(self):
+    board = Board([list('bus')])
+    hits = [hit for hit in search_board_tagged(board, self.trie) if hit.direction == (1, 0)]
+    self.assertEqual(hits, [TaggedHit('bus', 0, 0, (1, 0), 3, ('general', 'blocked'))])
+
+  def test_matches_each_dictionary(self):
+    # Each dictionary's hits are exactly what searching with that dictionary alone finds
+    for rows in self.rows:
+      for board in (Board(rows), CompactBoard(rows)):
+        hits = list(search_board_tagged(board, self.trie))
+        for name, words in zip(self.trie.names, self.lists):
+          self.assertEqual(
+            [hit.word for hit in hits if name in hit.dictionaries],
+            list(main.search_board(Board(rows), TrieNode(words=words))),
+          )
+
+  def test_longest_hit_matches_merged_search(self):
+    merged = TrieNode(words=[word for words in self.lists for word in words])
+    for rows in self.rows:
+      longest = {}
+      for hit in search_board_tagged(Board(rows), self.trie, prefilter=False):
+        longest[hit.x, hit.y, hit.direction] = hit.word
+      self.assertEqual(list(longest.values()), list(main.search_board(Board(rows), merged)))
+
+  def test_min_length(self):
+    board = Board(self.rows[-1])
+    self.assertEqual(
+      list(search_board_tagged(board, self.trie, min_length=4)),
+      [hit for hit in search_board_tagged(board, self.trie) if hit.length >= 4],
+    )
@@ -181,3 +181,86 @@ class TestTrie(unittest.TestCase):
     root._add_children(TrieNode('a'))
     self.assertTrue('a' in root.children)
     self.assertEqual(root.children['a'], TrieNode('a'))
+
+  def test_max_depth(self):
+    self.assertEqual(TrieNode().max_depth(), 0)
+    self.assertEqual(self.reference_root.max_depth(), 3)
+    self.assertEqual(TrieNode(words=['a', 'abcde', 'xy']).max_depth(), 5)
+
+  def test_remaining(self):
+    root = TrieNode(words=['a', 'abc', 'abcde', 'xy'])
+    self.assertEqual((root.min_remaining, root.max_remaining), (1, 5))
+    a = root.children['a']
+    self.assertEqual((a.min_remaining, a.max_remaining), (0, 4))
+    b = a.children['b']
+    self.assertEqual((b.min_remaining, b.max_remaining), (1, 3))
+    x = root.children['x']
+    self.assertEqual((x.min_remaining, x.max_remaining), (1, 1))
+
+  def test_remaining_empty(self):
+    self.assertEqual((TrieNode().min_remaining, TrieNode().max_remaining), (None, None))
+
+  def test_remaining_from_children(self):
+    self.assertEqual((self.reference_root.min_remaining, self.reference_root.max_remaining), (3, 3))
+    self.assertEqual(self.reference_root.children['a'].max_remaining, 2)
+
+  def test_remove(self):
+    root = TrieNode(words=['amp', 'ack', 'bus', 'busy'])
+    root.remove('busy')
+    self.assertTrue(recursive_equal(root, TrieNode(words=['amp', 'ack', 'bus'])))
+    self.assertEqual(root.children['b'].max_remaining, 2)
+
+  def test_remove_prunes(self):
+    root = TrieNode(words=['amp', 'ack', 'bus'])
+    root.remove('bus', 'ack')
+    self.assertTrue(recursive_equal(root, TrieNode(words=['amp'])))
+    self.assertEqual(root, TrieNode(words=['amp']))
+
+  def test_remove_keeps_prefix_words(self):
+    root = TrieNode(words=['bus', 'busy'])
+    root.remove('bus')
+    self.assertFalse('bus' in root)
+    self.assertTrue('busy' in root)
+    self.assertEqual((root.min_remaining, root.max_remaining), (4, 4))
+
+  def test_remove_missing(self):
+    root = TrieNode(words=['bus'])
+    self.assertRaises(KeyError, lambda: root.remove('bu'))
+    self.assertRaises(KeyError, lambda: root.remove('bar'))
+    self.assertTrue('bus' in root)
+
+  def test_remove_on_child(self):
+    self.assertRaises(ValueError, lambda: self.reference_root.children['a'].remove('mp'))
+
+  def test_from_sorted(self):
+    words = ['ack', 'amp', 'amps', 'bus', 'bus', 'busy']
+    root = TrieNode.from_sorted(words)
+    self.assertTrue(recursive_equal(root, TrieNode(words=words)))
+    self.assertEqual((root.min_remaining, root.max_remaining), (3, 4))
+    self.assertEqual((root.children['b'].min_remaining, root.children['b'].max_remaining), (2, 3))
+    root.index('cab')
+    self.assertTrue('cab' in root)
+
+  def test_from_sorted_unsorted(self):
+    self.assertRaises(ValueError, lambda: TrieNode.from_sorted(['bus', 'amp']))
+
+  def test_from_sorted_minimize(self):
+    words = ['backs', 'bus', 'buses', 'racks', 'rus', 'ruses']
+    root = TrieNode.from_sorted(words, minimize=True)
+    self.assertEqual(root, TrieNode(words=words))
+    self.assertTrue(all(word in root for word in words))
+    self.assertFalse('ruse' in root)
+    # "us", "uses" and "acks" are shared suffixes of "b" and "r"
+    self.assertIs(root.children['b'].children['u'], root.children['r'].children['u'])
+    self.assertIs(root.children['b'].children['a'], root.children['r'].children['a'])
+    self.assertRaises(ValueError, lambda: root.index('bat'))
+    self.assertRaises(ValueError, lambda: root.remove('bus'))
+
+  def test_case_folding(self):
+    root = TrieNode(words=['Foo', 'FOOD', 'bar'])
+    self.assertTrue(recursive_equal(root, TrieNode(words=['foo', 'food', 'bar'])))
+    self.assertTrue('food' in root)
+    self.assertTrue('fOo' in root)
+    root.remove('FOO')
+    self.assertFalse('foo' in root)
+    self.assertEqual(TrieNode.from_sorted(['Bar', 'foo']), TrieNode(words=['bar', 'foo']))
@@ -0,0 +1,41 @@
+import wordsearch.main as main
+from wordsearch.board import Board
+from wordsearch.trie import TrieNode
+from tests.engine_cases import WORDS, EngineCases
+import random
+import unittest
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
+else:
+  import wordsearch.vectorized as vectorized
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestVectorizedSearch(EngineCases, unittest.TestCase):
+  # Looked up on each call, as "vectorized" isn't imported without NumPy
+  search_board = staticmethod(lambda board, root, **kwargs: vectorized.search_board(board, root, **kwargs))
+
+  def prepare(self, root):
+    return {'table': vectorized.TransitionTable(root)}
+
+  def test_letters_outside_alphabet(self):
+    root = TrieNode(words=['ab'])
+    board = Board([['a', 'b', 'Q', '!']])
+    self.assertEqual(list(vectorized.search_board(board, root)), ['ab'])
+
+  def test_bands(self):
+    # A board searched in several bands of rows gives the same words as in one
+    random.seed(5678)
+    root = TrieNode(words=WORDS)
+    board = Board([[random.choice('abcmpksuz') for _ in range(6)] for _ in range(11)])
+    expected = list(vectorized.search_board(board, root))
+    band_runs = vectorized._band_runs
+    vectorized._band_runs = 6 * 8 * 2
+    try:
+      self.assertEqual(list(vectorized.search_board(board, root)), expected)
+    finally:
+      vectorized._band_runs = band_runs
+    self.assertEqual(expected, list(main.search_board(board, root)))
@@ -0,0 +1,165 @@
+"""
+An Aho-Corasick search engine that scans every line of the board once.
+
+Every direction a word can be read in is a straight line through the board, so instead of
+restarting a trie walk from every cell, this engine extracts each row, column and
+diagonal once and feeds it (forwards and backwards) through an Aho-Corasick automaton
+built from the dictionary. Each word occurrence is reported at the position where it
+ends, which tells us the cell and direction it starts from; keeping the longest
+occurrence per start reproduces the output of the generator engine.
+"""
+from wordsearch.main import _directions, _per_trie
+from array import array
+from collections import deque
+
+
+class Automaton:
+  """
+  An Aho-Corasick automaton over the words of a trie.
+
+  States are integers, with 0 the root. Each state stores its depth (the length of the
+  prefix it represents), its goto edges, its failure link (the state for the longest
+  proper suffix that is also a prefix), and a dictionary link (the state for the longest
+  proper suffix that is a word).
+  """
+  def __init__(self, rootnode):
+    """
+    Args:
+      rootnode: a TrieNode or CompactTrie that roots a trie used to identify words
+    """
+    self.goto = [{}]
+    self.depth = [0]
+    self.word_end = [False]
+    self.fail = [0]
+    self.dict_link = [0]
+
+    # Copy the trie's shape breadth-first, then compute the links in the same order so
+    # that a state's failure target is always finished before the state itself.
+    order = []
+    queue = deque([(rootnode, 0)])
+    while queue:
+      node, state = queue.popleft()
+      order.append(state)
+      for letter, child in node.children.items():
+        child_state = len(self.goto)
+        self.goto.append({})
+        self.depth.append(self.depth[state] + 1)
+        self.word_end.append(child.word_end)
+        self.fail.append(0)
+        self.dict_link.append(0)
+        self.goto[state][letter] = child_state
+        queue.append((child, child_state))
+
+    # Children of the root fail back to the root, which is already the default
+    for state in order[1:]:
+      for letter, child in self.goto[state].items():
+        fallback = self.fail[state]
+        while fallback and letter not in self.goto[fallback]:
+          fallback = self.fail[fallback]
+        target = self.goto[fallback].get(letter, 0)
+        self.fail[child] = target
+        self.dict_link[child] = target if self.word_end[target] else self.dict_link[target]
+
+
+  def scan(self, line):
+    """
+    Find the longest word starting at each position of "line".
+
+    Args:
+      line: a sequence of letters
+
+    Returns: a dict of {start position: length of the longest word starting there}
+    """
+    goto, fail, depth, word_end, dict_link = self.goto, self.fail, self.depth, self.word_end, self.dict_link
+    longest = {}
+    state = 0
+    for i, letter in enumerate(line):
+      while state and letter not in goto[state]:
+        state = fail[state]
+      state = goto[state].get(letter, 0)
+
+      # Report every word ending here. Later positions only ever produce longer words
+      # for a given start, so overwriting keeps the longest.
+      match = state if word_end[state] else dict_link[state]
+      while match:
+        length = depth[match]
+        longest[i - length + 1] = length
+        match = dict_link[match]
+    return longest
+
+
+
+def _lines(board, direction):
+  """
+  Yields the coordinates of every maximal line through "board" in "direction", as a
+  list of (x, y) tuples.
+  """
+  dx, dy = direction
+  width, height = board.width, board.height
+  for y in range(height):
+    for x in range(width):
+      # Only start at cells whose predecessor in this direction is off the board
+      if 0 <= x - dx < width and 0 <= y - dy < height:
+        continue
+      line = []
+      cx, cy = x, y
+      while 0 <= cx < width and 0 <= cy < height:
+        line.append((cx, cy))
+        cx, cy = cx + dx, cy + dy
+      yield line
+
+
+# Prepared Automatons, keyed by the id of the trie they were built from
+_prepared = {}
+
+
+def _prepare(rootnode):
+  """Returns an Automaton for "rootnode", building it on first use"""
+  return _per_trie(_prepared, rootnode, Automaton)
+
+
+def search_board(board, rootnode, automaton=None):
+  """
+  A generator that searches for words in "board" using the trie rooted by "rootnode"
+  and yields the words found.
+
+  Yields exactly the same words, in the same order, as wordsearch.main.search_board().
+
+  Args:
+    board: a Board to search
+    rootnode: a TrieNode or CompactTrie that roots a trie used to identify words
+    automaton: a prebuilt Automaton for "rootnode". By default one is built on the first
+               search with each trie and reused after that.
+
+  Yields: a word found in board (string)
+  """
+  if automaton is None:
+    automaton = _prepare(rootnode)
+
+  width = board.width
+  ndirs = len(_directions)
+  # Length of the longest word for each (cell, direction) run, in the generator
+  # engine's order: row by row, cell by cell, then direction by direction.
+  longest = array('H', bytes(2 * width * board.height * ndirs))
+
+  # Each line is scanned forwards for one direction and backwards for its opposite
+  for d, direction in enumerate(_directions):
+    opposite = _directions.index((-direction[0], -direction[1]))
+    if opposite < d:
+      continue
+    for line in _lines(board, direction):
+      letters = [board[x, y] for x, y in line]
+      for start, length in automaton.scan(letters).items():
+        x, y = line[start]
+        longest[(y * width + x) * ndirs + d] = length
+      last = len(line) - 1
+      for start, length in automaton.scan(letters[::-1]).items():
+        x, y = line[last - start]
+        longest[(y * width + x) * ndirs + opposite] = length
+
+  for run, length in enumerate(longest):
+    if length:
+      cell, d = divmod(run, ndirs)
+      x, y = cell % width, cell // width
+      dx, dy = _directions[d]
+      yield ''.join(board[x + i * dx, y + i * dy] for i in range(length))
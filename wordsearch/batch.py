@@ -0,0 +1,138 @@
+"""
+Search many boards against one loaded dictionary.
+
+Boards can come from a directory (one board per file), a file holding several boards, or
+a stream such as stdin; in files and streams, boards are separated by blank lines.
+Results are emitted per board as JSON lines tagged with the board's id.
+"""
+from wordsearch.board import CompactBoard
+from wordsearch.main import select_engine
+from wordsearch.trie import fold
+import json, os
+
+
+def parse_boards(lines):
+  """
+  Split a stream of lines into boards separated by one or more blank lines.
+
+  Args:
+    lines: an iterable of strings
+
+  Yields: a list of rows (strings) for each board
+  """
+  rows = []
+  for line in lines:
+    line = line.strip()
+    if line:
+      rows.append(line)
+    elif rows:
+      yield rows
+      rows = []
+  if rows:
+    yield rows
+
+
+def read_boards(source):
+  """
+  Read boards from "source".
+
+  Boards in a directory are identified by their file names, or as "NAME:N" if the file
+  holds several. Boards in a file are identified as "NAME:N", and boards in a stream by
+  their position "N", where N counts from 0.
+
+  Args:
+    source: a directory path, a file path, or an iterable of lines (e.g. sys.stdin)
+
+  Yields: a 2-tuple of (board id, list of rows) for each board
+  """
+  if isinstance(source, str) and os.path.isdir(source):
+    for name in sorted(os.listdir(source)):
+      path = os.path.join(source, name)
+      if os.path.isfile(path):
+        with open(path) as f:
+          boards = list(parse_boards(f))
+        if len(boards) == 1:
+          yield name, boards[0]
+        else:
+          for i, rows in enumerate(boards):
+            yield '{}:{}'.format(name, i), rows
+  elif isinstance(source, str):
+    with open(source) as f:
+      for i, rows in enumerate(parse_boards(f)):
+        yield '{}:{}'.format(os.path.basename(source), i), rows
+  else:
+    for i, rows in enumerate(parse_boards(source)):
+      yield str(i), rows
+
+
+def search_one(board_id, rows, rootnode, engine='generator', min_word_length=0):
+  """
+  Search a single board.
+
+  Args:
+    board_id: id to tag the result with
+    rows: the board's rows, as strings. Letters are case-folded with fold().
+    rootnode: a TrieNode or CompactTrie that roots a trie used to identify words
+    engine: name of the search engine to use, see wordsearch.main.engines
+    min_word_length: skip words shorter than this
+
+  Returns: a dict of {"id": board_id, "words": [words found]}, or of
+           {"id": board_id, "error": message} if the board is malformed
+  """
+  try:
+    board = CompactBoard(fold(row) for row in rows)
+  except ValueError as e:
+    return {'id': board_id, 'error': str(e)}
+  words = [word for word in select_engine(engine)(board, rootnode) if len(word) >= min_word_length]
+  return {'id': board_id, 'words': words}
+
+
+# State of worker processes in a concurrent batch, set by _init_worker()
+_worker_args = None
+
+
+def _init_worker(rootnode, engine, min_word_length):
+  """Pool initializer: make the search parameters available to _search_worker()"""
+  global _worker_args
+  _worker_args = (rootnode, engine, min_word_length)
+
+
+def _search_worker(board):
+  """Search one (board id, rows) pair in a worker process"""
+  return search_one(*board, *_worker_args)
+
+
+def search_boards(boards, rootnode, engine='generator', min_word_length=0, workers=None):
+  """
+  A generator that searches each board in "boards" and yields the results in order.
+
+  Args:
+    boards: an iterable of (board id, rows) tuples, e.g. from read_boards()
+    rootnode: a TrieNode or CompactTrie that roots a trie used to identify words
+    engine: name of the search engine to use, see wordsearch.main.engines
+    min_word_length: skip words shorter than this
+    workers: if greater than 1, search this many boards at a time in a process pool.
+             The dictionary is sent to each worker once.
+
+  Yields: a result dict per board, as returned by search_one()
+  """
+  if workers is not None and workers > 1:
+    from multiprocessing import Pool
+    with Pool(workers, initializer=_init_worker, initargs=(rootnode, engine, min_word_length)) as pool:
+      yield from pool.imap(_search_worker, boards)
+  else:
+    for board_id, rows in boards:
+      yield search_one(board_id, rows, rootnode, engine, min_word_length)
+
+
+def write_results(results, out):
+  """
+  Write each result to "out" as a line of JSON.
+
+  Args:
+    results: an iterable of result dicts, e.g. from search_boards()
+    out: a writable text file
+  """
+  for result in results:
+    out.write(json.dumps(result))
+    out.write('\n')
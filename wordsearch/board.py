@@ -1,5 +1,3 @@
-import collections
-
 class Board:
   """
   A wrapper class for a matrix, or in this case, a wordsearch board.
@@ -36,6 +34,8 @@ class Board:
     Return True if self's underlying board list is equal to other's. Overloads the
     "==" operator.
     """
+    if not isinstance(other, Board):
+      return NotImplemented
     return self._board == other._board
 
 
@@ -47,7 +47,13 @@ class Board:
     Args:
       key: key to test for validity
     """
-    if not isinstance(key, collections.Sequence) or len(key) != 2:
+    # Checking against the Sequence ABC is slow, so short-circuit it for plain tuples. The
+    # ABC is only imported for other keys, to keep it off the startup path.
+    if type(key) is not tuple:
+      from collections.abc import Sequence
+      if not isinstance(key, Sequence):
+        raise ValueError('Board must be indexed with a pair of x, y coordinates, got "{}"'.format(key))
+    if len(key) != 2:
       raise ValueError('Board must be indexed with a pair of x, y coordinates, got "{}"'.format(key))
     
     # Don't need to check if k > len(board) because the list will raise an IndexError for us.
@@ -97,4 +103,218 @@ class Board:
     for y, row in enumerate(self._board):
       for x, letter in enumerate(row):
         yield x, y, letter
-    
\ No newline at end of file
+    
+
+
+
+class CompactBoard:
+  """
+  A Board of single letters stored in one bytearray, in row-major order.
+
+  Has the same interface as Board, but stores each letter as one byte (latin-1) instead
+  of a one-character string in a nested list, and adds line() for reading whole runs
+  without indexing letter by letter.
+  """
+  __slots__ = ('_buffer', '_width', '_height')
+
+  def __init__(self, board):
+    """
+    Create a CompactBoard from an iterable of iterables of letters.
+
+    As for Board, all of the nested iterables must be of the same length and neither
+    dimension can be 0, or else a ValueError will be raised. A ValueError is also
+    raised if any letter can't be stored in a single latin-1 byte.
+
+    Args:
+      board: an iterable of iterables of letters (strings of length 1)
+    """
+    buffer = bytearray()
+    width = None
+    height = 0
+    for row in board:
+      row = ''.join(row)
+      if width is None:
+        width = len(row)
+      elif len(row) != width:
+        raise ValueError("Every nested iterable must be the same length")
+      try:
+        buffer += row.encode('latin-1')
+      except UnicodeEncodeError:
+        raise ValueError("Every letter must be a single latin-1 character, got row {!r}".format(row))
+      height += 1
+
+    if not (height > 0 and width > 0):
+      raise ValueError("Both dimensions of the board must be greater than 0")
+
+    self._buffer = buffer
+    self._width = width
+    self._height = height
+
+
+  @classmethod
+  def from_bytes(cls, data, width, height):
+    """
+    Create a CompactBoard directly from a row-major buffer of letter bytes.
+
+    Args:
+      data: a bytes-like object of length width * height
+      width: width of the board
+      height: height of the board
+    """
+    if not (width > 0 and height > 0):
+      raise ValueError("Both dimensions of the board must be greater than 0")
+    if len(data) != width * height:
+      raise ValueError("Expected {} bytes for a {}x{} board, got {}".format(
+        width * height, width, height, len(data)))
+
+    board = cls.__new__(cls)
+    board._buffer = bytearray(data)
+    board._width = width
+    board._height = height
+    return board
+
+
+  def __eq__(self, other):
+    """
+    Return True if "other" has the same dimensions and letters. Overloads the "=="
+    operator.
+    """
+    if isinstance(other, CompactBoard):
+      return (self._width, self._buffer) == (other._width, other._buffer)
+    if isinstance(other, Board):
+      return (self.width, self.height) == (other.width, other.height) and list(self) == list(other)
+    return NotImplemented
+
+
+  def _offset(self, key):
+    """
+    Helper method that validates a key for indexing into CompactBoard and returns its
+    offset into the buffer.
+
+    Args:
+      key: key to convert
+    """
+    try:
+      x, y = key
+    except (TypeError, ValueError):
+      raise ValueError('Board must be indexed with a pair of x, y coordinates, got "{}"'.format(key))
+
+    if not (0 <= x < self._width and 0 <= y < self._height):
+      raise IndexError("Board index out of range")
+    return y * self._width + x
+
+
+  def __getitem__(self, key):
+    """
+    Allows for accessing the coordinates in the board as CompactBoard[x,y]. Overloads
+    indexing.
+    """
+    return chr(self._buffer[self._offset(key)])
+
+
+  def __setitem__(self, key, value):
+    """
+    Allows for setting letters in the board as CompactBoard[x,y] = letter. Overloads
+    indexing.
+    """
+    offset = self._offset(key)
+    try:
+      self._buffer[offset] = ord(value.encode('latin-1'))
+    except (AttributeError, TypeError, UnicodeEncodeError):
+      raise ValueError("Letters must be single latin-1 characters, got {!r}".format(value))
+
+
+  def line(self, start, direction):
+    """
+    Returns the letters from "start" to the edge of the board in "direction" as bytes,
+    without validating each position.
+
+    Args:
+      start: a 2-tuple of ints (x,y) of the first letter, which must be on the board
+      direction: a 2-tuple of ints (x,y), each one of (-1, 0, 1)
+    """
+    x, y = start
+    dx, dy = direction
+    if (dx, dy) == (0, 0):
+      raise ValueError("Direction cannot be (0, 0)")
+    offset = self._offset(start)
+    length = _room(x, y, dx, dy, self._width, self._height)
+    return bytes(_stride(self._buffer, offset, dy * self._width + dx, length))
+
+
+  @property
+  def buffer(self):
+    """Returns a read-only memoryview of the board's row-major letter bytes"""
+    view = memoryview(self._buffer)
+    if hasattr(view, 'toreadonly'):
+      return view.toreadonly()
+    # Before Python 3.8, a view of a copy
+    return memoryview(bytes(self._buffer))
+
+
+  @property
+  def width(self):
+    """Returns the width of the board (int)"""
+    return self._width
+
+
+  @property
+  def height(self):
+    """Returns the height of the board (int)"""
+    return self._height
+
+
+  def __iter__(self):
+    """
+    Yields a tuple of (x, y, letter) for each letter in the board.
+
+    Yields:
+      x: x-coordinate of yielded letter
+      y: y-coordinate of yielded letter
+      letter: current letter in the board
+    """
+    width = self._width
+    for offset, letter in enumerate(self._buffer.decode('latin-1')):
+      yield offset % width, offset // width, letter
+
+
+
+def flat_letters(board):
+  """
+  Returns the letters of "board" in row-major order, so that the letter at (x, y) is at
+  index y * board.width + x: a str for a CompactBoard (decoded from its buffer in one
+  go), or a list of letters for any other board.
+  """
+  if isinstance(board, CompactBoard):
+    return bytes(board._buffer).decode('latin-1')
+  return [letter for _, _, letter in board]
+
+
+def run_word(letters, start, step, length):
+  """
+  Returns the word of "length" letters read from "letters" (as returned by
+  flat_letters()) from index "start" on, moving "step" indices per letter (str).
+  """
+  word = _stride(letters, start, step, length)
+  return word if isinstance(word, str) else ''.join(word)
+
+
+def _room(x, y, dx, dy, width, height):
+  """
+  Returns the number of letters on a "width" x "height" board from (x, y) to the edge in
+  direction (dx, dy), which can't be (0, 0) (int)
+  """
+  room = width - x if dx > 0 else x + 1 if dx < 0 else height
+  if dy:
+    room = min(room, height - y if dy > 0 else y + 1)
+  return room
+
+
+def _stride(sequence, start, step, length):
+  """Returns "length" items of "sequence" from index "start" on, "step" indices apart"""
+  if length == 1:
+    # Also covers step == 0, which only happens on runs of one letter (a diagonal of a
+    # board one cell wide)
+    return sequence[start:start + 1]
+  end = start + step * length
+  return sequence[start:end if end >= 0 else None:step]
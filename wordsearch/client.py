@@ -0,0 +1,111 @@
+"""
+A small blocking client for wordsearch.server.
+"""
+from argparse import ArgumentParser, FileType, ArgumentDefaultsHelpFormatter
+import itertools, json, socket
+
+
+class ServerError(Exception):
+  """Raised when the server answers a request with an error"""
+
+
+class Client:
+  """
+  A connection to a search server.
+
+  Usage examples:
+    >>> with Client(path='wordsearch.sock') as client:
+    ...   client.search(['cat', 'axe'], min_word_length=3)
+    ['cat', 'axe']
+
+  """
+  def __init__(self, path=None, port=None, host='127.0.0.1'):
+    """
+    Connect to a server listening on the Unix socket at "path", or on "host":"port".
+    Exactly one of "path" and "port" must be given.
+    """
+    if (path is None) == (port is None):
+      raise ValueError('Exactly one of "path" and "port" must be given')
+    if path is not None:
+      self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+      self._socket.connect(path)
+    else:
+      self._socket = socket.create_connection((host, port))
+    self._file = self._socket.makefile('rwb')
+    self._ids = itertools.count()
+
+
+  def search(self, board, dictionary=None, min_word_length=0):
+    """
+    Search a board on the server.
+
+    Args:
+      board: a list of rows (strings)
+      dictionary: name of the dictionary to search with, defaults to the server's default
+      min_word_length: skip words shorter than this
+
+    Returns: a list of the words found
+    """
+    request = {'id': next(self._ids), 'board': list(board), 'min_word_length': min_word_length}
+    if dictionary is not None:
+      request['dictionary'] = dictionary
+    self._file.write(json.dumps(request).encode() + b'\n')
+    self._file.flush()
+
+    line = self._file.readline()
+    if not line:
+      raise ConnectionError("The server closed the connection")
+    response = json.loads(line)
+    if 'error' in response:
+      raise ServerError(response['error'])
+    return response['words']
+
+
+  def close(self):
+    """Close the connection"""
+    self._file.close()
+    self._socket.close()
+
+
+  def __enter__(self):
+    return self
+
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+
+
+def parse_args():
+  parser = ArgumentParser(description="Search a wordsearch file on a search server",
+                          formatter_class=ArgumentDefaultsHelpFormatter)
+
+  parser.add_argument('wordsearch', type=FileType('r'),
+    help="File with a grid of letters to search")
+  group = parser.add_mutually_exclusive_group()
+  group.add_argument('--socket', dest='socket', default='wordsearch.sock',
+    help="Path of the server's Unix socket")
+  group.add_argument('--port', dest='port', type=int, default=None,
+    help="Connect to this TCP port on localhost instead of a Unix socket")
+  parser.add_argument('-d', '--dictionary', dest='dictionary', default=None,
+    help="Name of the dictionary to search with (default: the server's first)")
+  parser.add_argument('-m', '--min-length', dest='min_word_length', type=int, default=0,
+    help="Skip printing words shorter than MIN_WORD_LENGTH")
+
+  return parser.parse_args()
+
+
+def main():
+  args = parse_args()
+  board = [line.strip() for line in args.wordsearch if line.strip()]
+  if args.port is not None:
+    client = Client(port=args.port)
+  else:
+    client = Client(path=args.socket)
+  with client:
+    for word in client.search(board, args.dictionary, args.min_word_length):
+      print(word)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,119 @@
+"""
+A search engine over an alphabet-compressed trie with integer letter codes.
+
+The trie's alphabet (the letters that actually occur in it, 26 for words.txt) is numbered
+1..len(alphabet), with 0 standing for any other letter. Every node then gets a
+fixed-width row of len(alphabet) + 1 child slots indexed by letter code, so a step down
+the trie is one array lookup instead of hashing a one-character string. The board is
+translated into the same codes once per search, and each run is walked with plain
+integer arithmetic on the flat row-major board.
+"""
+from wordsearch.board import CompactBoard, _room, flat_letters, run_word
+from wordsearch.compact import CompactTrie
+from wordsearch.main import _directions, _per_trie
+from array import array
+
+
+class CodedTrie:
+  """
+  A trie stored as one flat table of fixed-width child rows.
+
+  The children of the node whose row starts at "row" are table[row + code]. Each entry is
+  -1 if there is no such child, and otherwise the child's row start shifted left by one,
+  with the low bit set if the child ends a word. The root's row starts at 0.
+  """
+  def __init__(self, rootnode):
+    """
+    Args:
+      rootnode: a CompactTrie, or a TrieNode root which will be compacted first
+    """
+    trie = rootnode if isinstance(rootnode, CompactTrie) else CompactTrie.from_trie(rootnode)
+
+    alphabet = sorted(set(trie._letters))
+    self.alphabet = ''.join(chr(letter) for letter in alphabet)
+    self.codes = {letter: code for code, letter in enumerate(self.alphabet, 1)}
+    self.stride = stride = len(alphabet) + 1
+
+    code_of = {letter: code for code, letter in enumerate(alphabet, 1)}
+    offsets, letters, targets = trie._offsets, trie._letters, trie._targets
+    table = array('i', [-1]) * (trie.node_count * stride)
+    for node in range(trie.node_count):
+      row = node * stride
+      for i in range(offsets[node], offsets[node + 1]):
+        target = targets[i]
+        table[row + code_of[letters[i]]] = (target * stride) << 1 | trie.is_word_end(target)
+    self.table = table
+
+
+  def encode(self, board):
+    """
+    Returns the board's letters as a flat, row-major sequence of letter codes.
+
+    Args:
+      board: a Board or CompactBoard of single letters
+    """
+    if isinstance(board, CompactBoard) and self.stride <= 256:
+      # Translate the raw letter bytes in bulk through a byte -> code table
+      lookup = bytearray(256)
+      for letter, code in self.codes.items():
+        if ord(letter) < 256:
+          lookup[ord(letter)] = code
+      return bytes(board.buffer).translate(lookup)
+
+    codes = self.codes
+    return array('i', (codes.get(letter, 0) for _, _, letter in board))
+
+
+
+# Prepared CodedTries, keyed by the id of the trie they were built from
+_prepared = {}
+
+
+def _prepare(rootnode):
+  """Returns a CodedTrie for "rootnode", building it on first use"""
+  return _per_trie(_prepared, rootnode, CodedTrie)
+
+
+def search_board(board, rootnode, coded=None):
+  """
+  A generator that searches for words in "board" using the trie rooted by "rootnode"
+  and yields the words found.
+
+  Yields exactly the same words, in the same order, as wordsearch.main.search_board().
+
+  Args:
+    board: a Board to search
+    rootnode: a TrieNode or CompactTrie that roots a trie used to identify words
+    coded: a prebuilt CodedTrie for "rootnode". By default one is built on the first
+           search with each trie and reused after that.
+
+  Yields: a word found in board (string)
+  """
+  if coded is None:
+    coded = _prepare(rootnode)
+
+  table = coded.table
+  width, height = board.width, board.height
+  codes = coded.encode(board)
+  text = flat_letters(board)
+
+  for y in range(height):
+    for x in range(width):
+      start = y * width + x
+      for dx, dy in _directions:
+        room = _room(x, y, dx, dy, width, height)
+        step = dy * width + dx
+        pos = start
+        row = 0
+        longest = 0
+        for depth in range(1, room + 1):
+          entry = table[row + codes[pos]]
+          if entry < 0:
+            break
+          if entry & 1:
+            longest = depth
+          row = entry >> 1
+          pos += step
+
+        if longest:
+          yield run_word(text, start, step, longest)
@@ -0,0 +1,486 @@
+from wordsearch.trie import TrieNode, fold
+from collections.abc import Mapping
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+
+class CompactTrie:
+  """
+  A read-mostly trie stored in a handful of flat buffers instead of one TrieNode object
+  (plus one dict) per letter.
+
+  Nodes are identified by integers and laid out breadth-first, with the root at 0. The
+  layout is CSR-style: the outgoing edges of node "n" are the slice
+  offsets[n]:offsets[n + 1] of the "letters" and "targets" buffers, with letters
+  (stored as code points) sorted so that an edge can be found with a binary search.
+  Whether a node ends a word is a single bit in the "word_ends" bitset.
+
+  A CompactTrie exposes the same "word_end", "children" and "contains" walking
+  interface as a root TrieNode, so it can be passed anywhere a TrieNode root is
+  expected, e.g. to search_board().
+
+  Usage examples:
+    >>> root = CompactTrie(words=['foo', 'bar', 'baz'])
+    >>> 'foo' in root
+    True
+    >>> sorted(root.children)
+    ['b', 'f']
+    >>> root.children['b'].children['a'].word_end
+    False
+
+  """
+  # array typecode used for every integer buffer. 'I' is 4 bytes on every platform
+  # we care about, which is plenty for node ids and code points.
+  typecode = 'I'
+  # Bumped by index(), as for TrieNode
+  _version = 0
+
+  def __init__(self, words=None, offsets=None, letters=None, targets=None, word_ends=None,
+               remaining=None):
+    """
+    Build a trie from an iterable of words, or wrap existing buffers.
+
+    Args:
+      words: an iterable of words to index, case-folded with fold(). Duplicates are
+        ignored.
+      offsets, letters, targets, word_ends: prebuilt buffers (anything supporting
+        indexing and len(), e.g. arrays or memoryviews). Used by CompactTrie.from_trie()
+        and by the on-disk index loader.
+      remaining: optionally, a prebuilt 2-tuple of (min_remaining, max_remaining)
+        buffers to go with the others, see CompactTrie.remaining(). Computed on
+        demand if not given.
+
+    "words" and the buffer arguments are mutually exclusive; providing both will raise a
+    ValueError.
+    """
+    buffers = (offsets, letters, targets, word_ends)
+    if words is not None and any(b is not None for b in buffers):
+      raise ValueError('Arguments "words" and the trie buffers are mutually exclusive')
+
+    if any(b is not None for b in buffers):
+      if any(b is None for b in buffers):
+        raise ValueError('offsets, letters, targets and word_ends must all be provided')
+      if len(letters) != len(targets) or offsets[len(offsets) - 1] != len(letters):
+        raise ValueError('Trie buffers are inconsistent with each other')
+    else:
+      offsets, letters, targets, word_ends, remaining = self._build(words or ())
+
+    self._offsets = offsets
+    self._letters = letters
+    self._targets = targets
+    self._word_ends = word_ends
+    self._remaining = remaining
+
+
+  @classmethod
+  def _build(cls, words):
+    """
+    Build the trie buffers from an iterable of words without creating any per-node
+    objects.
+
+    Every node corresponds to a contiguous range of the sorted word list sharing a
+    prefix, so walking those ranges breadth-first yields the nodes in id order.
+
+    Returns: a 5-tuple of (offsets, letters, targets, word_ends, remaining)
+    """
+    words = sorted(set(fold(word) for word in words))
+
+    offsets = array(cls.typecode, [0])
+    letters = array(cls.typecode)
+    targets = array(cls.typecode)
+    word_ends = bytearray()
+
+    # Each entry is (lo, hi, depth): the words[lo:hi] that share the node's prefix
+    queue = deque([(0, len(words), 0)])
+    next_id = 1
+    node_id = 0
+    while queue:
+      lo, hi, depth = queue.popleft()
+      if node_id % 8 == 0:
+        word_ends.append(0)
+
+      # Sorting puts the word equal to the prefix itself (if any) first
+      if lo < hi and len(words[lo]) == depth:
+        word_ends[node_id >> 3] |= 1 << (node_id & 7)
+        lo += 1
+
+      # Group the remaining words by their next letter; each group is a child
+      while lo < hi:
+        letter = words[lo][depth]
+        group_end = lo + 1
+        while group_end < hi and words[group_end][depth] == letter:
+          group_end += 1
+
+        letters.append(ord(letter))
+        targets.append(next_id)
+        queue.append((lo, group_end, depth + 1))
+        next_id += 1
+        lo = group_end
+
+      offsets.append(len(letters))
+      node_id += 1
+
+    # Children always have larger ids than their parents here, so the remaining depths
+    # can be filled in bottom-up in one reverse pass
+    min_remaining = array('h', [-1]) * node_id
+    max_remaining = array('h', [-1]) * node_id
+    for node in reversed(range(node_id)):
+      lo, hi = (0, 0) if word_ends[node >> 3] & (1 << (node & 7)) else (-1, -1)
+      for i in range(offsets[node], offsets[node + 1]):
+        child = targets[i]
+        if lo < 0 or min_remaining[child] + 1 < lo:
+          lo = min_remaining[child] + 1
+        if max_remaining[child] + 1 > hi:
+          hi = max_remaining[child] + 1
+      min_remaining[node] = lo
+      max_remaining[node] = hi
+
+    return offsets, letters, targets, word_ends, (min_remaining, max_remaining)
+
+
+  @classmethod
+  def from_trie(cls, root):
+    """
+    Build a CompactTrie with the same words as the trie rooted by "root".
+
+    Args:
+      root: a root TrieNode (or anything with the same "children"/"word_end" interface)
+    """
+    offsets = array(cls.typecode, [0])
+    letters = array(cls.typecode)
+    targets = array(cls.typecode)
+    word_ends = bytearray()
+
+    # Nodes may be shared (e.g. in a minimized trie), so number them by identity. The
+    # nodes are kept alive alongside their ids, so that tries whose nodes are built on
+    # the fly (views) can't have an id reused by a later node.
+    ids = {id(root): 0}
+    seen = [root]
+    queue = deque([root])
+    node_id = 0
+    while queue:
+      node = queue.popleft()
+      if node_id % 8 == 0:
+        word_ends.append(0)
+      if node.word_end:
+        word_ends[node_id >> 3] |= 1 << (node_id & 7)
+
+      for letter in sorted(node.children):
+        child = node.children[letter]
+        if id(child) not in ids:
+          ids[id(child)] = len(ids)
+          seen.append(child)
+          queue.append(child)
+        letters.append(ord(letter))
+        targets.append(ids[id(child)])
+
+      offsets.append(len(letters))
+      node_id += 1
+
+    return cls(offsets=offsets, letters=letters, targets=targets, word_ends=word_ends)
+
+
+  def to_trie(self):
+    """Returns a new TrieNode-based trie with the same words as this one"""
+    return TrieNode(words=self.words())
+
+
+  def is_word_end(self, node):
+    """Returns whether the node with id "node" ends a word (bool)"""
+    return bool(self._word_ends[node >> 3] & (1 << (node & 7)))
+
+
+  def child(self, node, letter):
+    """
+    Returns the id of the child of node "node" along "letter", or -1 if there is none.
+
+    Args:
+      node: a node id
+      letter: a string of length 1
+    """
+    lo = self._offsets[node]
+    hi = self._offsets[node + 1]
+    code = ord(letter)
+    i = bisect_left(self._letters, code, lo, hi)
+    if i < hi and self._letters[i] == code:
+      return self._targets[i]
+    return -1
+
+
+  def edges(self, node):
+    """
+    Yields a tuple of (letter, child id) for each child of the node with id "node", in
+    letter order.
+    """
+    for i in range(self._offsets[node], self._offsets[node + 1]):
+      yield chr(self._letters[i]), self._targets[i]
+
+
+  def words(self, node=0, prefix=''):
+    """
+    Yields every word under the node with id "node", in sorted order.
+
+    Args:
+      node: id of the node to start from
+      prefix: string to prepend to every yielded word
+    """
+    stack = [(node, prefix)]
+    while stack:
+      node, prefix = stack.pop()
+      if self.is_word_end(node):
+        yield prefix
+      # Push in reverse so the smallest letter is popped first
+      stack.extend((child, prefix + letter) for letter, child in reversed(list(self.edges(node))))
+
+
+  def index(self, *words):
+    """
+    Add words to the trie.
+
+    The buffers are immutable, so this rebuilds the whole trie. Prefer passing every
+    word to the constructor at once.
+
+    Args:
+      words: strings of words to add to the trie
+    """
+    self._offsets, self._letters, self._targets, self._word_ends, self._remaining = self._build(
+      list(self.words()) + list(words)
+    )
+    self._version += 1
+
+
+  def contains(self, word, prefix=False):
+    """
+    Return True if the trie contains "word". By default only matches whole words, but
+    if "prefix" is True, then also return True if the trie contains the prefix
+    "word".
+    """
+    node = 0
+    for letter in fold(word):
+      node = self.child(node, letter)
+      if node < 0:
+        return False
+    return self.is_word_end(node) or prefix
+
+
+  def _remaining_depths(self):
+    """
+    Returns a 2-tuple of arrays (min_remaining, max_remaining) holding, for each node id,
+    the number of letters to the nearest and furthest word ends at or below the node, or
+    -1 if there are none. Computed on first use and cached.
+    """
+    if self._remaining is not None:
+      return self._remaining
+
+    unvisited, none = -2, -1
+    lo = array('h', [unvisited]) * self.node_count
+    hi = array('h', [unvisited]) * self.node_count
+
+    # Iterative post-order walk; nodes may be shared, so each is finished only once
+    stack = [0]
+    while stack:
+      node = stack[-1]
+      if hi[node] != unvisited:
+        stack.pop()
+        continue
+      children = self._targets[self._offsets[node]:self._offsets[node + 1]]
+      pending = [child for child in children if hi[child] == unvisited]
+      if pending:
+        stack.extend(pending)
+        continue
+
+      stack.pop()
+      below = [(lo[child] + 1, hi[child] + 1) for child in children if hi[child] != none]
+      if self.is_word_end(node):
+        below.append((0, 0))
+      if below:
+        lo[node] = min(l for l, _ in below)
+        hi[node] = max(h for _, h in below)
+      else:
+        lo[node] = hi[node] = none
+
+    self._remaining = (lo, hi)
+    return self._remaining
+
+
+  def remaining(self, node):
+    """
+    Returns a 2-tuple of the number of letters from the node with id "node" to the
+    nearest and furthest word ends at or below it, or (None, None) if there are none.
+    """
+    lo, hi = self._remaining_depths()
+    if hi[node] < 0:
+      return None, None
+    return lo[node], hi[node]
+
+
+  def max_depth(self):
+    """Returns the length of the longest indexed word (int)"""
+    depth = 0
+    level = {0}
+    while True:
+      level = {child for node in level for _, child in self.edges(node)}
+      if not level:
+        return depth
+      depth += 1
+
+
+  def __contains__(self, word):
+    """
+    Shortcut for CompactTrie.contains(word, prefix=False). Overloads "in" operator.
+    """
+    return self.contains(word)
+
+
+  @property
+  def root(self):
+    """Returns a CompactTrieNode view of the root node"""
+    return CompactTrieNode(self, 0)
+
+
+  @property
+  def word_end(self):
+    """Whether the root ends a word, i.e. whether the empty string was indexed"""
+    return self.is_word_end(0)
+
+
+  @property
+  def min_remaining(self):
+    """Length of the shortest indexed word, or None if the trie is empty"""
+    return self.remaining(0)[0]
+
+
+  @property
+  def max_remaining(self):
+    """Length of the longest indexed word, or None if the trie is empty"""
+    return self.remaining(0)[1]
+
+
+  @property
+  def children(self):
+    """Returns a read-only mapping of letter -> CompactTrieNode for the root's children"""
+    return self.root.children
+
+
+  @property
+  def node_count(self):
+    """Returns the number of nodes in the trie, including the root (int)"""
+    return len(self._offsets) - 1
+
+
+  @property
+  def nbytes(self):
+    """
+    Returns the number of bytes used by the trie's buffers (int), including the
+    min/max_remaining arrays once they've been built
+    """
+    buffers = [self._offsets, self._letters, self._targets, self._word_ends]
+    if self._remaining is not None:
+      buffers.extend(self._remaining)
+    return sum(len(buf) * getattr(buf, 'itemsize', 1) for buf in buffers)
+
+
+  def __eq__(self, other):
+    """
+    Return True if "self" contains exactly the same words as "other". Overloads the
+    "==" operator.
+    """
+    if not isinstance(other, CompactTrie):
+      return NotImplemented
+    return list(self.words()) == list(other.words())
+
+
+  def __repr__(self):
+    return "{}(nodes={}, nbytes={})".format(type(self).__name__, self.node_count, self.nbytes)
+
+
+
+class CompactTrieNode:
+  """
+  A lightweight view of a single node in a CompactTrie, providing the "word_end" and
+  "children" attributes that the search engine walks. Views are created on demand and
+  hold nothing but the trie and the node id.
+  """
+  __slots__ = ('trie', 'node')
+
+  def __init__(self, trie, node):
+    """
+    Args:
+      trie: the CompactTrie this node belongs to
+      node: the id of the node (int)
+    """
+    self.trie = trie
+    self.node = node
+
+
+  @property
+  def word_end(self):
+    """Whether this node ends a word (bool)"""
+    return self.trie.is_word_end(self.node)
+
+
+  @property
+  def min_remaining(self):
+    """Letters to the nearest word end at or below this node, or None (see TrieNode)"""
+    return self.trie.remaining(self.node)[0]
+
+
+  @property
+  def max_remaining(self):
+    """Letters to the furthest word end at or below this node, or None (see TrieNode)"""
+    return self.trie.remaining(self.node)[1]
+
+
+  @property
+  def children(self):
+    """Returns a read-only mapping of letter -> CompactTrieNode"""
+    return _CompactChildren(self.trie, self.node)
+
+
+  def __eq__(self, other):
+    if not isinstance(other, CompactTrieNode):
+      return NotImplemented
+    return self.trie is other.trie and self.node == other.node
+
+
+  def __hash__(self):
+    return hash((id(self.trie), self.node))
+
+
+  def __repr__(self):
+    return "{}(node={}, children={{{}}}, word_end={})".format(
+      type(self).__name__,
+      self.node,
+      ', '.join(self.children),
+      self.word_end,
+    )
+
+
+
+class _CompactChildren(Mapping):
+  """The "children" mapping of a CompactTrieNode"""
+  __slots__ = ('_trie', '_node')
+
+  def __init__(self, trie, node):
+    self._trie = trie
+    self._node = node
+
+
+  def __getitem__(self, letter):
+    try:
+      child = self._trie.child(self._node, letter)
+    except TypeError:
+      # Not a single letter, so it can't be a child
+      raise KeyError(letter)
+    if child < 0:
+      raise KeyError(letter)
+    return CompactTrieNode(self._trie, child)
+
+
+  def __iter__(self):
+    return (letter for letter, _ in self._trie.edges(self._node))
+
+
+  def __len__(self):
+    return self._trie._offsets[self._node + 1] - self._trie._offsets[self._node]
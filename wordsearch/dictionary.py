@@ -0,0 +1,396 @@
+"""
+An on-disk dictionary cache that absorbs small dictionary edits without a full rebuild.
+
+A cache merges one or more dictionary files into a single index and lives in a directory
+next to the first of them. It holds:
+
+  manifest.json:  the SHA-256 of each source file's contents when it was last seen, and
+                  its size and modification time, to skip rehashing unchanged files
+  words-HASH.txt: a snapshot of the words of each source, keyed by that hash
+  base.idx:       the merged index as of the last compaction (see wordsearch.index)
+  delta.log:      an append-only log of "+word" / "-word" lines since the base was built
+
+When a source changes, only that source is re-read: its new words are diffed against
+its snapshot, and the words that enter or leave the merged dictionary are appended to the
+log. Loading maps the base index and replays the log into a small overlay (a TrieNode of
+added words, using TrieNode.index(), and a set of removed words, using TrieNode.remove()
+for words added and removed again), so startup stays proportional to the size of the
+edits. Once the log grows past a threshold the cache is compacted: the base is rebuilt
+from the snapshots and the log is emptied.
+
+Usage examples:
+  >>> cache = DictionaryCache(['words.txt', 'extra.txt'])
+  >>> rootnode = cache.load()
+"""
+from wordsearch.compact import CompactTrie
+from wordsearch.index import IndexFormatError, load_index, write_index
+from wordsearch.trie import TrieNode, fold
+from collections.abc import Mapping
+import json, os, time
+
+MANIFEST_VERSION = 1
+
+# Files modified less than this long (in ns) before their signature is taken could still be
+# rewritten within the same timestamp, so their signatures aren't trusted
+_RECENT_NS = 2 * 10**9
+
+
+def read_words(path):
+  """
+  Returns the set of words in the dictionary file at "path", one word per line,
+  case-folded with fold()
+  """
+  with open(path) as f:
+    return {word for word in (fold(line.strip()) for line in f) if word}
+
+
+def file_hash(path):
+  """Returns the hex SHA-256 digest of the contents of the file at "path" (str)"""
+  import hashlib
+  digest = hashlib.sha256()
+  with open(path, 'rb') as f:
+    for chunk in iter(lambda: f.read(1 << 16), b''):
+      digest.update(chunk)
+  return digest.hexdigest()
+
+
+def file_signature(path):
+  """
+  Returns the size and modification time of the file at "path", as a list of ints. If
+  they haven't changed, the file's contents are assumed not to have either.
+  """
+  stat = os.stat(path)
+  return [stat.st_size, stat.st_mtime_ns]
+
+
+def cache_name(sources):
+  """Returns the path of the cache directory for the dictionary files "sources" (str)"""
+  if len(sources) == 1:
+    return sources[0] + '.cache'
+  import hashlib
+  key = '\n'.join(sorted(os.path.abspath(source) for source in sources))
+  return '{}.{}.cache'.format(sources[0], hashlib.sha256(key.encode()).hexdigest()[:12])
+
+
+
+class _DeltaChildren(Mapping):
+  """The children of a _DeltaNode, as a read-only {letter: _DeltaNode} mapping"""
+  __slots__ = ('node',)
+
+  def __init__(self, node):
+    self.node = node
+
+  def __getitem__(self, letter):
+    node = self.node
+    base = node.base.children.get(letter) if node.base is not None else None
+    patch = node.patch.children.get(letter) if node.patch is not None else None
+    if base is None and patch is None:
+      raise KeyError(letter)
+    return _DeltaNode(base, patch, node.prefix + letter, node.removed)
+
+  def __iter__(self):
+    node = self.node
+    letters = set()
+    if node.base is not None:
+      letters.update(node.base.children)
+    if node.patch is not None:
+      letters.update(node.patch.children)
+    return iter(sorted(letters))
+
+  def __len__(self):
+    return sum(1 for _ in self)
+
+
+
+class _DeltaNode:
+  """
+  A node of a DeltaTrie: the node for the same prefix in the base trie and/or the patch
+  trie, either of which may be None.
+
+  min_remaining and max_remaining are bounds rather than exact values, since the base's
+  are not updated for removed words; they stay safe to prune with.
+  """
+  __slots__ = ('base', 'patch', 'prefix', 'removed')
+
+  def __init__(self, base, patch, prefix, removed):
+    self.base = base
+    self.patch = patch
+    self.prefix = prefix
+    self.removed = removed
+
+
+  @property
+  def word_end(self):
+    if self.patch is not None and self.patch.word_end:
+      return True
+    return self.base is not None and self.base.word_end and self.prefix not in self.removed
+
+
+  @property
+  def children(self):
+    return _DeltaChildren(self)
+
+
+  def _remaining(self, attr, pick):
+    values = [getattr(node, attr) for node in (self.base, self.patch) if node is not None]
+    values = [value for value in values if value is not None]
+    return pick(values) if values else None
+
+
+  @property
+  def min_remaining(self):
+    return self._remaining('min_remaining', min)
+
+
+  @property
+  def max_remaining(self):
+    return self._remaining('max_remaining', max)
+
+
+  def __repr__(self):
+    return '{}({!r}, word_end={})'.format(type(self).__name__, self.prefix, self.word_end)
+
+
+
+class DeltaTrie(_DeltaNode):
+  """
+  A read-only trie made of a base trie, a patch trie of added words and a set of removed
+  words. It has the same "children"/"word_end" interface as TrieNode, so every search
+  engine can use it.
+  """
+  __slots__ = ('__weakref__',)
+
+  def __init__(self, base, patch=None, removed=frozenset()):
+    """
+    Args:
+      base: a TrieNode or CompactTrie root
+      patch: a TrieNode root of words to add to "base"
+      removed: a set of words of "base" to leave out
+    """
+    super().__init__(base, patch if patch is not None else TrieNode(), '', removed)
+
+
+  def contains(self, word, prefix=False):
+    """
+    Returns whether "word" is a word (or, if "prefix" is True, a prefix of a word) in
+    this trie (bool).
+    """
+    node = self
+    for letter in fold(word):
+      node = node.children.get(letter)
+      if node is None:
+        return False
+    return prefix or node.word_end
+
+
+  def __contains__(self, word):
+    return self.contains(word)
+
+
+  def words(self):
+    """Yields every word in the trie, in sorted order"""
+    stack = [self]
+    while stack:
+      node = stack.pop()
+      if node.word_end:
+        yield node.prefix
+      stack.extend(node.children[letter] for letter in reversed(list(node.children)))
+
+
+  def max_depth(self):
+    """Returns an upper bound on the length of the longest word in the trie (int)"""
+    return max(self.base.max_depth(), self.patch.max_depth())
+
+
+
+class DictionaryCache:
+  """
+  A cache of the merged index of several dictionary files, see the module docstring.
+  """
+  def __init__(self, sources, path=None, compact_after=1000):
+    """
+    Args:
+      sources: a list of paths of dictionary files (one word per line) to merge
+      path: the cache directory, defaults to cache_name(sources)
+      compact_after: compact the cache once the delta log has more entries than this
+    """
+    if not sources:
+      raise ValueError("At least one dictionary is required")
+    self.sources = list(sources)
+    self.path = path if path is not None else cache_name(self.sources)
+    self.compact_after = compact_after
+
+
+  def _file(self, name):
+    return os.path.join(self.path, name)
+
+
+  def _snapshot(self, digest):
+    return self._file('words-{}.txt'.format(digest))
+
+
+  def _read_manifest(self):
+    """Returns the manifest dict, or None if it is missing or unreadable"""
+    try:
+      with open(self._file('manifest.json')) as f:
+        manifest = json.load(f)
+    except (OSError, ValueError):
+      return None
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+      return None
+    return manifest
+
+
+  def _write_manifest(self, hashes, signatures, log_entries):
+    """Atomically replace the manifest"""
+    now = time.time_ns()
+    signatures = {source: signature for source, signature in signatures.items()
+                  if signature[1] < now - _RECENT_NS}
+    manifest = {
+      'version': MANIFEST_VERSION, 'sources': hashes, 'signatures': signatures,
+      'log_entries': log_entries,
+    }
+    tmp_path = '{}.{}.tmp'.format(self._file('manifest.json'), os.getpid())
+    with open(tmp_path, 'w') as f:
+      json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, self._file('manifest.json'))
+
+
+  def _write_snapshot(self, digest, words):
+    path = self._snapshot(digest)
+    if not os.path.exists(path):
+      tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+      with open(tmp_path, 'w') as f:
+        f.writelines(word + '\n' for word in sorted(words))
+      os.replace(tmp_path, path)
+
+
+  def _remove_stale_snapshots(self, hashes):
+    keep = {os.path.basename(self._snapshot(digest)) for digest in hashes.values()}
+    for name in os.listdir(self.path):
+      if name.startswith('words-') and name.endswith('.txt') and name not in keep:
+        os.remove(self._file(name))
+
+
+  def _read_log(self):
+    """Returns the delta log's entries, as a list of ("+" or "-", word) tuples"""
+    try:
+      with open(self._file('delta.log')) as f:
+        return [(line[0], line[1:].rstrip('\n')) for line in f if line[:1] in ('+', '-')]
+    except FileNotFoundError:
+      return []
+
+
+  def compact(self):
+    """
+    Rebuild the base index from the current contents of every source and empty the
+    delta log.
+
+    Returns: the merged trie, a MappedTrie
+    """
+    os.makedirs(self.path, exist_ok=True)
+    hashes = {}
+    signatures = {}
+    words = set()
+    for source in self.sources:
+      signatures[source] = file_signature(source)
+      digest = hashes[source] = file_hash(source)
+      source_words = read_words(source)
+      self._write_snapshot(digest, source_words)
+      words |= source_words
+
+    write_index(CompactTrie(words=words), self._file('base.idx'), 0)
+    # Write an empty log before the manifest: a crash in between leaves the old manifest,
+    # so the next load reapplies the source changes, which is harmless.
+    with open(self._file('delta.log'), 'w'):
+      pass
+    self._write_manifest(hashes, signatures, 0)
+    self._remove_stale_snapshots(hashes)
+    return load_index(self._file('base.idx'))[1]
+
+
+  def update(self):
+    """
+    Bring the delta log up to date with the sources, compacting if it has grown past
+    "compact_after" entries.
+
+    Returns: whether the cache was compacted (bool)
+    """
+    manifest = self._read_manifest()
+    if manifest is None or not os.path.exists(self._file('base.idx')):
+      self.compact()
+      return True
+
+    old_hashes = manifest['sources']
+    old_signatures = manifest.get('signatures', {})
+    signatures = {source: file_signature(source) for source in self.sources}
+    hashes = {
+      source: old_hashes[source]
+      if source in old_hashes and old_signatures.get(source) == signatures[source]
+      else file_hash(source)
+      for source in self.sources
+    }
+    changed = [source for source in set(old_hashes) | set(hashes)
+               if old_hashes.get(source) != hashes.get(source)]
+    if not changed:
+      if signatures != old_signatures:
+        # Touched but not edited: remember the new signatures to skip hashing next time
+        self._write_manifest(hashes, signatures, manifest.get('log_entries', 0))
+      return False
+
+    # Diff the merged dictionary before and after, re-reading only the changed sources
+    try:
+      before = {source: read_words(self._snapshot(digest)) for source, digest in old_hashes.items()}
+    except FileNotFoundError:
+      self.compact()
+      return True
+    after = {source: before[source] for source in hashes if source not in changed}
+    for source in hashes:
+      if source in changed:
+        after[source] = read_words(source)
+        self._write_snapshot(hashes[source], after[source])
+    merged_before = set().union(*before.values())
+    merged_after = set().union(*after.values())
+    entries = ['+' + word for word in sorted(merged_after - merged_before)]
+    entries.extend('-' + word for word in sorted(merged_before - merged_after))
+
+    log_entries = manifest.get('log_entries', 0) + len(entries)
+    if log_entries > self.compact_after:
+      self.compact()
+      return True
+
+    with open(self._file('delta.log'), 'a') as f:
+      f.writelines(entry + '\n' for entry in entries)
+    self._write_manifest(hashes, signatures, log_entries)
+    self._remove_stale_snapshots(hashes)
+    return False
+
+
+  def load(self):
+    """
+    Update the cache (see update()) and return the merged trie.
+
+    Returns: a MappedTrie if the delta log is empty, otherwise a DeltaTrie over one
+    """
+    try:
+      self.update()
+      base = load_index(self._file('base.idx'))[1]
+    except IndexFormatError:
+      base = self.compact()
+
+    patch = TrieNode()
+    removed = set()
+    for op, word in self._read_log():
+      if op == '+':
+        if word in removed:
+          removed.discard(word)
+        elif word not in base and word not in patch:
+          patch.index(word)
+      elif word in patch:
+        patch.remove(word)
+      elif word in base:
+        removed.add(word)
+
+    if not patch.children and not removed:
+      return base
+    return DeltaTrie(base, patch, removed)
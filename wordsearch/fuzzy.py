@@ -0,0 +1,142 @@
+"""
+Searching boards with misread letters: wildcard cells and substitutions.
+
+Boards that come from OCR can have letters that were misread, or that couldn't be read at
+all and were written as a wildcard ("?"). Instead of following one path down the trie
+and stopping at the first letter that isn't a child, each run is walked with a frontier
+of trie nodes: a wildcard cell moves every node in the frontier to all of its children,
+and any other cell moves each node to the matching child for free, or to every other
+child at the cost of one substitution, as long as the run's budget allows.
+
+The frontier is kept small in three ways: nodes that no word short enough to fit in the
+rest of the run (or within max_length) passes through are dropped, using each node's
+min_remaining and max_remaining; a node is only kept once per position of the run, with
+the cheapest way of reaching it; and the substitution budget is usually tiny.
+
+Usage examples:
+  >>> for hit in search_board_fuzzy(board, rootnode, max_substitutions=1):
+  ...   print(hit.word, hit.substitutions)
+"""
+from wordsearch.board import _room, flat_letters
+from wordsearch.compact import CompactTrieNode
+from wordsearch.main import Hit, _directions
+from collections import namedtuple
+
+# A word found by search_board_fuzzy(): the fields of a Hit, plus the letters of the run
+# that had to be read differently, as a tuple of (offset in the word, letter on the
+# board, letter in the word). Wildcards are listed too, so they can be highlighted.
+FuzzyHit = namedtuple('FuzzyHit', Hit._fields + ('substitutions',))
+
+
+def search_board_fuzzy(board, rootnode, max_substitutions=1, wildcard='?', min_length=0,
+                       max_length=None):
+  """
+  A generator that searches for words in "board" using the trie rooted by "rootnode",
+  letting cells holding "wildcard" stand for any letter and up to "max_substitutions"
+  other cells per word stand for a different letter, and yields the longest word found
+  along each run.
+
+  Of several words of the same length along a run, the one with the fewest substitutions
+  is yielded, then the first in alphabetical order. Wildcards don't count towards
+  "max_substitutions". With no substitutions allowed and no wildcards on the board, the
+  words are the same as wordsearch.main.search_board() finds, in the same order.
+
+  Args:
+    board: a Board or CompactBoard to search
+    rootnode: a TrieNode-like root with min_remaining and max_remaining (e.g. a TrieNode,
+              CompactTrie or MappedTrie)
+    max_substitutions: the number of letters per word that may differ from the board
+    wildcard: the letter that stands for any letter, or None for no wildcards
+    min_length: skip words shorter than this
+    max_length: if given, only find words of at most this length
+
+  Yields: a FuzzyHit for the longest word found along each run that has one
+  """
+  width, height = board.width, board.height
+  if max_length is None:
+    max_length = max(width, height)
+  if rootnode.max_remaining is None or max_length < min_length:
+    return
+  text = flat_letters(board)
+
+  for y in range(height):
+    for x in range(width):
+      start = y * width + x
+      for direction in _directions:
+        dx, dy = direction
+        room = min(max_length, _room(x, y, dx, dy, width, height))
+        if room < min_length:
+          continue
+
+        best = _walk(text, start, dy * width + dx, room, rootnode, max_substitutions, wildcard, min_length)
+        if best is not None:
+          word, substitutions = best
+          yield FuzzyHit(word, x, y, direction, len(word), substitutions)
+
+
+def _walk(text, start, step, room, rootnode, max_substitutions, wildcard, min_length):
+  """
+  Walk one run of "room" letters of the flat board "text", from "start" by "step".
+
+  Returns: a 2-tuple of (word, substitutions) for the best word along the run, or None
+  """
+  frontier = {_state(rootnode): (rootnode, 0, '', ())}
+  best = None
+  pos = start
+  for depth in range(1, room + 1):
+    frontier = _advance(frontier, text[pos], depth, room - depth, max_substitutions, wildcard, min_length)
+    if not frontier:
+      break
+    # A word ending here is longer than any found so far, so it replaces them
+    ends = [(cost, word, substitutions) for node, cost, word, substitutions in frontier.values()
+            if node.word_end]
+    if ends and depth >= min_length:
+      _, word, substitutions = min(ends)
+      best = word, substitutions
+    pos += step
+  return best
+
+
+def _advance(frontier, letter, depth, left, max_substitutions, wildcard, min_length):
+  """
+  Returns the frontier after reading "letter" as the "depth"th letter of a run, with
+  "left" letters of the run still to come.
+
+  A frontier maps the _state() of each node reached to (node, cost, word so far,
+  substitutions so far), keeping only the cheapest way of reaching each node.
+  """
+  reached = {}
+  for node, cost, prefix, substitutions in frontier.values():
+    if letter == wildcard or cost < max_substitutions:
+      moves = node.children.items()
+    else:
+      child = node.children.get(letter)
+      moves = () if child is None else ((letter, child),)
+
+    for child_letter, child in moves:
+      new_cost, new_substitutions = cost, substitutions
+      if child_letter != letter:
+        if letter != wildcard:
+          new_cost += 1
+        new_substitutions = substitutions + ((depth - 1, letter, child_letter),)
+
+      # Drop nodes below which no word fits in the rest of the run or is long enough
+      if (child.max_remaining is None or child.min_remaining > left
+          or depth + child.max_remaining < min_length):
+        continue
+      key = _state(child)
+      if key in reached and (reached[key][1], reached[key][2]) <= (new_cost, prefix + child_letter):
+        continue
+      reached[key] = (child, new_cost, prefix + child_letter, new_substitutions)
+  return reached
+
+
+def _state(node):
+  """
+  Returns a key that is the same for two nodes exactly when they are the same node of a
+  trie. A CompactTrie hands out a new CompactTrieNode view each time a child is looked
+  up, so views are told apart by their node id instead.
+  """
+  if isinstance(node, CompactTrieNode):
+    return node.node
+  return id(node)
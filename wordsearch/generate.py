@@ -0,0 +1,76 @@
+"""
+Building random boards for benchmarks and correctness checks.
+
+wordsearch.main.random_board() draws the letters; this module adds letter frequencies
+taken from a dictionary, and planting known words at recorded positions, so that a
+search of the board can be checked against them.
+
+Usage examples:
+  >>> rng = random.Random(42)
+  >>> board = random_board(1000, 1000, rng, letter_weights(rootnode.words()))
+  >>> board, planted = plant_words(board, ['banker', 'scientist'], rng)
+"""
+from wordsearch.board import CompactBoard
+from wordsearch.main import Hit, _directions
+from collections import Counter
+import random
+
+
+def letter_weights(words):
+  """
+  Returns how often each letter occurs in "words", as a dict of {letter: count}, to be
+  passed to random_board() as "weights".
+
+  Args:
+    words: an iterable of words, e.g. a trie's words()
+  """
+  counts = Counter()
+  for word in words:
+    counts.update(word)
+  return dict(counts)
+
+
+def plant_words(board, words, rng=None, attempts=1000):
+  """
+  Write each of "words" into a copy of "board" along a random run, without changing a
+  letter that an earlier word was written with (words may cross where they agree).
+
+  Args:
+    board: a CompactBoard
+    words: an iterable of words, each a string of single latin-1 letters
+    rng: a random.Random to draw positions from, defaults to the "random" module's
+         global one
+    attempts: how many random positions to try for each word before giving up with a
+              ValueError
+
+  Returns: a 2-tuple of (the new CompactBoard, a list of the Hit where each word was
+           planted, in order)
+  """
+  if rng is None:
+    rng = random
+  width, height = board.width, board.height
+  letters = bytearray(board.buffer)
+  planted = bytearray(width * height)
+  hits = []
+
+  for word in words:
+    encoded = word.encode('latin-1')
+    for _ in range(attempts):
+      direction = rng.choice(_directions)
+      x, y = rng.randrange(width), rng.randrange(height)
+      dx, dy = direction
+      end_x, end_y = x + dx * (len(word) - 1), y + dy * (len(word) - 1)
+      if not (0 <= end_x < width and 0 <= end_y < height):
+        continue
+      cells = [(y + dy * i) * width + x + dx * i for i in range(len(word))]
+      if all(not planted[cell] or letters[cell] == letter for cell, letter in zip(cells, encoded)):
+        break
+    else:
+      raise ValueError('Could not fit "{}" into a {}x{} board'.format(word, width, height))
+
+    for cell, letter in zip(cells, encoded):
+      letters[cell] = letter
+      planted[cell] = 1
+    hits.append(Hit(word, x, y, direction, len(word)))
+
+  return CompactBoard.from_bytes(bytes(letters), width, height), hits
@@ -0,0 +1,145 @@
+"""
+Keep the words found in a board up to date as its letters are edited.
+
+A run can't be longer than the trie is deep, so changing one letter only affects the
+runs that start within max_depth - 1 cells of it, looking back along each direction.
+Only those runs are walked again, so the cost of an edit depends on the depth of the
+trie, not on the size of the board.
+"""
+from wordsearch.main import Hit, _directions, start_board_run, start_trie_search
+from wordsearch.trie import fold
+from bisect import bisect_left, insort
+
+
+def _longest_word(board, rootnode, start, direction):
+  """
+  Returns the longest word along the run from "start" in "direction", or None. This is
+  the word search_board() yields for that run.
+  """
+  board_run = start_board_run(start, direction, board)
+  trie_search = start_trie_search(rootnode)
+  next(trie_search)   #Prime trie_search
+
+  letters = []
+  last_word_end = None
+  try:
+    while True:
+      letters.append(next(board_run))
+      if trie_search.send(letters[-1]):
+        last_word_end = len(letters)
+  except StopIteration:
+    pass
+
+  if last_word_end is None:
+    return None
+  return ''.join(letters[:last_word_end])
+
+
+class IncrementalSearch:
+  """
+  The result of searching a board, kept up to date as the board is edited through
+  IncrementalSearch.update().
+
+  Usage examples:
+    >>> search = IncrementalSearch(Board([['c', 'a', 't']]), TrieNode(words=['cat', 'car']))
+    >>> list(search)
+    ['cat']
+    >>> added, removed = search.update(2, 0, 'r')
+    >>> [hit.word for hit in added], [hit.word for hit in removed]
+    (['car'], ['cat'])
+
+  """
+  def __init__(self, board, rootnode):
+    """
+    Search "board" in full. The board should only be edited through update() from
+    then on.
+
+    Args:
+      board: a Board to search
+      rootnode: a TrieNode or CompactTrie that roots a trie used to identify words
+    """
+    self.board = board
+    self.rootnode = rootnode
+    self._depth = rootnode.max_depth()
+
+    # The longest word of each run that has one, keyed by the run's number in the order
+    # search_board() walks runs (see _run()), and those numbers kept sorted
+    self._words = {}
+    for x, y, _ in board:
+      for d, direction in enumerate(_directions):
+        word = _longest_word(board, rootnode, (x, y), direction)
+        if word is not None:
+          self._words[self._run(x, y, d)] = word
+    self._order = sorted(self._words)
+
+
+  def _run(self, x, y, d):
+    """Returns the number of the run from (x, y) in _directions[d] (int)"""
+    return (y * self.board.width + x) * len(_directions) + d
+
+
+  def update(self, x, y, letter):
+    """
+    Set board[x, y] to "letter", case-folded with fold(), and re-search the runs
+    passing through it.
+
+    Args:
+      x: x-coordinate of the letter to change
+      y: y-coordinate of the letter to change
+      letter: the new letter
+
+    Returns: a 2-tuple of (added, removed) lists of Hits. A run whose word changed
+             appears in both.
+    """
+    self.board[x, y] = fold(letter)
+    width, height = self.board.width, self.board.height
+
+    added = []
+    removed = []
+    for d, direction in enumerate(_directions):
+      dx, dy = direction
+      # Runs starting up to depth - 1 cells before (x, y) can reach it
+      for back in range(self._depth):
+        sx, sy = x - back * dx, y - back * dy
+        if not (0 <= sx < width and 0 <= sy < height):
+          break
+        run = self._run(sx, sy, d)
+        old = self._words.get(run)
+        new = _longest_word(self.board, self.rootnode, (sx, sy), direction)
+        if old == new:
+          continue
+        if old is not None:
+          removed.append(Hit(old, sx, sy, direction, len(old)))
+        if new is not None:
+          added.append(Hit(new, sx, sy, direction, len(new)))
+          self._words[run] = new
+          if old is None:
+            insort(self._order, run)
+        else:
+          del self._words[run]
+          del self._order[bisect_left(self._order, run)]
+
+    return added, removed
+
+
+  def hits(self):
+    """
+    Yields a Hit for every word currently found, in the order search_board() would
+    yield them.
+    """
+    width = self.board.width
+    for run in self._order:
+      cell, d = divmod(run, len(_directions))
+      sy, sx = divmod(cell, width)
+      word = self._words[run]
+      yield Hit(word, sx, sy, _directions[d], len(word))
+
+
+  def __iter__(self):
+    """Yields every word currently found, in the order search_board() would yield them"""
+    return (hit.word for hit in self.hits())
+
+
+  def __len__(self):
+    """Returns the number of words currently found"""
+    return len(self._words)
@@ -0,0 +1,129 @@
+"""
+A versioned on-disk format for CompactTrie that can be memory-mapped and searched in place.
+
+Layout (native byte order, checked on load):
+  header:         magic, version, byte order marker, source mtime, node count, edge count,
+                  length of the word_ends bitset
+  offsets:        (node count + 1) unsigned 32-bit ints
+  letters:        (edge count) unsigned 32-bit ints
+  targets:        (edge count) unsigned 32-bit ints
+  min_remaining:  (node count) signed 16-bit ints
+  max_remaining:  (node count) signed 16-bit ints
+  word_ends:      bitset bytes
+
+Because the buffers are used straight out of the mapping, loading an index costs a
+handful of syscalls regardless of dictionary size, and every process that maps the same
+file shares one page-cached copy of it.
+"""
+from wordsearch.compact import CompactTrie
+from array import array
+import mmap, os, struct
+
+MAGIC = b'WSIX'
+VERSION = 2
+_BYTE_ORDER_MARK = 0x01020304
+_header = struct.Struct('=4sIIdIII')
+
+
+class IndexFormatError(ValueError):
+  """Raised when a file is not an index this version of wordsearch can read"""
+
+
+class MappedTrie(CompactTrie):
+  """
+  A CompactTrie whose buffers live in a memory-mapped index file.
+
+  Pickling a MappedTrie only records the index's path; unpickling maps the file again,
+  so e.g. worker processes share the same page-cached copy instead of each receiving
+  their own.
+  """
+  def __init__(self, path, **buffers):
+    """
+    Args:
+      path: the index file the buffers are mapped from
+      buffers: the offsets, letters, targets and word_ends buffers, as for CompactTrie
+    """
+    super().__init__(**buffers)
+    self.path = path
+
+
+  def __reduce__(self):
+    return _remap, (self.path,)
+
+
+
+def _remap(path):
+  """Unpickling helper for MappedTrie"""
+  return load_index(path)[1]
+
+
+def write_index(trie, path, mtime):
+  """
+  Write "trie" to "path" in the index format.
+
+  The file is written next to its destination and then renamed over it, so concurrent
+  readers either see the old index or the new one, never a partial file.
+
+  Args:
+    trie: a CompactTrie
+    path: file path to write to
+    mtime: the modification time of the source dictionary, used for invalidation
+  """
+  buffers = [array(CompactTrie.typecode, buf) for buf in (trie._offsets, trie._letters, trie._targets)]
+  buffers.extend(array('h', buf) for buf in trie._remaining_depths())
+  word_ends = bytes(trie._word_ends)
+
+  tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+  with open(tmp_path, 'wb') as f:
+    f.write(_header.pack(
+      MAGIC, VERSION, _BYTE_ORDER_MARK, mtime,
+      trie.node_count, len(buffers[1]), len(word_ends),
+    ))
+    for buf in buffers:
+      buf.tofile(f)
+    f.write(word_ends)
+  os.replace(tmp_path, path)
+
+
+def load_index(path):
+  """
+  Memory-map the index at "path".
+
+  Args:
+    path: file path of an index written by write_index()
+
+  Returns: a 2-tuple of (source mtime, MappedTrie)
+  """
+  with open(path, 'rb') as f:
+    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+  if len(mapped) < _header.size:
+    raise IndexFormatError('"{}" is too short to be an index'.format(path))
+  magic, version, mark, mtime, nodes, edges, word_ends_len = _header.unpack_from(mapped)
+  if magic != MAGIC:
+    raise IndexFormatError('"{}" is not an index file'.format(path))
+  if version != VERSION:
+    raise IndexFormatError('"{}" has index version {}, expected {}'.format(path, version, VERSION))
+  if mark != _BYTE_ORDER_MARK:
+    raise IndexFormatError('"{}" was written on a machine with a different byte order'.format(path))
+
+  view = memoryview(mapped)
+  pos = _header.size
+  buffers = []
+  for count, typecode in [(nodes + 1, CompactTrie.typecode), (edges, CompactTrie.typecode),
+                          (edges, CompactTrie.typecode), (nodes, 'h'), (nodes, 'h')]:
+    size = count * array(typecode).itemsize
+    if pos + size > len(view):
+      raise IndexFormatError('"{}" is truncated'.format(path))
+    buffers.append(view[pos:pos + size].cast(typecode))
+    pos += size
+  word_ends = view[pos:pos + word_ends_len]
+
+  if len(word_ends) != word_ends_len:
+    raise IndexFormatError('"{}" is truncated'.format(path))
+
+  offsets, letters, targets, min_remaining, max_remaining = buffers
+  return mtime, MappedTrie(
+    path, offsets=offsets, letters=letters, targets=targets, word_ends=word_ends,
+    remaining=(min_remaining, max_remaining),
+  )
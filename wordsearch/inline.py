@@ -0,0 +1,75 @@
+"""
+A search engine that walks runs with plain arithmetic instead of generators.
+
+wordsearch.main.search_board() starts a board-run generator, a trie-search generator and
+a list of letters for every (cell, direction), and slices and joins the list to build
+each word. This engine reads the board as one flat row-major sequence of letters (the
+row buffer of a CompactBoard, decoded once), steps through it by a fixed offset per
+direction while stepping down the trie in the same loop, and only remembers where the
+longest word ends. A string is only built, by slicing the flat board, for a word that is
+actually yielded.
+"""
+from wordsearch.board import _room, flat_letters, run_word
+from wordsearch.main import _directions, _live_starts
+from wordsearch.main import search_board as generator_search_board
+
+
+def search_board(board, rootnode, workers=None, min_length=None, max_length=None, stats=None,
+                 prefilter=True):
+  """
+  A generator that searches for words in "board" using the trie rooted by "rootnode"
+  and yields the words found.
+
+  A drop-in for wordsearch.main.search_board(), yielding exactly the same words in the
+  same order. Searches with "workers" or "stats" are handed to it as they are.
+
+  Args:
+    board: a Board or CompactBoard to search
+    rootnode: a TrieNode-like root (e.g. a CompactTrie or MappedTrie)
+    workers, min_length, max_length, stats, prefilter: as for wordsearch.main.search_board()
+
+  Yields: a word found in board (string)
+  """
+  if stats is not None or (workers is not None and workers > 1):
+    yield from generator_search_board(board, rootnode, workers, min_length, max_length, stats, prefilter)
+    return
+
+  width, height = board.width, board.height
+  bounded = min_length is not None or max_length is not None
+  min_length = min_length or 0
+  if max_length is None:
+    max_length = max(width, height)
+  if bounded and (rootnode.max_remaining is None or rootnode.max_remaining < min_length
+                  or max_length < min_length):
+    return
+
+  text = flat_letters(board)
+  live = list(zip(_directions, _live_starts(board, rootnode, prefilter)))
+
+  for y in range(height):
+    for x in range(width):
+      start = y * width + x
+      for (dx, dy), flags in live:
+        if not flags[start]:
+          continue
+        room = min(max_length, _room(x, y, dx, dy, width, height))
+        if room < min_length:
+          continue
+
+        step = dy * width + dx
+        pos = start
+        node = rootnode
+        longest = 0
+        for depth in range(1, room + 1):
+          node = node.children.get(text[pos])
+          if node is None:
+            break
+          if node.word_end:
+            longest = depth
+          if bounded and (node.max_remaining is None or depth + node.max_remaining < min_length
+                          or depth + node.min_remaining > max_length):
+            break
+          pos += step
+
+        if longest and longest >= min_length:
+          yield run_word(text, start, step, longest)
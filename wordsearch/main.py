@@ -2,8 +2,14 @@
 # Livin' in the future!
 from __future__ import generator_stop
 
-from wordsearch.board import Board
-import string, random
+from wordsearch.board import Board, CompactBoard, _room
+from collections import namedtuple
+from array import array
+import sys
+
+# The letters of random boards by default. (Spelled out rather than taken from the
+# "string" module, which is slow to import.)
+_lowercase = 'abcdefghijklmnopqrstuvwxyz'
 
 
 def start_board_run(start, direction, board):
@@ -71,7 +77,8 @@ def start_trie_search(root):
 _directions = [(x, y) for x in range(-1, 2) for y in range (-1, 2) if not (x == 0 and y == 0)]
 
 
-def search_board(board, rootnode):
+def search_board(board, rootnode, workers=None, min_length=None, max_length=None, stats=None,
+                 prefilter=True):
   """
   A generator that searches for words in "board" using the trie rooted by "rootnode"
   and yields the words found.
@@ -79,44 +86,468 @@ def search_board(board, rootnode):
   Args:
     board: a Board to search
     rootnode: a TrieNode that roots a trie used to identify words
+    workers: if greater than 1, search with a pool of this many processes. The words
+             are still yielded in the same order as a serial search.
+    min_length: if given, skip runs whose longest word is shorter than this. Runs are
+                abandoned as soon as no long enough word can be reached, and runs
+                that would leave the board too soon are never started.
+    max_length: if given, yield the longest word of at most this length per run, and
+                stop walking runs at this length.
+    stats: a wordsearch.stats.SearchStats to count what every run does in. The counting
+           is done by a separate copy of the search loop, so searches without it pay
+           nothing. Not supported with "workers".
+    prefilter: rule out the runs that can't yield a word in bulk before walking any,
+               using the trie's short prefixes (see wordsearch.prefilter). The words
+               yielded are the same either way.
 
   Yields: a word found in board (string)
   """
-  for x, y, letter in board:
+  if stats is not None:
+    if workers is not None and workers > 1:
+      raise ValueError("Search stats are only collected by serial searches")
+    yield from _search_rows_instrumented(
+      board, rootnode, range(board.height), stats, min_length, max_length, prefilter,
+    )
+  elif workers is not None and workers > 1:
+    yield from _search_parallel(board, rootnode, workers, min_length, max_length, prefilter)
+  else:
+    yield from _search_rows(board, rootnode, range(board.height), min_length, max_length, prefilter)
+
+
+def _per_trie(cache, rootnode, build):
+  """
+  Returns what "build" derives from "rootnode" (such as the tables an engine walks
+  instead of the trie), building it with build(rootnode) on first use and keeping it in
+  the dict "cache", keyed by the trie's id, until the trie is garbage collected.
+
+  A trie that was changed since with index() or remove() has a new "_version", and gets
+  a fresh build.
+  """
+  key = id(rootnode)
+  version = getattr(rootnode, '_version', 0)
+  entry = cache.get(key)
+  if entry is None:
+    import weakref
+    weakref.finalize(rootnode, cache.pop, key, None)
+  if entry is None or entry[0] != version:
+    entry = cache[key] = (version, build(rootnode))
+  return entry[1]
+
+
+def _live_starts(board, rootnode, prefilter=True):
+  """
+  Returns a list with, for each of _directions in turn, one flag per cell of "board" in
+  row-major order that is 0 if the run from that cell in that direction can't yield a
+  word. Every flag is 1 without "prefilter", or if the trie can't be prefiltered.
+  """
+  if prefilter:
+    from wordsearch.prefilter import prefilter_for
+    prefixes = prefilter_for(rootnode)
+    if prefixes is not None:
+      live = prefixes.live_starts(board, _directions)
+      return [live[direction] for direction in _directions]
+  return [b'\1' * (board.width * board.height)] * len(_directions)
+
+
+def _search_rows(board, rootnode, rows, min_length=None, max_length=None, prefilter=True):
+  """
+  Search only the runs that start in "rows" of "board". Yields the same words as
+  search_board() would for those rows.
+
+  Args:
+    board: a Board to search
+    rootnode: a TrieNode that roots a trie used to identify words
+    rows: an iterable of y-coordinates to start runs from
+    min_length, max_length, prefilter: as for search_board()
+
+  Yields: a word found in board (string)
+  """
+  if min_length is not None or max_length is not None:
+    yield from _search_rows_bounded(board, rootnode, rows, min_length or 0, max_length, prefilter)
+    return
+
+  width = board.width
+  live = list(zip(_directions, _live_starts(board, rootnode, prefilter)))
+  for y in rows:
+    for x in range(width):
+      cell = y * width + x
+      for direction, flags in live:
+        if not flags[cell]:
+          continue
+        board_run = start_board_run((x, y), direction, board)
+        trie_search = start_trie_search(rootnode)
+        next(trie_search)   #Prime trie_search
+        
+        letters = []
+        last_word_end = None
+
+        # Try advancing both generators until one runs out. That means we've either hit
+        # the edge of the board or the bottom of the trie.
+        #
+        # Keep track of the letters as we go and the location of the last-found
+        # word_end flag in the trie. When we hit then end, grab all the letters until
+        # the last-found flag.
+        try:
+          while True:
+            letter = next(board_run)
+            letters.append(letter)
+            word_end = trie_search.send(letter)
+            if word_end:
+              last_word_end = len(letters)
+        except StopIteration:
+          pass
+
+        if last_word_end is not None:
+          yield ''.join(letters[:last_word_end])
+
+
+def _search_rows_bounded(board, rootnode, rows, min_length, max_length, prefilter=True):
+  """
+  Like _search_rows(), but only yields words of length min_length to max_length,
+  using the trie's min_remaining/max_remaining to cut runs short.
+  """
+  width, height = board.width, board.height
+  if max_length is None:
+    max_length = max(width, height)
+  if rootnode.max_remaining is None or rootnode.max_remaining < min_length or max_length < min_length:
+    return
+
+  live = list(zip(_directions, _live_starts(board, rootnode, prefilter)))
+  for y in rows:
+    for x in range(width):
+      cell = y * width + x
+      for (dx, dy), flags in live:
+        if not flags[cell]:
+          continue
+        room = min(max_length, _room(x, y, dx, dy, width, height))
+        if room < min_length:
+          continue
+
+        node = rootnode
+        letters = []
+        last_word_end = None
+        cx, cy = x, y
+        for depth in range(1, room + 1):
+          letter = board[cx, cy]
+          try:
+            node = node.children[letter]
+          except KeyError:
+            break
+          letters.append(letter)
+          if node.word_end:
+            last_word_end = depth
+
+          # Stop as soon as no word of a wanted length is reachable below this node
+          if (node.max_remaining is None or depth + node.max_remaining < min_length
+              or depth + node.min_remaining > max_length):
+            break
+          cx += dx
+          cy += dy
+
+        if last_word_end is not None and last_word_end >= min_length:
+          yield ''.join(letters[:last_word_end])
+
+
+def _search_rows_instrumented(board, rootnode, rows, stats, min_length=None, max_length=None,
+                              prefilter=True):
+  """
+  Like _search_rows(), but records every run in "stats" (a SearchStats). Yields the
+  same words as _search_rows().
+  """
+  bounded = min_length is not None or max_length is not None
+  min_length = min_length or 0
+  width, height = board.width, board.height
+  if max_length is None:
+    max_length = max(width, height)
+  if bounded and (rootnode.max_remaining is None or rootnode.max_remaining < min_length
+                  or max_length < min_length):
+    return
+
+  live = list(zip(_directions, _live_starts(board, rootnode, prefilter)))
+  for y in rows:
+    for x in range(width):
+      cell = y * width + x
+      for (dx, dy), flags in live:
+        room = _room(x, y, dx, dy, width, height)
+        limit = min(room, max_length) if bounded else room
+        if limit < min_length:
+          stats.skipped += 1
+          continue
+        if not flags[cell]:
+          stats.filtered += 1
+          continue
+        stats.runs += 1
+
+        node = rootnode
+        letters = []
+        last_word_end = None
+        cx, cy = x, y
+        depth = 0
+        while True:
+          if depth == limit:
+            if depth == room:
+              stats.edge_ends += 1
+            else:
+              stats.bound_ends += 1
+            break
+          letter = board[cx, cy]
+          child = node.children.get(letter)
+          if child is None:
+            stats.miss_ends += 1
+            break
+          node = child
+          depth += 1
+          letters.append(letter)
+          if node.word_end:
+            last_word_end = depth
+          if bounded and (node.max_remaining is None or depth + node.max_remaining < min_length
+                          or depth + node.min_remaining > max_length):
+            stats.bound_ends += 1
+            break
+          cx += dx
+          cy += dy
+        stats.steps += depth
+
+        if last_word_end is not None and last_word_end >= min_length:
+          yield ''.join(letters[:last_word_end])
+
+
+# A word found by search_board_hits(): the word, the (x, y) coordinates of its first
+# letter, the direction it reads in (one of _directions) and its length
+Hit = namedtuple('Hit', ['word', 'x', 'y', 'direction', 'length'])
+
+
+def search_board_hits(board, rootnode, min_length=0):
+  """
+  A generator that searches for words in "board" using the trie rooted by "rootnode"
+  and yields every word found along each run, not just the longest, with its position.
+
+  Runs are walked exactly as in search_board(), so for each (cell, direction) the hits
+  are yielded shortest first, and the last one is the word search_board() would yield.
+
+  Args:
+    board: a Board to search
+    rootnode: a TrieNode that roots a trie used to identify words
+    min_length: skip words shorter than this
+
+  Yields: a Hit for each word found
+  """
+  for x, y, _ in board:
     for direction in _directions:
       board_run = start_board_run((x, y), direction, board)
       trie_search = start_trie_search(rootnode)
       next(trie_search)   #Prime trie_search
-      
+
       letters = []
-      last_word_end = None
-
-      # Try advancing both generators until one runs out. That means we've either hit
-      # the edge of the board or the bottom of the trie.
-      #
-      # Keep track of the letters as we go and the location of the last-found
-      # word_end flag in the trie. When we hit then end, grab all the letters until
-      # the last-found flag.
       try:
         while True:
-          letter = next(board_run)
-          letters.append(letter)
-          word_end = trie_search.send(letter)
-          if word_end:
-            last_word_end = len(letters)
+          letters.append(next(board_run))
+          if trie_search.send(letters[-1]) and len(letters) >= min_length:
+            yield Hit(''.join(letters), x, y, direction, len(letters))
       except StopIteration:
         pass
 
-      if last_word_end is not None:
-        yield ''.join(letters[:last_word_end])
 
+# The trie used by worker processes of a parallel search, set by _init_worker()
+_worker_root = None
+
+
+def _init_worker(rootnode):
+  """Pool initializer: make "rootnode" available to _search_band()"""
+  global _worker_root
+  _worker_root = rootnode
 
-def random_board(width, height):
+
+def _search_band(band):
   """
-  Returns a Board of random lowercase letters
-  
+  Search one band of a parallel search.
+
+  Args:
+    band: a 6-tuple of (rows, first, last, min_length, max_length, prefilter), where
+          "rows" is a list of board rows and runs should be started from rows[first:last]
+
+  Returns: a list of the words found
+  """
+  rows, first, last, min_length, max_length, prefilter = band
+  return list(_search_rows(Board(rows), _worker_root, range(first, last), min_length, max_length, prefilter))
+
+
+def _search_parallel(board, rootnode, workers, min_length=None, max_length=None, prefilter=True):
+  """
+  Search "board" with a pool of "workers" processes.
+
+  The board is split into bands of rows, which are handed to the workers along with
+  enough rows above and below (the trie's maximum depth, minus one) that every run
+  starting in the band can be walked to completion. Each run is only started in the
+  band that owns its first cell, so every word is found exactly once, and collecting
+  the bands in order reproduces the serial order.
+
+  The trie is sent to each worker once, when the pool starts. A MappedTrie is sent as
+  the path of its index, so all workers share the same mapping.
+  """
+  from multiprocessing import Pool
+
+  depth = rootnode.max_depth()
+  if max_length is not None:
+    depth = min(depth, max_length)
+  margin = max(depth - 1, 0)
+  # Use a few bands per worker so that uneven bands don't leave workers idle
+  band_height = max(1, -(-board.height // (workers * 4)))
+
+  def bands():
+    for first in range(0, board.height, band_height):
+      last = min(first + band_height, board.height)
+      top = max(first - margin, 0)
+      bottom = min(last + margin, board.height)
+      rows = [[board[x, y] for x in range(board.width)] for y in range(top, bottom)]
+      yield rows, first - top, last - top, min_length, max_length, prefilter
+
+  with Pool(workers, initializer=_init_worker, initargs=(rootnode,)) as pool:
+    for words in pool.imap(_search_band, bands()):
+      yield from words
+
+
+# Names of the available search engines, for select_engine(). Engines with optional
+# dependencies are imported only when selected.
+engines = ['generator', 'numpy', 'aho', 'coded', 'inline']
+
+
+def select_engine(name):
+  """
+  Returns the search_board() implementation for the engine called "name". All engines
+  yield the same words in the same order.
+
+  Args:
+    name: one of "engines"
+  """
+  if name == 'numpy':
+    from wordsearch.vectorized import search_board as numpy_search_board
+    return numpy_search_board
+  if name == 'aho':
+    from wordsearch.aho import search_board as aho_search_board
+    return aho_search_board
+  if name == 'coded':
+    from wordsearch.coded import search_board as coded_search_board
+    return coded_search_board
+  if name == 'inline':
+    from wordsearch.inline import search_board as inline_search_board
+    return inline_search_board
+  if name != 'generator':
+    raise ValueError('Unknown search engine "{}"'.format(name))
+  return search_board
+
+
+def _letter_table(weights):
+  """
+  Returns a 65536-byte table for drawing letters with 16-bit random values: each letter
+  in "weights" fills a share of the table proportional to its weight, and at least one
+  entry if its weight is positive.
+
+  Args:
+    weights: a dict of {letter: weight}, where letters are single latin-1 characters
+  """
+  letters = sorted(letter for letter, weight in weights.items() if weight > 0)
+  if not letters:
+    raise ValueError("At least one letter must have a positive weight")
+  size = 1 << 16
+  total = sum(weights[letter] for letter in letters)
+  shares = [max(1, int(weights[letter] * size / total)) for letter in letters]
+
+  # Rounding leaves the shares a few entries off; settle the difference with the most
+  # common letters first
+  order = sorted(range(len(letters)), key=lambda i: -weights[letters[i]])
+  difference = size - sum(shares)
+  i = 0
+  while difference:
+    j = order[i % len(order)]
+    if difference > 0:
+      shares[j] += 1
+      difference -= 1
+    elif shares[j] > 1:
+      shares[j] -= 1
+      difference += 1
+    i += 1
+
+  try:
+    return b''.join(letter.encode('latin-1') * share for letter, share in zip(letters, shares))
+  except UnicodeEncodeError:
+    raise ValueError("Every letter must be a single latin-1 character")
+
+
+def _random_bytes(rng, count):
+  """
+  Returns "count" random bytes from "rng", the same ones rng.randbytes() returns on
+  Python 3.9 and later
+  """
+  if hasattr(rng, 'randbytes'):
+    return rng.randbytes(count)
+  return rng.getrandbits(count * 8).to_bytes(count, 'little') if count else b''
+
+
+def _uniform_letters(letters, count, rng):
+  """
+  Returns "count" letters drawn uniformly from the string "letters", as latin-1 bytes.
+
+  Random bytes are mapped to letters through a translation table; the few byte values
+  past the last whole multiple of len(letters) are dropped rather than mapped, so that
+  every letter is exactly as likely.
+  """
+  repeats = 256 // len(letters)
+  table = (letters.encode('latin-1') * repeats).ljust(256, b'\0')
+  rejected = bytes(range(len(letters) * repeats, 256))
+
+  result = bytearray()
+  while len(result) < count:
+    needed = count - len(result)
+    result += _random_bytes(rng, needed + needed // 8 + 16).translate(table, rejected)
+  del result[count:]
+  return bytes(result)
+
+
+def _weighted_letters(weights, count, rng):
+  """
+  Returns "count" letters drawn according to "weights" (see random_board()), as latin-1
+  bytes. Each letter is drawn from two random bytes through a _letter_table().
+  """
+  table = _letter_table(weights)
+  data = _random_bytes(rng, 2 * count)
+  try:
+    import numpy as np
+  except ImportError:
+    values = array('H', data)
+    if sys.byteorder == 'big':
+      values.byteswap()
+    return bytes(map(table.__getitem__, values))
+  return np.frombuffer(table, dtype=np.uint8)[np.frombuffer(data, dtype='<u2')].tobytes()
+
+
+def random_board(width, height, rng=None, weights=None):
+  """
+  Returns a CompactBoard of random letters, generated in bulk.
+
+  The board only depends on the state of "rng", so seeding it makes boards
+  reproducible. Equally weighted letters are drawn exactly uniformly; other weights are
+  followed to within 1/65536, using NumPy to speed up the lookups if it is available
+  (the board is the same either way).
+
   Args:
     width: width of the board
     height: height of the board
+    rng: a random.Random to draw from, defaults to the "random" module's global one
+    weights: a dict of {letter: relative frequency}, defaults to every lowercase ASCII
+             letter equally often. See wordsearch.generate.letter_weights().
   """
-  return Board([[random.choice(string.ascii_lowercase) for _ in range(width)] for _ in range(height)])
\ No newline at end of file
+  if rng is None:
+    import random
+    rng = random
+  if weights is None:
+    weights = dict.fromkeys(_lowercase, 1)
+  if any(len(letter) != 1 for letter in weights):
+    raise ValueError("Letter weights must be keyed by single letters")
+
+  count = width * height
+  if len(set(weights.values())) == 1 and next(iter(weights.values())) > 0:
+    letters = _uniform_letters(''.join(sorted(weights)), count, rng)
+  else:
+    letters = _weighted_letters(weights, count, rng)
+  return CompactBoard.from_bytes(letters, width, height)
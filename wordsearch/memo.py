@@ -0,0 +1,241 @@
+"""
+Memoizing search results, for workloads that search the same boards over and over.
+
+Results are keyed by a hash of the board's letters, the identity of the dictionary and
+the search options. Entries live in a size-bounded in-memory LRU and, optionally, in a
+directory on disk (e.g. next to the dictionary cache) that outlives the process.
+
+Only dictionaries with a stable identity are cached on disk: a MappedTrie is identified
+by its index file's path, size and modification time, and a DeltaTrie by its base plus
+its edits. Any other trie (or a MappedTrie changed with index()) is only known within the
+process, by a token that changes along with the trie, so its results stay in memory.
+
+Usage examples:
+  >>> results = ResultCache(max_entries=256, directory='words.txt.cache/results')
+  >>> words = results.search(board, rootnode, 'coded')
+  >>> results.hits, results.misses, results.evictions
+"""
+from wordsearch.board import CompactBoard
+from wordsearch.dictionary import DeltaTrie
+from wordsearch.index import MappedTrie
+from wordsearch.main import _per_trie, select_engine
+from collections import OrderedDict
+import hashlib, itertools, json, os
+
+# Search options that don't change the results, and so are left out of the key
+_unkeyed_options = {'workers', 'stats', 'prefilter'}
+
+
+def board_digest(board):
+  """Returns a hex digest of the dimensions and letters of "board" (str)"""
+  digest = hashlib.blake2b(digest_size=16)
+  digest.update('{}x{}:'.format(board.width, board.height).encode())
+  if isinstance(board, CompactBoard):
+    digest.update(board.buffer)
+  else:
+    digest.update('\x1f'.join(str(letter) for _, _, letter in board).encode('utf-8', 'surrogatepass'))
+  return digest.hexdigest()
+
+
+def _trie_words(node, prefix=''):
+  """Yields every word under a TrieNode-like "node" in sorted order"""
+  stack = [(node, prefix)]
+  while stack:
+    node, prefix = stack.pop()
+    if node.word_end:
+      yield prefix
+    for letter in sorted(node.children, reverse=True):
+      stack.append((node.children[letter], prefix + letter))
+
+
+# Dictionary digests already computed, keyed by the id of their trie
+_digests = {}
+
+# Tokens for tries that are only identified within this process, keyed by the id of their
+# trie. A trie gets a new token whenever it changes, and no token is ever handed out
+# twice, so a trie that reuses the id of a freed one doesn't get its results.
+_tokens = {}
+_token_counter = itertools.count()
+
+
+def dictionary_digest(rootnode):
+  """
+  Returns a string identifying the words of "rootnode" across processes, or None if it
+  can't be identified other than within this process, see dictionary_token().
+  """
+  # A MappedTrie that was changed with index() no longer matches its index file
+  if not isinstance(rootnode, (MappedTrie, DeltaTrie)) or getattr(rootnode, '_version', 0):
+    return None
+  return _per_trie(_digests, rootnode, _dictionary_digest)
+
+
+def dictionary_token(rootnode):
+  """
+  Returns a string identifying "rootnode" as it is now, within this process: it changes
+  when the trie is changed, and isn't reused for another trie.
+  """
+  return 'trie:{}'.format(_per_trie(_tokens, rootnode, lambda rootnode: next(_token_counter)))
+
+
+def _dictionary_digest(rootnode):
+  """Computes dictionary_digest() for a MappedTrie or DeltaTrie"""
+  if isinstance(rootnode, MappedTrie):
+    stat = os.stat(rootnode.path)
+    return 'index:{}:{}:{}'.format(os.path.abspath(rootnode.path), stat.st_size, stat.st_mtime_ns)
+  base = dictionary_digest(rootnode.base)
+  if base is None:
+    return None
+  edits = hashlib.blake2b(digest_size=16)
+  for word in _trie_words(rootnode.patch):
+    edits.update(b'+' + word.encode() + b'\n')
+  for word in sorted(rootnode.removed):
+    edits.update(b'-' + word.encode() + b'\n')
+  return 'delta:{}:{}'.format(base, edits.hexdigest())
+
+
+
+class ResultCache:
+  """
+  A two-tier cache of search results (lists of words), see the module docstring.
+
+  Attributes:
+    hits: lookups answered from memory or disk
+    misses: lookups that had to search
+    evictions: entries dropped from memory to stay within max_entries
+    disk_hits: the hits that were answered from disk
+    disk_evictions: files removed from disk to stay within max_disk_entries
+  """
+  def __init__(self, max_entries=1024, directory=None, max_disk_entries=100000):
+    """
+    Args:
+      max_entries: the number of results to keep in memory
+      directory: a directory to also keep results in, or None for memory only
+      max_disk_entries: the number of results to keep in "directory". Once there are
+                        more, the least recently used are removed until a tenth of
+                        the room is free again.
+    """
+    self.max_entries = max_entries
+    self.directory = directory
+    self.max_disk_entries = max_disk_entries
+    self._entries = OrderedDict()
+    # Number of results in "directory", counted when the first one is written
+    self._disk_entries = None
+    self.hits = self.misses = self.evictions = self.disk_hits = self.disk_evictions = 0
+
+
+  def key(self, board, rootnode, engine='generator', **options):
+    """
+    Returns the cache key for searching "board" with "rootnode", "engine" and "options",
+    as a 2-tuple of (key, whether the key is stable across processes).
+    """
+    dictionary = dictionary_digest(rootnode)
+    persistent = dictionary is not None
+    if not persistent:
+      dictionary = dictionary_token(rootnode)
+    keyed = sorted((name, value) for name, value in options.items() if name not in _unkeyed_options)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([board_digest(board), dictionary, engine, keyed]).encode())
+    return digest.hexdigest(), persistent
+
+
+  def _path(self, key):
+    return os.path.join(self.directory, key + '.json')
+
+
+  def get(self, key, persistent=False):
+    """
+    Returns the cached words for "key", or None. With "persistent", the disk tier is
+    checked too.
+    """
+    if key in self._entries:
+      self._entries.move_to_end(key)
+      self.hits += 1
+      return self._entries[key]
+
+    if persistent and self.directory is not None:
+      try:
+        with open(self._path(key)) as f:
+          words = json.load(f)
+      except (OSError, ValueError):
+        pass
+      else:
+        os.utime(self._path(key))
+        self.hits += 1
+        self.disk_hits += 1
+        self._remember(key, words)
+        return words
+
+    self.misses += 1
+    return None
+
+
+  def put(self, key, words, persistent=False):
+    """Cache "words" (a list) under "key", on disk too if "persistent" """
+    self._remember(key, words)
+    if persistent and self.directory is not None:
+      os.makedirs(self.directory, exist_ok=True)
+      added = not os.path.exists(self._path(key))
+      tmp_path = '{}.{}.tmp'.format(self._path(key), os.getpid())
+      with open(tmp_path, 'w') as f:
+        json.dump(words, f)
+      os.replace(tmp_path, self._path(key))
+      self._trim_disk(added)
+
+
+  def _remember(self, key, words):
+    self._entries[key] = words
+    self._entries.move_to_end(key)
+    while len(self._entries) > self.max_entries:
+      self._entries.popitem(last=False)
+      self.evictions += 1
+
+
+  def _trim_disk(self, added):
+    """
+    Count a file just written to disk ("added" is False if it replaced one), and remove
+    the least recently used files if there are more than max_disk_entries. The directory
+    is only listed to count it the first time and when it's trimmed, and trimming leaves
+    a tenth of the room free, so most writes don't list it at all.
+    """
+    if self._disk_entries is None:
+      self._disk_entries = sum(1 for name in os.listdir(self.directory) if name.endswith('.json'))
+    elif added:
+      self._disk_entries += 1
+    if self._disk_entries <= self.max_disk_entries:
+      return
+
+    # Other processes may have added or removed files too, so recount before trimming
+    names = [name for name in os.listdir(self.directory) if name.endswith('.json')]
+    keep = self.max_disk_entries - self.max_disk_entries // 10
+    paths = sorted((os.path.join(self.directory, name) for name in names), key=os.path.getmtime)
+    self._disk_entries = len(paths)
+    for path in paths[:max(len(paths) - keep, 0)]:
+      try:
+        os.remove(path)
+        self.disk_evictions += 1
+      except FileNotFoundError:
+        pass
+      self._disk_entries -= 1
+
+
+  def search(self, board, rootnode, engine='generator', **options):
+    """
+    Returns the words found in "board", as select_engine(engine)(board, rootnode,
+    **options) would yield them, from the cache if possible.
+    """
+    key, persistent = self.key(board, rootnode, engine, **options)
+    words = self.get(key, persistent)
+    if words is None:
+      words = list(select_engine(engine)(board, rootnode, **options))
+      self.put(key, words, persistent)
+    return words
+
+
+  def __len__(self):
+    return len(self._entries)
+
+
+  def __repr__(self):
+    return '{}(entries={}, hits={}, misses={}, evictions={}, disk_hits={})'.format(
+      type(self).__name__, len(self._entries), self.hits, self.misses, self.evictions, self.disk_hits,
+    )
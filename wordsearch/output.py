@@ -0,0 +1,135 @@
+"""
+Writing search results out without holding up the search.
+
+Words are joined into large batches so that each write() call carries thousands of them,
+and can optionally be handed to a writer thread through a bounded queue, so that a slow
+consumer (e.g. a pipe into another program) only stalls the search once the queue is full.
+
+Usage examples:
+  >>> write_words(search_board(board, rootnode), sys.stdout, threaded=True)
+  >>> write_words(unique(search_board(board, rootnode)), sys.stdout)
+"""
+from collections import OrderedDict
+
+
+def unique(words, max_size=1 << 20):
+  """
+  A generator that yields each word in "words" the first time it is seen.
+
+  At most "max_size" words are remembered; past that, the least recently seen are
+  forgotten, so memory stays bounded but a word that has been forgotten may be yielded
+  again.
+
+  Args:
+    words: an iterable of words
+    max_size: the maximum number of words to remember
+
+  Yields: a word (string)
+  """
+  seen = OrderedDict()
+  for word in words:
+    if word in seen:
+      seen.move_to_end(word)
+      continue
+    seen[word] = None
+    if len(seen) > max_size:
+      seen.popitem(last=False)
+    yield word
+
+
+
+class ThreadedWriter:
+  """
+  Writes chunks of text to a file from a background thread.
+
+  write() only blocks once "queue_size" chunks are waiting. An exception raised while
+  writing (e.g. BrokenPipeError) is re-raised by the next write() or by close().
+  """
+  def __init__(self, out, queue_size=16):
+    """
+    Args:
+      out: a writable text file
+      queue_size: the maximum number of chunks waiting to be written
+    """
+    # Imported here so that unthreaded output doesn't pay for them at startup
+    import queue, threading
+    self.out = out
+    self._queue = queue.Queue(queue_size)
+    self._error = None
+    self._thread = threading.Thread(target=self._run, daemon=True)
+    self._thread.start()
+
+
+  def _run(self):
+    while True:
+      chunk = self._queue.get()
+      if chunk is None:
+        return
+      # After an error, keep draining the queue so that write() never blocks forever
+      if self._error is None:
+        try:
+          self.out.write(chunk)
+        except BaseException as e:
+          self._error = e
+
+
+  def write(self, chunk):
+    """Queue "chunk" (a string) to be written"""
+    if self._error is not None:
+      raise self._error
+    self._queue.put(chunk)
+
+
+  def close(self):
+    """Wait for every queued chunk to be written and stop the thread"""
+    if self._thread.is_alive():
+      self._queue.put(None)
+      self._thread.join()
+    if self._error is not None:
+      raise self._error
+
+
+  def __enter__(self):
+    return self
+
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+
+
+def write_words(words, out, batch_size=8192, threaded=False, queue_size=16):
+  """
+  Write each word in "words" to "out" on its own line, "batch_size" words per write.
+
+  Args:
+    words: an iterable of words
+    out: a writable text file
+    batch_size: the number of words joined into each write
+    threaded: write from a background thread (see ThreadedWriter) so that the caller
+              keeps producing words while earlier batches are written
+    queue_size: with "threaded", the number of batches that may wait to be written
+
+  Returns: the number of words written (int)
+  """
+  writer = ThreadedWriter(out, queue_size) if threaded else None
+  write = writer.write if writer is not None else out.write
+
+  count = 0
+  batch = []
+  try:
+    for word in words:
+      batch.append(word)
+      if len(batch) >= batch_size:
+        batch.append('')
+        write('\n'.join(batch))
+        count += len(batch) - 1
+        batch = []
+    if batch:
+      batch.append('')
+      write('\n'.join(batch))
+      count += len(batch) - 1
+  finally:
+    if writer is not None:
+      writer.close()
+  return count
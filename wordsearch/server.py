@@ -0,0 +1,268 @@
+"""
+A long-running search server that keeps dictionaries loaded between requests.
+
+The server listens on a Unix socket or a localhost TCP port and speaks JSON lines: each
+request is one JSON object on its own line, answered by one JSON object on its own line.
+A request looks like
+
+  {"board": ["abc", "def"], "dictionary": "words.txt", "min_word_length": 3, "id": 1}
+
+where everything but "board" is optional ("dictionary" defaults to the first one
+served), and is answered with
+
+  {"id": 1, "words": ["abc", ...]}    or    {"id": 1, "error": "..."}
+
+Searches are CPU-bound, so they run in a process pool whose workers receive the
+dictionaries once, at startup; the event loop only parses and answers requests. At most
+--max-concurrency searches are queued on the pool at a time. With --cache-size, results
+for boards that were already searched are answered from memory without touching the pool.
+"""
+from wordsearch.batch import search_one
+from wordsearch.board import CompactBoard
+from wordsearch.dictionary import DictionaryCache
+from wordsearch.main import engines
+from wordsearch.memo import ResultCache
+from wordsearch.trie import fold
+from argparse import ArgumentParser, ArgumentDefaultsHelpFormatter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio, json, os, stat
+
+
+# Dictionaries of a worker process, set by _init_worker()
+_worker_dictionaries = None
+
+
+def _init_worker(dictionaries):
+  """Pool initializer: make "dictionaries" available to _search_worker()"""
+  global _worker_dictionaries
+  _worker_dictionaries = dictionaries
+
+
+def _search_worker(request_id, rows, dictionary, engine, min_word_length):
+  """Search one board in a worker process"""
+  return search_one(request_id, rows, _worker_dictionaries[dictionary], engine, min_word_length)
+
+
+class SearchServer:
+  """
+  Serves searches against a fixed set of dictionaries.
+
+  Usage examples:
+    >>> server = SearchServer({'words.txt': DictionaryCache(['words.txt']).load()})
+    >>> asyncio.run(server.serve_unix('/tmp/wordsearch.sock'))
+  """
+  def __init__(self, dictionaries, engine='generator', workers=None, max_concurrency=None,
+               cache_size=0):
+    """
+    Args:
+      dictionaries: a dict of {name: trie} to serve. The first is the default.
+      engine: name of the search engine to use, see wordsearch.main.engines
+      workers: number of worker processes, defaults to the number of CPUs
+      max_concurrency: maximum number of searches submitted to the pool at once,
+                       defaults to twice the number of workers
+      cache_size: number of results to memoize, see wordsearch.memo. 0 disables the
+                  cache, otherwise it is available as "result_cache".
+    """
+    if not dictionaries:
+      raise ValueError("At least one dictionary must be served")
+    self.dictionaries = dictionaries
+    self.default_dictionary = next(iter(dictionaries))
+    self.engine = engine
+    self.workers = workers or os.cpu_count() or 1
+    self.max_concurrency = max_concurrency or 2 * self.workers
+    self.result_cache = ResultCache(cache_size) if cache_size > 0 else None
+    self._executor = None
+    self._semaphore = None
+
+
+  def _start(self):
+    """Start the worker pool, if it isn't running yet"""
+    if self._executor is None:
+      self._executor = ProcessPoolExecutor(
+        self.workers, initializer=_init_worker, initargs=(self.dictionaries,),
+      )
+      self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+
+  def close(self):
+    """Shut down the worker pool"""
+    if self._executor is not None:
+      self._executor.shutdown()
+      self._executor = None
+
+
+  async def search(self, request):
+    """
+    Answer a single request.
+
+    Args:
+      request: a request dict, see the module docstring
+
+    Returns: a response dict
+    """
+    request_id = request.get('id')
+    dictionary = request.get('dictionary', self.default_dictionary)
+    rows = request.get('board')
+    if not isinstance(dictionary, str):
+      return {'id': request_id, 'error': '"dictionary" must be a string'}
+    if dictionary not in self.dictionaries:
+      return {'id': request_id, 'error': 'Unknown dictionary "{}"'.format(dictionary)}
+    if not isinstance(rows, list) or not all(isinstance(row, str) for row in rows):
+      return {'id': request_id, 'error': '"board" must be a list of strings'}
+    try:
+      min_word_length = int(request.get('min_word_length', 0))
+    except (TypeError, ValueError):
+      return {'id': request_id, 'error': '"min_word_length" must be an integer'}
+
+    key = None
+    if self.result_cache is not None:
+      try:
+        board = CompactBoard(fold(row) for row in rows)
+      except ValueError as e:
+        return {'id': request_id, 'error': str(e)}
+      key, _ = self.result_cache.key(board, self.dictionaries[dictionary], self.engine,
+                                     min_word_length=min_word_length)
+      words = self.result_cache.get(key)
+      if words is not None:
+        return {'id': request_id, 'words': words}
+
+    self._start()
+    loop = asyncio.get_running_loop()
+    async with self._semaphore:
+      try:
+        response = await loop.run_in_executor(
+          self._executor, _search_worker, request_id, rows, dictionary, self.engine, min_word_length,
+        )
+      except BrokenProcessPool:
+        # A worker died (e.g. it was killed or ran out of memory), which leaves the whole
+        # pool unusable: start a fresh one for the next request
+        self.close()
+        raise
+    if key is not None and 'words' in response:
+      self.result_cache.put(key, response['words'])
+    return response
+
+
+  async def handle(self, reader, writer):
+    """Serve requests from one connection until it is closed"""
+    try:
+      while True:
+        line = await reader.readline()
+        if not line:
+          break
+        try:
+          request = json.loads(line)
+        except ValueError as e:
+          response = {'id': None, 'error': 'Invalid JSON: {}'.format(e)}
+        else:
+          if isinstance(request, dict):
+            try:
+              response = await self.search(request)
+            except Exception as e:
+              # Anything else that goes wrong, in the server or a worker, fails only this
+              # request and not the connection
+              response = {'id': request.get('id'), 'error': 'Search failed: {!r}'.format(e)}
+          else:
+            response = {'id': None, 'error': 'Requests must be JSON objects'}
+        writer.write(json.dumps(response).encode() + b'\n')
+        await writer.drain()
+    except ConnectionError:
+      pass
+    finally:
+      writer.close()
+
+
+  async def start_unix(self, path):
+    """
+    Start listening on the Unix socket at "path" and return the asyncio server. A stale
+    socket left at "path" by a previous server is replaced.
+    """
+    if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+      os.remove(path)
+    self._start()
+    return await asyncio.start_unix_server(self.handle, path=path)
+
+
+  async def start_tcp(self, port, host='127.0.0.1'):
+    """Start listening on "host":"port" and return the asyncio server"""
+    self._start()
+    return await asyncio.start_server(self.handle, host=host, port=port)
+
+
+  async def serve_unix(self, path):
+    """Serve on the Unix socket at "path" until cancelled"""
+    server = await self.start_unix(path)
+    try:
+      async with server:
+        await server.serve_forever()
+    finally:
+      self.close()
+
+
+  async def serve_tcp(self, port, host='127.0.0.1'):
+    """Serve on "host":"port" until cancelled"""
+    server = await self.start_tcp(port, host)
+    try:
+      async with server:
+        await server.serve_forever()
+    finally:
+      self.close()
+
+
+
+def parse_args(argv=None, prog=None):
+  parser = ArgumentParser(prog=prog, description="Serve wordsearches over a local socket",
+                          formatter_class=ArgumentDefaultsHelpFormatter)
+
+  parser.add_argument('-d', '--dictionary', dest='dictionaries', action='append', default=None,
+    help="File with a list of words to serve; may be repeated (default: words.txt). Requests "
+         "name a dictionary by its file name, so no two may share one")
+  parser.add_argument('-e', '--engine', dest='engine', choices=engines, default='generator',
+    help="Search engine to use")
+  parser.add_argument('-j', '--jobs', dest='workers', type=int, default=None,
+    help="Number of worker processes (default: number of CPUs)")
+  parser.add_argument('--max-concurrency', dest='max_concurrency', type=int, default=None,
+    help="Maximum number of searches in flight (default: twice the number of workers)")
+  parser.add_argument('--cache-size', dest='cache_size', type=int, default=0,
+    help="Number of results to memoize, for boards that are searched repeatedly (0 disables)")
+  group = parser.add_mutually_exclusive_group()
+  group.add_argument('--socket', dest='socket', default='wordsearch.sock',
+    help="Path of the Unix socket to listen on")
+  group.add_argument('--port', dest='port', type=int, default=None,
+    help="Listen on this TCP port on localhost instead of a Unix socket")
+
+  args = parser.parse_args(argv)
+  names = [os.path.basename(name) for name in args.dictionaries or []]
+  duplicates = sorted({name for name in names if names.count(name) > 1})
+  if duplicates:
+    parser.error("Dictionaries are served by file name, and more than one is named {}".format(
+      ', '.join(map(repr, duplicates))))
+  return args
+
+
+def main(argv=None, prog=None):
+  """
+  Run the server from the command line.
+
+  Args:
+    argv: the arguments to parse, defaults to sys.argv[1:]
+    prog: the program name to show in usage messages, defaults to sys.argv[0]
+  """
+  args = parse_args(argv, prog)
+
+  names = args.dictionaries or ['words.txt']
+  dictionaries = {os.path.basename(name): DictionaryCache([name]).load() for name in names}
+  server = SearchServer(dictionaries, args.engine, args.workers, args.max_concurrency, args.cache_size)
+
+  try:
+    if args.port is not None:
+      asyncio.run(server.serve_tcp(args.port))
+    else:
+      asyncio.run(server.serve_unix(args.socket))
+  except KeyboardInterrupt:
+    pass
+
+
+if __name__ == '__main__':
+  main()
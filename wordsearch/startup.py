@@ -0,0 +1,105 @@
+"""
+Timing what a short command-line run spends before it gets to search.
+
+A StartupProfile replaces builtins.__import__ with a wrapper that times every import
+statement that actually loads a module, in the spirit of "python -X importtime": each
+module gets its own time and its cumulative time including the modules it imported in
+turn. Imports done directly through importlib (rather than an import statement) aren't
+seen, and neither is anything imported before the profile was installed.
+
+Usage examples:
+  >>> profile = StartupProfile()
+  >>> profile.install()
+  >>> import json
+  >>> profile.uninstall()
+  >>> print(profile.report())
+"""
+import builtins, sys, time
+
+
+def _full_name(name, globals, fromlist, level):
+  """Returns the absolute name of the module an import statement loads (str)"""
+  if not level:
+    return name
+  package = (globals or {}).get('__package__') or ''
+  base = package.rsplit('.', level - 1)[0]
+  if name:
+    return base + '.' + name
+  # "from . import x, y"
+  return ', '.join(base + '.' + item for item in fromlist) if fromlist else base
+
+
+
+class StartupProfile:
+  """
+  Import timings collected while installed.
+
+  Attributes:
+    imports: a list of (module name, self seconds, cumulative seconds, nesting depth), in
+             the order the imports finished, as "python -X importtime" prints them
+  """
+  def __init__(self):
+    self.imports = []
+    # Time spent in nested imports, per import statement currently running
+    self._nested = []
+    self._original = None
+
+
+  def install(self):
+    """Start timing imports"""
+    if self._original is None:
+      self._original = builtins.__import__
+      builtins.__import__ = self._import
+
+
+  def uninstall(self):
+    """Stop timing imports"""
+    if self._original is not None:
+      builtins.__import__ = self._original
+      self._original = None
+
+
+  def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+    # Modules that are already loaded cost next to nothing, so don't time them
+    if level == 0 and name in sys.modules:
+      return self._original(name, globals, locals, fromlist, level)
+
+    self._nested.append(0.0)
+    loaded = len(sys.modules)
+    start = time.perf_counter()
+    try:
+      return self._original(name, globals, locals, fromlist, level)
+    finally:
+      cumulative = time.perf_counter() - start
+      nested = self._nested.pop()
+      if self._nested:
+        self._nested[-1] += cumulative
+      if len(sys.modules) > loaded:
+        self.imports.append((_full_name(name, globals, fromlist, level), cumulative - nested,
+                             cumulative, len(self._nested)))
+
+
+  @property
+  def total(self):
+    """The time spent importing, in seconds (float)"""
+    return sum(cumulative for _, _, cumulative, depth in self.imports if depth == 0)
+
+
+  def report(self):
+    """Returns the timings as a table like "python -X importtime" prints (str)"""
+    lines = ['import time: self [us] | cumulative | imported package']
+    for name, own, cumulative, depth in self.imports:
+      lines.append('import time: {:>9} | {:>10} | {}{}'.format(
+        round(own * 1e6), round(cumulative * 1e6), '  ' * depth, name,
+      ))
+    lines.append('{:<22} {:>10.4f}s'.format('imports', self.total))
+    return '\n'.join(lines)
+
+
+  def __enter__(self):
+    self.install()
+    return self
+
+
+  def __exit__(self, *exc_info):
+    self.uninstall()
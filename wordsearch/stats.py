@@ -0,0 +1,81 @@
+"""
+Counters and timings for finding out where a search spends its time.
+
+Instrumentation is opt-in: passing a SearchStats to wordsearch.main.search_board()
+switches it to a separate, instrumented copy of the search loop, so searches without one
+run exactly the same code as before.
+
+Usage examples:
+  >>> stats = SearchStats()
+  >>> with stats.phase('search'):
+  ...   words = list(search_board(board, rootnode, stats=stats))
+  >>> print(stats.report())
+"""
+from contextlib import contextmanager
+import time
+
+
+class SearchStats:
+  """
+  Counters and per-phase wall times collected by an instrumented search.
+
+  Attributes:
+    runs: number of (cell, direction) runs walked
+    skipped: runs never started because they couldn't fit a word of a wanted length
+    filtered: runs never started because the prefilter ruled out any word along them
+    steps: number of trie steps taken, i.e. letters matched, over all runs
+    edge_ends: runs that ended at the edge of the board
+    miss_ends: runs that ended because the next letter wasn't in the trie
+    bound_ends: runs cut short because no word of a wanted length was reachable
+    phases: a dict of {phase name: seconds}, in the order the phases first ran
+  """
+  def __init__(self):
+    self.runs = 0
+    self.skipped = 0
+    self.filtered = 0
+    self.steps = 0
+    self.edge_ends = 0
+    self.miss_ends = 0
+    self.bound_ends = 0
+    self.phases = {}
+
+
+  @property
+  def average_depth(self):
+    """The average number of letters matched per run (float)"""
+    return self.steps / self.runs if self.runs else 0.0
+
+
+  @contextmanager
+  def phase(self, name):
+    """
+    A context manager that adds the wall time spent inside it to phase "name".
+    """
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+
+  def report(self):
+    """Returns a human-readable summary of the stats, one line per figure (str)"""
+    lines = ['{:<22} {:>10.4f}s'.format(name, seconds) for name, seconds in self.phases.items()]
+    if self.runs or self.skipped or self.filtered:
+      lines.extend([
+        '{:<22} {:>10}'.format('runs started', self.runs),
+        '{:<22} {:>10}'.format('runs skipped', self.skipped),
+        '{:<22} {:>10}'.format('runs prefiltered', self.filtered),
+        '{:<22} {:>10}'.format('trie steps', self.steps),
+        '{:<22} {:>10.2f}'.format('average depth', self.average_depth),
+        '{:<22} {:>10}'.format('ended at board edge', self.edge_ends),
+        '{:<22} {:>10}'.format('ended by trie miss', self.miss_ends),
+        '{:<22} {:>10}'.format('ended by length bound', self.bound_ends),
+      ])
+    return '\n'.join(lines)
+
+
+  def __repr__(self):
+    return '{}(runs={}, filtered={}, steps={}, edge_ends={}, miss_ends={}, bound_ends={})'.format(
+      type(self).__name__, self.runs, self.filtered, self.steps, self.edge_ends, self.miss_ends, self.bound_ends,
+    )
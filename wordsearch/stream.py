@@ -0,0 +1,60 @@
+"""
+Search boards that are too large to hold in memory by reading them a few rows at a time.
+
+A run can't be longer than the trie is deep, so the words starting in a given row only
+depend on the rows within max_depth - 1 of it. The board is read into a rolling window
+holding a block of rows to search plus that many rows of context on either side, and
+rows are dropped as soon as no remaining run can reach them.
+"""
+from wordsearch.board import Board
+from wordsearch.main import _search_rows
+from collections import deque
+
+
+def stream_search(rows, rootnode):
+  """
+  A generator that searches a board given as an iterable of rows and yields the words
+  found, in the same order as search_board() would for the whole board.
+
+  At most 3 * (max_depth - 1) + 1 rows are held in memory at once, where max_depth is
+  the length of the longest word in the trie.
+
+  Args:
+    rows: an iterable of rows, each an iterable of letters. Every row must have the
+          same length.
+    rootnode: a TrieNode or CompactTrie that roots a trie used to identify words
+
+  Yields: a word found in the board (string)
+  """
+  margin = max(rootnode.max_depth() - 1, 0)
+  block = max(margin, 1)
+
+  # window[0] is board row "top"; rows [first, first + block) are searched next
+  window = deque()
+  top = first = 0
+  width = None
+
+  def search_block(last):
+    board = Board(window)
+    return _search_rows(board, rootnode, range(first - top, last - top))
+
+  for row in rows:
+    row = list(row)
+    if width is None:
+      width = len(row)
+    if len(row) != width or width == 0:
+      raise ValueError("Every row must be the same, non-zero length")
+    window.append(row)
+
+    # Search the next block once every row its runs can reach has been read
+    if top + len(window) >= first + block + margin:
+      yield from search_block(first + block)
+      first += block
+      while top < first - margin:
+        window.popleft()
+        top += 1
+
+  if top + len(window) > first:
+    yield from search_block(top + len(window))
+  elif width is None:
+    raise ValueError("Both dimensions of the board must be greater than 0")
@@ -0,0 +1,414 @@
+"""
+Searching a board against several dictionaries in one pass.
+
+A TaggedTrie merges the words of several dictionaries into one trie, where each node
+records a bitmask of the dictionaries that have a word ending there. One walk of each run
+then finds the longest word of every dictionary at once: the deepest node whose mask
+includes a dictionary's bit is that dictionary's longest match, so a run that reads
+"scientists" can report "scientist" for a general word list and "scientists" for a
+glossary from the same walk.
+
+A TaggedCache keeps the merged trie on disk next to the dictionaries, like a
+DictionaryCache does for the plain merged trie: the words as an index and the masks as an
+array of one 64-bit mask per node, both memory-mapped on load, so that later runs don't
+rebuild the trie. It is rebuilt whenever one of the dictionaries changes.
+
+Usage examples:
+  >>> trie = TaggedCache(['words.txt', 'glossary.txt', 'blocklist.txt']).load()
+  >>> for hit in search_board_tagged(board, trie):
+  ...   print(hit.word, hit.dictionaries)
+"""
+from wordsearch.board import _room, flat_letters, run_word
+from wordsearch.compact import CompactTrie
+from wordsearch.dictionary import _RECENT_NS, cache_name, file_hash, file_signature, read_words
+from wordsearch.index import IndexFormatError, load_index, write_index
+from wordsearch.main import Hit, _directions, _live_starts
+from wordsearch.trie import fold
+from collections import namedtuple
+from collections.abc import Mapping
+from array import array
+import json, mmap, os, time
+
+TAGGED_VERSION = 1
+
+# A word found by search_board_tagged(): the fields of a Hit, plus the names of the
+# dictionaries (a tuple) that it is the longest word along its run of
+TaggedHit = namedtuple('TaggedHit', Hit._fields + ('dictionaries',))
+
+
+class TaggedNode:
+  """
+  A node in a TaggedTrie.
+
+  Attributes:
+    children: a dict of {letter: TaggedNode}
+    mask: a bitmask of the dictionaries with a word ending at this node, where bit i
+          stands for the dictionary at index i of the trie's "names"
+  """
+  __slots__ = ('children', 'mask', '__weakref__')
+
+  def __init__(self):
+    self.children = {}
+    self.mask = 0
+
+
+  @property
+  def word_end(self):
+    """Whether any dictionary has a word ending at this node (bool)"""
+    return self.mask != 0
+
+
+
+class _TaggedRoot:
+  """What TaggedTrie and MappedTaggedTrie have in common: the "names" of their masks"""
+  __slots__ = ()
+
+  def dictionaries(self, word):
+    """Returns the names of the dictionaries that contain "word" (tuple)"""
+    node = self
+    for letter in fold(word):
+      node = node.children.get(letter)
+      if node is None:
+        return ()
+    return self.tag(node.mask)
+
+
+  def tag(self, mask):
+    """Returns the names of the dictionaries whose bits are set in "mask" (tuple)"""
+    return tuple(name for bit, name in enumerate(self.names) if mask >> bit & 1)
+
+
+  def words(self):
+    """Yields every word of every dictionary once, in sorted order"""
+    stack = [(self, '')]
+    while stack:
+      node, prefix = stack.pop()
+      if node.mask and node is not self:
+        yield prefix
+      for letter in sorted(node.children, reverse=True):
+        stack.append((node.children[letter], prefix + letter))
+
+
+  def __contains__(self, word):
+    return bool(self.dictionaries(word))
+
+
+  def __repr__(self):
+    return '{}(names={!r})'.format(type(self).__name__, self.names)
+
+
+
+class TaggedTrie(_TaggedRoot, TaggedNode):
+  """
+  The root of a trie merged from several dictionaries, see the module docstring.
+
+  Attributes:
+    names: the name of each dictionary, in bit order
+  """
+  __slots__ = ('names', '_version')
+
+  def __init__(self, word_lists, names=None):
+    """
+    Args:
+      word_lists: a list of iterables of words, one per dictionary. Words are case-folded
+                  with fold().
+      names: a name for each dictionary, defaulting to "0", "1", ...
+
+    Raises: ValueError if "names" doesn't name every dictionary
+    """
+    super().__init__()
+    self._version = 0
+    word_lists = list(word_lists)
+    self.names = tuple(names) if names is not None else tuple(str(i) for i in range(len(word_lists)))
+    if len(self.names) != len(word_lists):
+      raise ValueError("Expected {} dictionary names, got {}".format(len(word_lists), len(self.names)))
+    for bit, words in enumerate(word_lists):
+      for word in words:
+        self.index(word, bit)
+
+
+  @classmethod
+  def from_files(cls, paths):
+    """
+    Returns a TaggedTrie of the dictionary files at "paths", one word per line, named
+    by their paths
+    """
+    return cls([read_words(path) for path in paths], paths)
+
+
+  def index(self, word, bit):
+    """Add "word" to the dictionary at index "bit" of "names" """
+    self._version += 1
+    node = self
+    for letter in fold(word):
+      child = node.children.get(letter)
+      if child is None:
+        child = node.children[letter] = TaggedNode()
+      node = child
+    if node is not self:
+      node.mask |= 1 << bit
+
+
+
+class MappedTaggedTrie(_TaggedRoot):
+  """
+  A TaggedTrie read back from a TaggedCache: the merged words in a MappedTrie and the
+  mask of each node in a memory-mapped array indexed by node id. Its nodes are views
+  created on demand, as for CompactTrie.
+
+  Attributes:
+    names: the name of each dictionary, in bit order
+    trie: the MappedTrie of every word
+    masks: the mask of each node of "trie", by node id
+  """
+  def __init__(self, trie, masks, names):
+    self.trie = trie
+    self.masks = masks
+    self.names = tuple(names)
+
+
+  @property
+  def mask(self):
+    return self.masks[0]
+
+
+  @property
+  def word_end(self):
+    return self.masks[0] != 0
+
+
+  @property
+  def children(self):
+    return _MappedTaggedChildren(self, 0)
+
+
+
+class _MappedTaggedNode:
+  """A view of a node of a MappedTaggedTrie, with the attributes of a TaggedNode"""
+  __slots__ = ('root', 'node')
+
+  def __init__(self, root, node):
+    self.root = root
+    self.node = node
+
+
+  @property
+  def mask(self):
+    return self.root.masks[self.node]
+
+
+  @property
+  def word_end(self):
+    return self.root.masks[self.node] != 0
+
+
+  @property
+  def children(self):
+    return _MappedTaggedChildren(self.root, self.node)
+
+
+
+class _MappedTaggedChildren(Mapping):
+  """The "children" mapping of a MappedTaggedTrie node"""
+  __slots__ = ('_root', '_node')
+
+  def __init__(self, root, node):
+    self._root = root
+    self._node = node
+
+
+  def get(self, letter, default=None):
+    child = self._root.trie.child(self._node, letter)
+    return _MappedTaggedNode(self._root, child) if child >= 0 else default
+
+
+  def __getitem__(self, letter):
+    child = self.get(letter)
+    if child is None:
+      raise KeyError(letter)
+    return child
+
+
+  def __iter__(self):
+    return (letter for letter, _ in self._root.trie.edges(self._node))
+
+
+  def __len__(self):
+    offsets = self._root.trie._offsets
+    return offsets[self._node + 1] - offsets[self._node]
+
+
+
+class TaggedCache:
+  """
+  A cache of the TaggedTrie of several dictionary files, see the module docstring. It
+  lives in the same directory as their DictionaryCache, in three files:
+
+    tagged.json:  the SHA-256 of each source when the trie was built, and its size and
+                  modification time, to skip rehashing unchanged files
+    tagged.idx:   every word of every source (see wordsearch.index)
+    tagged.masks: the mask of each node of tagged.idx, as native 64-bit ints
+
+  Tries of more than 64 dictionaries aren't cached.
+  """
+  def __init__(self, sources, path=None):
+    """
+    Args:
+      sources: a list of paths of dictionary files (one word per line), which also name
+               the dictionaries
+      path: the cache directory, defaults to wordsearch.dictionary.cache_name(sources)
+    """
+    if not sources:
+      raise ValueError("At least one dictionary is required")
+    self.sources = list(sources)
+    self.path = path if path is not None else cache_name(self.sources)
+
+
+  def _file(self, name):
+    return os.path.join(self.path, name)
+
+
+  def load(self):
+    """
+    Returns the TaggedTrie of the sources: a MappedTaggedTrie, from the cache if it is
+    up to date and after rebuilding it otherwise
+    """
+    if len(self.sources) > 64:
+      return TaggedTrie.from_files(self.sources)
+
+    try:
+      with open(self._file('tagged.json')) as f:
+        manifest = json.load(f)
+    except (OSError, ValueError):
+      manifest = None
+    if (not isinstance(manifest, dict) or manifest.get('version') != TAGGED_VERSION
+        or manifest.get('names') != self.sources):
+      return self.build()
+
+    old_signatures = manifest.get('signatures', {})
+    signatures = {source: file_signature(source) for source in self.sources}
+    for source in self.sources:
+      if old_signatures.get(source) != signatures[source]:
+        if file_hash(source) != manifest['sources'].get(source):
+          return self.build()
+    try:
+      trie = self._map()
+    except (OSError, IndexFormatError):
+      return self.build()
+    if signatures != old_signatures:
+      # Touched but not edited: remember the new signatures to skip hashing next time
+      self._write_manifest(manifest['sources'], signatures)
+    return trie
+
+
+  def build(self):
+    """Rebuild the cache from the sources and return the MappedTaggedTrie"""
+    os.makedirs(self.path, exist_ok=True)
+    signatures = {source: file_signature(source) for source in self.sources}
+    hashes = {source: file_hash(source) for source in self.sources}
+    tagged = TaggedTrie.from_files(self.sources)
+
+    # Number the nodes the way the index does, and copy each node's mask across
+    trie = CompactTrie(words=tagged.words())
+    masks = array('Q', bytes(8 * trie.node_count))
+    stack = [(tagged, 0)]
+    while stack:
+      node, node_id = stack.pop()
+      masks[node_id] = node.mask
+      stack.extend((child, trie.child(node_id, letter)) for letter, child in node.children.items())
+
+    write_index(trie, self._file('tagged.idx'), 0)
+    tmp_path = '{}.{}.tmp'.format(self._file('tagged.masks'), os.getpid())
+    with open(tmp_path, 'wb') as f:
+      masks.tofile(f)
+    os.replace(tmp_path, self._file('tagged.masks'))
+    self._write_manifest(hashes, signatures)
+    return self._map()
+
+
+  def _map(self):
+    """Map the cached files as a MappedTaggedTrie"""
+    trie = load_index(self._file('tagged.idx'))[1]
+    with open(self._file('tagged.masks'), 'rb') as f:
+      mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapped) != 8 * trie.node_count:
+      raise IndexFormatError('"{}" doesn\'t match its index'.format(self._file('tagged.masks')))
+    return MappedTaggedTrie(trie, memoryview(mapped).cast('Q'), self.sources)
+
+
+  def _write_manifest(self, hashes, signatures):
+    """Atomically replace the manifest"""
+    now = time.time_ns()
+    signatures = {source: signature for source, signature in signatures.items()
+                  if signature[1] < now - _RECENT_NS}
+    manifest = {'version': TAGGED_VERSION, 'names': self.sources, 'sources': hashes,
+                'signatures': signatures}
+    tmp_path = '{}.{}.tmp'.format(self._file('tagged.json'), os.getpid())
+    with open(tmp_path, 'w') as f:
+      json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, self._file('tagged.json'))
+
+
+
+def search_board_tagged(board, trie, min_length=0, prefilter=True):
+  """
+  A generator that searches "board" against every dictionary of "trie" in one pass.
+
+  For each run, in the same order as wordsearch.main.search_board(), it yields the
+  longest word of each dictionary along the run, shortest first. A word that is the
+  longest match of several dictionaries is yielded once, tagged with all of them. The
+  last hit of each run is the word search_board() would yield with the dictionaries
+  merged.
+
+  Args:
+    board: a Board or CompactBoard to search
+    trie: a TaggedTrie
+    min_length: skip words shorter than this
+    prefilter: rule out runs that can't yield a word before walking them, as for
+               search_board()
+
+  Yields: a TaggedHit for each word found
+  """
+  width, height = board.width, board.height
+  text = flat_letters(board)
+  everything = (1 << len(trie.names)) - 1
+  tags = {}
+  live = list(zip(_directions, _live_starts(board, trie, prefilter)))
+
+  for y in range(height):
+    for x in range(width):
+      start = y * width + x
+      for direction, flags in live:
+        if not flags[start]:
+          continue
+        dx, dy = direction
+        room = _room(x, y, dx, dy, width, height)
+        step = dy * width + dx
+        pos = start
+        node = trie
+        ends = []
+        for depth in range(1, room + 1):
+          node = node.children.get(text[pos])
+          if node is None:
+            break
+          if node.mask:
+            ends.append((depth, node.mask))
+          pos += step
+
+        # Walk back from the deepest word end, giving each dictionary its longest match
+        remaining = everything
+        found = []
+        for depth, mask in reversed(ends):
+          mask &= remaining
+          if mask:
+            found.append((depth, mask))
+            remaining &= ~mask
+            if not remaining:
+              break
+
+        for depth, mask in reversed(found):
+          if depth < min_length:
+            continue
+          if mask not in tags:
+            tags[mask] = trie.tag(mask)
+          yield TaggedHit(run_word(text, start, step, depth), x, y, direction, depth, tags[mask])
@@ -1,3 +1,15 @@
+def fold(text):
+  """
+  Returns "text" case-folded the way every trie and board in wordsearch stores letters.
+
+  Words are folded once when they are indexed or looked up, and boards once when they
+  are parsed, so that searches compare letters as they are. str.lower() is used rather
+  than str.casefold() because it maps nearly every letter to exactly one letter, which
+  keeps board runs and words aligned.
+  """
+  return text.lower()
+
+
 class TrieNode:
   """
   A node in a trie.
@@ -5,6 +17,9 @@ class TrieNode:
   Note that "TrieNode.children" is not intended for modification. If you want to directly add
   children to a node, use "_add_children()".
 
+  Words are case-folded with fold() when they are indexed or looked up, and node letters
+  when nodes are created.
+
   Usage examples:
     >>> # Create a trie with words
     >>> root = TrieNode(words=['foo', 'bar', 'baz'])
@@ -23,8 +38,18 @@ class TrieNode:
     >>> root.index('foo')
     >>> 'foo' in root
     True
+    >>>
+    >>> # Build a trie from words that are already sorted, in one pass
+    >>> root = TrieNode.from_sorted(['bar', 'baz', 'foo'])
 
   """
+  # Set on the root of a trie built with TrieNode.from_sorted(minimize=True), whose nodes
+  # are shared between words and so can't be modified
+  _minimized = False
+  # Bumped on the root by index() and remove(), so that what was derived from the trie
+  # (see wordsearch.main._per_trie()) can tell that it's out of date
+  _version = 0
+
   def __init__(self, letter=None, words=None, children=None, word_end=False):
     """
     Args:
@@ -38,12 +63,17 @@ class TrieNode:
     """
     self.word_end = word_end
 
+    # Number of letters from this node to the nearest and furthest word ends at or below
+    # it, or None if there are none. Kept up to date by index() and _add_children(), and
+    # used to stop searches early when no word of a wanted length can be reached.
+    self.min_remaining = self.max_remaining = 0 if word_end else None
+
     if letter is None:
       pass
     elif len(letter) != 1:
       raise ValueError('"letter" should have a length of 1, got "{}"'.format(letter))
     else:
-      letter = letter.lower()
+      letter = fold(letter)
     self.letter = letter
 
     self.children = {}
@@ -57,6 +87,81 @@ class TrieNode:
       self._add_children(*children)
 
 
+  @classmethod
+  def from_sorted(cls, words, minimize=False):
+    """
+    Build a trie from words in sorted order, in a single pass.
+
+    Each word only adds nodes for the letters after the prefix it shares with the
+    previous word, and nodes are finished (their min/max_remaining computed) as soon as
+    the input moves past their prefix.
+
+    Args:
+      words: an iterable of words, in sorted order once case-folded. Duplicates are
+             ignored; a word that sorts before its predecessor raises a ValueError.
+      minimize: also merge nodes with identical subtrees as they are finished, turning
+                the trie into a DAWG (directed acyclic word graph). The result can be
+                searched like any other trie but not modified.
+
+    Returns: the root TrieNode
+    """
+    root = cls()
+    path = [root]
+    register = {} if minimize else None
+    previous = None
+    for word in words:
+      word = fold(word)
+      if previous is None:
+        common = 0
+      elif word <= previous:
+        if word == previous:
+          continue
+        raise ValueError('Words must be sorted, got "{}" after "{}"'.format(word, previous))
+      else:
+        common = 0
+        limit = min(len(word), len(previous))
+        while common < limit and word[common] == previous[common]:
+          common += 1
+
+      cls._finish_path(path, common + 1, register)
+      for letter in word[common:]:
+        node = cls(letter)
+        path[-1].children[node.letter] = node
+        path.append(node)
+      path[-1].word_end = True
+      previous = word
+
+    cls._finish_path(path, 1, register)
+    root._recompute_remaining()
+    if minimize:
+      root._minimized = True
+    return root
+
+
+  @staticmethod
+  def _finish_path(path, keep, register):
+    """
+    Pop and finish the nodes of "path" after the first "keep". If "register" is a dict,
+    each node is replaced in its parent by an equivalent one already registered, if any.
+    """
+    while len(path) > keep:
+      node = path.pop()
+      # Inlined _recompute_remaining(): every child is already finished
+      lo = hi = 0 if node.word_end else None
+      for child in node.children.values():
+        if hi is None:
+          lo, hi = child.min_remaining + 1, child.max_remaining + 1
+        else:
+          lo = min(lo, child.min_remaining + 1)
+          hi = max(hi, child.max_remaining + 1)
+      node.min_remaining, node.max_remaining = lo, hi
+      if register is not None:
+        key = (node.letter, node.word_end, tuple((letter, id(child)) for letter, child in node.children.items()))
+        canonical = register.setdefault(key, node)
+        if canonical is not node:
+          path[-1].children[node.letter] = canonical
+
+
   def index(self, *words):
     """
     Add words to the trie
@@ -66,9 +171,14 @@ class TrieNode:
     """
     if self.letter is not None:
       raise ValueError('index() should only be called on the root node')
+    if self._minimized:
+      raise ValueError('A minimized trie cannot be modified')
 
+    self._version += 1
     for word in words:
+      word = fold(word)
       cur_node = self
+      path = [self]
       for letter in word:
         # If the node already exists, use it
         if letter in cur_node.children:
@@ -79,21 +189,84 @@ class TrieNode:
           cur_node._add_children(new_node)
       
         cur_node = new_node
+        path.append(cur_node)
       
       # Once we reach the end of the word, flag whichever node ends it
       cur_node.word_end = True
+      for depth, node in enumerate(path):
+        node._note_remaining(len(word) - depth, len(word) - depth)
+
+
+  def remove(self, *words):
+    """
+    Remove words from the trie, pruning any nodes that no longer lead to a word.
+
+    Args:
+      words: strings of words to remove from the trie under this node. Raises a
+             KeyError if any of them isn't in the trie.
+    """
+    if self.letter is not None:
+      raise ValueError('remove() should only be called on the root node')
+    if self._minimized:
+      raise ValueError('A minimized trie cannot be modified')
+
+    self._version += 1
+    for word in words:
+      word = fold(word)
+      path = [self]
+      for letter in word:
+        if letter not in path[-1].children:
+          raise KeyError(word)
+        path.append(path[-1].children[letter])
+      if not path[-1].word_end:
+        raise KeyError(word)
+
+      path[-1].word_end = False
+      # Walk back up, dropping nodes that are now dead ends and refreshing the rest
+      for depth in reversed(range(1, len(path))):
+        node = path[depth]
+        if not node.children and not node.word_end:
+          del path[depth - 1].children[node.letter]
+      for node in reversed(path):
+        node._recompute_remaining()
+
+
+  def _recompute_remaining(self):
+    """Recompute min_remaining/max_remaining from word_end and the children's values"""
+    self.min_remaining = self.max_remaining = 0 if self.word_end else None
+    for child in self.children.values():
+      if child.max_remaining is not None:
+        self._note_remaining(child.min_remaining + 1, child.max_remaining + 1)
+
+
+  def _note_remaining(self, min_remaining, max_remaining):
+    """
+    Widen this node's min_remaining/max_remaining to include a word end between
+    "min_remaining" and "max_remaining" letters below it.
+    """
+    if self.max_remaining is None:
+      self.min_remaining, self.max_remaining = min_remaining, max_remaining
+    else:
+      self.min_remaining = min(self.min_remaining, min_remaining)
+      self.max_remaining = max(self.max_remaining, max_remaining)
 
 
   def _add_children(self, *nodes):
     """
     Add children to this node
 
+    Note that only this node's min_remaining/max_remaining are updated, not those of its
+    ancestors, so tries should be assembled bottom-up.
+
     Args:
       nodes: TrieNodes to become this node's children
     """
     if any(child.letter is None for child in nodes):
       raise ValueError("Only the root node should have letter == None")
     self.children.update({child.letter: child for child in nodes})
+    for child in nodes:
+      if child.max_remaining is not None:
+        self._note_remaining(child.min_remaining + 1, child.max_remaining + 1)
 
 
   def contains(self, word, prefix=False):
@@ -106,7 +279,7 @@ class TrieNode:
     has no letter.
     """
     cur_node = self
-    for letter in word:
+    for letter in fold(word):
       if letter in cur_node.children:
         cur_node = cur_node.children[letter]
       else:
@@ -116,6 +289,19 @@ class TrieNode:
     return cur_node.word_end or prefix
 
 
+  def max_depth(self):
+    """
+    Returns the length of the longest path below this node (int), i.e. for the root, the
+    length of the longest indexed word.
+    """
+    depth = 0
+    level = list(self.children.values())
+    while level:
+      depth += 1
+      level = [child for node in level for child in node.children.values()]
+    return depth
+
+
   def __contains__(self, word):
     """
     Shortcut for TrieNode.contains(word, prefix=False). Overloads "in" operator. 
@@ -0,0 +1,147 @@
+"""
+A NumPy-backed search engine that walks every (cell, direction) run in lock step.
+
+Instead of walking one run at a time, the whole board is encoded once as an array of
+letter codes and the trie as a dense (node, letter code) -> node transition table. Each
+step then advances every live run by one letter with a single table lookup, records which
+runs just ended a word, and drops runs that fell off the board or out of the trie.
+
+Requires NumPy.
+"""
+from wordsearch.board import CompactBoard, flat_letters, run_word
+from wordsearch.compact import CompactTrie
+from wordsearch.main import _directions, _per_trie
+import numpy as np
+
+
+class TransitionTable:
+  """
+  A dense transition table for a trie.
+
+  Letters are mapped to small integer codes 1..len(alphabet); code 0 is reserved for
+  letters that don't appear in the trie, whose column is all -1 (no transition).
+  """
+  def __init__(self, rootnode):
+    """
+    Args:
+      rootnode: a CompactTrie, or a TrieNode root which will be compacted first
+    """
+    trie = rootnode if isinstance(rootnode, CompactTrie) else CompactTrie.from_trie(rootnode)
+
+    offsets = np.asarray(trie._offsets, dtype=np.int64)
+    letters = np.asarray(trie._letters, dtype=np.int64)
+    targets = np.asarray(trie._targets, dtype=np.int32)
+    node_count = trie.node_count
+
+    alphabet = np.unique(letters)
+    self.codes = {chr(letter): code for code, letter in enumerate(alphabet.tolist(), 1)}
+
+    sources = np.repeat(np.arange(node_count), np.diff(offsets))
+    self.table = np.full((node_count, len(alphabet) + 1), -1, dtype=np.int32)
+    self.table[sources, np.searchsorted(alphabet, letters) + 1] = targets
+
+    bits = np.unpackbits(np.frombuffer(bytes(trie._word_ends), dtype=np.uint8), bitorder='little')
+    self.word_end = bits[:node_count].astype(bool)
+
+
+  def encode(self, board):
+    """
+    Returns the board's letters as a flat, row-major array of letter codes.
+
+    Args:
+      board: a Board or CompactBoard of single letters
+    """
+    if isinstance(board, CompactBoard):
+      # Translate the raw letter bytes in bulk through a byte -> code lookup table
+      lookup = np.zeros(256, dtype=np.int32)
+      for letter, code in self.codes.items():
+        if ord(letter) < 256:
+          lookup[ord(letter)] = code
+      return lookup[np.frombuffer(board.buffer, dtype=np.uint8)]
+
+    codes = self.codes
+    return np.fromiter((codes.get(letter, 0) for _, _, letter in board), dtype=np.int32)
+
+
+
+# Prepared TransitionTables, keyed by the id of the trie they were built from
+_prepared = {}
+
+
+def _prepare(rootnode):
+  """Returns a TransitionTable for "rootnode", building it on first use"""
+  return _per_trie(_prepared, rootnode, TransitionTable)
+
+
+def search_board(board, rootnode, table=None):
+  """
+  A generator that searches for words in "board" using the trie rooted by "rootnode"
+  and yields the words found.
+
+  Yields exactly the same words, in the same order, as wordsearch.main.search_board().
+
+  Args:
+    board: a Board to search
+    rootnode: a TrieNode or CompactTrie that roots a trie used to identify words
+    table: a prebuilt TransitionTable for "rootnode". By default one is built on the first
+           search with each trie and reused after that.
+
+  Yields: a word found in board (string)
+  """
+  if table is None:
+    table = _prepare(rootnode)
+
+  width, height = board.width, board.height
+  codes = table.encode(board)
+  ndirs = len(_directions)
+  dx = np.array([d[0] for d in _directions], dtype=np.int32)
+  dy = np.array([d[1] for d in _directions], dtype=np.int32)
+  letters = flat_letters(board)
+
+  # Runs are walked a band of rows at a time, so that the per-run arrays stay a bounded
+  # size however large the board is
+  band_height = max(1, _band_runs // (width * ndirs))
+  for first in range(0, height, band_height):
+    last = min(first + band_height, height)
+    longest = _walk_band(table, codes, width, height, first, last, dx, dy)
+    for found in np.flatnonzero(longest).tolist():
+      cell, d = divmod(found, ndirs)
+      cell += first * width
+      step = _directions[d][1] * width + _directions[d][0]
+      yield run_word(letters, cell, step, int(longest[found]))
+
+
+# Roughly how many runs are walked together, bounding the memory a search needs
+_band_runs = 1 << 18
+
+
+def _walk_band(table, codes, width, height, first, last, dx, dy):
+  """
+  Walk every run starting in rows first..last-1 of the board.
+
+  Returns: an array with the length of the longest word of each run (0 for none), one
+           entry per run numbered in the order the generator engine visits them: row by
+           row, cell by cell, then direction by direction
+  """
+  ndirs = len(dx)
+  run = np.arange((last - first) * width * ndirs, dtype=np.int32)
+  x = (run // ndirs) % width
+  y = (run // ndirs) // width + first
+  direction = run % ndirs
+  node = np.zeros(run.shape, dtype=np.int32)
+  longest = np.zeros(run.shape, dtype=np.int32)
+
+  depth = 0
+  while run.size:
+    node = table.table[node, codes[y * width + x]]
+    depth += 1
+
+    live = node >= 0
+    run, x, y, direction, node = run[live], x[live], y[live], direction[live], node[live]
+    longest[run[table.word_end[node]]] = depth
+
+    x = x + dx[direction]
+    y = y + dy[direction]
+    on_board = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    run, x, y, direction, node = run[on_board], x[on_board], y[on_board], direction[on_board], node[on_board]
+  return longest